@@ -0,0 +1,73 @@
+"""
+比较 download_file 不同写入路径的吞吐量 (MB/s)。
+
+用法:
+    python benchmarks/bench_download.py --size-mb 256 --repeat 3
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from inspirehep_downloader.client import InspireHEPClient  # noqa: E402
+from inspirehep_downloader.scheduler import RequestScheduler  # noqa: E402
+from server import start_server  # noqa: E402
+
+
+def iter_content_download(client, url, output_path, chunk_size):
+    """旧的写入路径：iter_content 逐块分配并写入。"""
+    response = client.session.get(url, stream=True, timeout=client.timeout)
+    response.raise_for_status()
+    with open(output_path, "wb") as f:
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            if chunk:
+                f.write(chunk)
+
+
+def measure(label, func, size, repeat):
+    """运行 repeat 次并打印最佳吞吐量。"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{label:<36} {size / best / 1e6:8.1f} MB/s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="download_file 写入路径的吞吐量基准测试")
+    parser.add_argument("--size-mb", type=int, default=128, help="负载大小 (默认值: 128)")
+    parser.add_argument("--repeat", type=int, default=3, help="每种配置的运行次数，取最佳值 (默认值: 3)")
+    args = parser.parse_args(argv)
+
+    size = args.size_mb * 1024 * 1024
+    server, base_url = start_server(os.urandom(size))
+    url = f"{base_url}/files/paper.pdf"
+    client = InspireHEPClient(scheduler=RequestScheduler(rates={}))
+
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_path = os.path.join(temp_dir, "paper.pdf")
+            print(f"负载: {args.size_mb} MB, 每项 {args.repeat} 次取最佳\n")
+            measure("iter_content 8 KB (旧路径)", lambda: iter_content_download(client, url, output_path, 8192),
+                    size, args.repeat)
+            for chunk_size in (8192, 64 * 1024, 256 * 1024, 1024 * 1024):
+                measure(f"readinto {chunk_size // 1024} KB",
+                        lambda: client.download_file(url, output_path, resume=False, chunk_size=chunk_size),
+                        size, args.repeat)
+            measure(f"readinto {client.chunk_size // 1024} KB + preallocate",
+                    lambda: client.download_file(url, output_path, resume=False, preallocate=True),
+                    size, args.repeat)
+    finally:
+        server.shutdown()
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+"""
+比较 JSON 后端在 INSPIRE 结构记录上的解码和编码吞吐量。
+
+记录包含完整的作者 (带单位) 和参考文献列表，与不带 fields 的 get_record 返回的记录规模相当。
+未安装 orjson 时只测量标准库后端。
+
+用法:
+    python benchmarks/bench_json.py --records 200 --references 250 --repeat 3
+"""
+
+import argparse
+import gc
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from inspirehep_downloader.jsonlib import get_backend  # noqa: E402
+from inspirehep_downloader.dump import iter_json_values  # noqa: E402
+from inspirehep_downloader.records import MetadataRecord  # noqa: E402
+
+
+def make_record(record_id, n_authors, n_references):
+    """创建一条 INSPIRE 结构的完整记录。"""
+    authors = [{
+        "full_name": f"Author{i}, Firstname",
+        "ids": [{"schema": "INSPIRE BAI", "value": f"F.Author{i}.1"}],
+        "affiliations": [{"value": "CERN", "record": {"$ref": "https://inspirehep.net/api/institutions/902725"}}],
+        "raw_affiliations": [{"value": "CERN, Geneva, Switzerland"}],
+        "signature_block": f"ATHARf{i}",
+        "uuid": f"00000000-0000-0000-0000-{i:012d}",
+    } for i in range(n_authors)]
+    references = [{
+        "record": {"$ref": f"https://inspirehep.net/api/literature/{1000000 + i}"},
+        "reference": {
+            "authors": [{"full_name": "Maldacena, J.M."}, {"full_name": "Witten, E."}],
+            "title": {"title": "The Large N limit of superconformal field theories and supergravity"},
+            "publication_info": {"journal_title": "Adv.Theor.Math.Phys.", "journal_volume": "2", "year": 1998,
+                                 "page_start": "231"},
+            "arxiv_eprint": f"hep-th/97{i:05d}",
+            "dois": [f"10.1023/A:{i}"],
+            "label": str(i + 1),
+        },
+    } for i in range(n_references)]
+    return {
+        "id": str(record_id),
+        "created": "2023-01-01T00:00:00+00:00",
+        "updated": "2024-06-01T12:00:00+00:00",
+        "metadata": {
+            "control_number": record_id,
+            "titles": [{"title": f"Holographic entanglement entropy and black hole interiors {record_id}",
+                        "source": "arXiv"}],
+            "authors": authors,
+            "abstracts": [{"value": "We study the entanglement wedge of an evaporating black hole. " * 8,
+                           "source": "arXiv"}],
+            "preprint_date": "2023-01-01",
+            "arxiv_eprints": [{"value": f"2301.{record_id:05d}", "categories": ["hep-th", "gr-qc"]}],
+            "dois": [{"value": f"10.1007/JHEP01(2023){record_id}"}],
+            "citation_count": record_id % 500,
+            "keywords": [{"value": "black hole: information theory"}, {"value": "holography"}],
+            "documents": [{"key": "fulltext.pdf", "url": f"https://inspirehep.net/files/{record_id}.pdf"}],
+            "references": references,
+        },
+    }
+
+
+def measure(label, func, count, nbytes, repeat):
+    """运行 repeat 次并打印最佳一次的吞吐量。"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    line = f"{label:<40} {count / best:>10.0f} records/s"
+    if nbytes:
+        line += f" {nbytes / best / 1e6:>8.1f} MB/s"
+    print(line)
+    return best
+
+
+def consume(iterable):
+    """遍历结果但不保留，避免保留大量解码对象时的垃圾回收开销影响测量。"""
+    for _ in iterable:
+        pass
+
+
+def run_backend(backend, bodies, metadata, jsonl, args):
+    total = sum(len(body) for body in bodies)
+    n = len(bodies)
+
+    print(f"\n后端: {backend.name}")
+    measure("解码完整记录", lambda: consume(backend.loads(body) for body in bodies), n, total, args.repeat)
+    measure("解码完整记录并提取 MetadataRecord",
+            lambda: consume(MetadataRecord.from_hit(backend.loads(body)) for body in bodies), n, total, args.repeat)
+    measure("编码元数据 (indent=2, download_metadata)",
+            lambda: consume(backend.dumpb(item, indent=True) for item in metadata), n, 0, args.repeat)
+    measure("编码元数据 (JSON Lines)", lambda: consume(backend.dumps(item) for item in metadata), n, 0, args.repeat)
+    measure("流式解析 JSON Lines 导出文件 (dump)",
+            lambda: consume(iter_json_values(io.StringIO(jsonl), backend=backend)), n, len(jsonl), args.repeat)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="JSON 后端的基准测试")
+    parser.add_argument("--records", type=int, default=200, help="记录数 (默认值: 200)")
+    parser.add_argument("--authors", type=int, default=30, help="每条记录的作者数 (默认值: 30)")
+    parser.add_argument("--references", type=int, default=250, help="每条记录的参考文献数 (默认值: 250)")
+    parser.add_argument("--repeat", type=int, default=3, help="每个场景的重复次数，取最佳一次 (默认值: 3)")
+    args = parser.parse_args(argv)
+
+    stdlib = get_backend("json")
+    bodies = []
+    metadata = []
+    for i in range(1, args.records + 1):
+        record = make_record(i, args.authors, args.references)
+        bodies.append(stdlib.dumpb(record))
+        metadata.append(MetadataRecord.from_hit(record).to_dict())
+    jsonl = b"\n".join(bodies).decode("utf-8") + "\n"
+    # 不保留原始记录对象，否则每次完整的垃圾回收都要扫描它们，测量结果会被严重放大
+    gc.collect()
+    print(f"{len(bodies)} 条记录，平均 {sum(map(len, bodies)) / len(bodies) / 1024:.1f} KB/条")
+
+    backends = [stdlib]
+    try:
+        backends.append(get_backend("orjson"))
+    except ImportError as e:
+        print(f"跳过 orjson: {e}")
+    for backend in backends:
+        run_backend(backend, bodies, metadata, jsonl, args)
+
+
+if __name__ == "__main__":
+    main()
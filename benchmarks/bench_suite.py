@@ -0,0 +1,191 @@
+"""
+针对本地模拟 INSPIRE 服务器测量客户端和下载器热点路径的吞吐量。
+
+每个场景报告 records/s 和 MB/s (从网络接收的响应体字节数，包括 API 响应和 PDF)；结果以 JSON 保存
+(默认按包版本、时间和 git 提交命名，每次运行一个文件)，可以用 --compare 与之前的结果对比。
+
+用法:
+    python benchmarks/bench_suite.py --records 200 --latency-ms 20 --pdf-kb 512 --record-kb 32
+    python benchmarks/bench_suite.py --compare benchmarks/results/0.1.0-20260101T000000Z-abc1234.json
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, ".."))
+
+import inspirehep_downloader  # noqa: E402
+from inspirehep_downloader.client import InspireHEPClient  # noqa: E402
+from inspirehep_downloader.scheduler import RequestScheduler  # noqa: E402
+from inspirehep_downloader.metrics import MetricsCollector  # noqa: E402
+from inspirehep_downloader.downloader import download_record  # noqa: E402
+from inspirehep_downloader.bulk import download_records  # noqa: E402
+from server import start_mock_inspire  # noqa: E402
+
+
+def make_client(base_url, args):
+    """创建指向模拟服务器、不限速的客户端；附带的 MetricsCollector 统计接收的字节数。"""
+    scheduler = RequestScheduler(rates={}, max_retries=args.retries, backoff_base=0.01, backoff_max=0.1)
+    client = InspireHEPClient(pool_maxsize=max(10, args.api_workers + args.pdf_workers), scheduler=scheduler,
+                              metrics=MetricsCollector())
+    client.BASE_URL = f"{base_url}/api"
+    return client
+
+
+def bench_get_record(client, record_ids, output_dir, args):
+    for record_id in record_ids:
+        client.get_record(record_id)
+
+
+def bench_get_metadata(client, record_ids, output_dir, args):
+    for record_id in record_ids:
+        client.get_metadata(record_id)
+
+
+def bench_download_record(client, record_ids, output_dir, args):
+    for record_id in record_ids:
+        download_record(record_id, output_dir, client=client)
+
+
+def bench_download_records(client, record_ids, output_dir, args):
+    download_records(record_ids, output_dir, api_workers=args.api_workers, pdf_workers=args.pdf_workers,
+                     client=client, batch_size=args.batch_size)
+
+
+SCENARIOS = {
+    "get_record": bench_get_record,
+    "get_metadata": bench_get_metadata,
+    "download_record": bench_download_record,
+    "download_records": bench_download_records,
+}
+
+
+def run_scenario(name, base_url, args):
+    """运行一个场景 repeat 次，返回最佳一次的结果。"""
+    record_ids = [str(i) for i in range(1, args.records + 1)]
+    best = None
+    for _ in range(args.repeat):
+        client = make_client(base_url, args)
+        output_dir = tempfile.mkdtemp()
+        try:
+            # 下载函数的进度输出不计入测量
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                start = time.perf_counter()
+                SCENARIOS[name](client, record_ids, output_dir, args)
+                elapsed = time.perf_counter() - start
+            nbytes = client.metrics.counters["bytes_downloaded_total"]
+        finally:
+            shutil.rmtree(output_dir)
+            client.session.close()
+        if best is None or elapsed < best["seconds"]:
+            best = {
+                "seconds": round(elapsed, 4),
+                "records_per_sec": round(len(record_ids) / elapsed, 2),
+                "mb_per_sec": round(nbytes / elapsed / 1e6, 2),
+            }
+    return best
+
+
+def git_revision():
+    """返回当前 git 提交的短 SHA；不在 git 仓库中时返回 None。"""
+    try:
+        completed = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR, capture_output=True,
+                                   text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return completed.stdout.strip() or None
+
+
+def default_output(results):
+    """默认的结果文件路径：benchmarks/results/{版本}-{UTC 时间}[-{git 提交}].json。"""
+    stamp = datetime.fromisoformat(results["timestamp"]).strftime("%Y%m%dT%H%M%SZ")
+    name = "-".join(part for part in (results["version"], stamp, results["git"]) if part)
+    return os.path.join(BENCH_DIR, "results", f"{name}.json")
+
+
+def compare(results, baseline_path):
+    """打印与基线结果的对比。"""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    print(f"\n与 {baseline_path} (版本 {baseline.get('version')}，提交 {baseline.get('git') or '未知'}) 对比:")
+    if baseline.get("config") != results["config"]:
+        print("  警告: 两次运行的配置不同，结果可能不可比")
+    for name, current in results["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if not previous:
+            print(f"  {name:<18} 基线中没有此场景")
+            continue
+        ratio = current["records_per_sec"] / previous["records_per_sec"]
+        print(f"  {name:<18} {previous['records_per_sec']:>10.1f} -> {current['records_per_sec']:>10.1f} records/s"
+              f"  ({(ratio - 1) * 100:+.1f}%)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="客户端和下载器热点路径的基准测试")
+    parser.add_argument("--records", type=int, default=100, help="每个场景处理的记录数 (默认值: 100)")
+    parser.add_argument("--pdf-kb", type=int, default=256, help="每个 PDF 的大小 (KB) (默认值: 256)")
+    parser.add_argument("--record-kb", type=int, default=0,
+                        help="每条记录 JSON 的大小 (KB)，通过填充摘要达到；0 表示不填充 (约 2 KB) (默认值: 0)")
+    parser.add_argument("--latency-ms", type=float, default=0, help="每个请求的服务器延迟 (毫秒) (默认值: 0)")
+    parser.add_argument("--error-rate", type=float, default=0, help="服务器返回 503 的概率 (默认值: 0)")
+    parser.add_argument("--retries", type=int, default=5, help="客户端重试次数 (默认值: 5)")
+    parser.add_argument("--api-workers", type=int, default=4, help="批量场景的 API 并发数 (默认值: 4)")
+    parser.add_argument("--pdf-workers", type=int, default=4, help="批量场景的 PDF 并发数 (默认值: 4)")
+    parser.add_argument("--batch-size", type=int, default=50, help="批量场景每次获取的记录数 (默认值: 50)")
+    parser.add_argument("--repeat", type=int, default=3, help="每个场景的运行次数，取最佳值 (默认值: 3)")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="只运行指定的场景，可重复 (默认值: 全部)")
+    parser.add_argument("--output", help="结果 JSON 文件 (默认值: benchmarks/results/{版本}-{时间}-{git 提交}.json)")
+    parser.add_argument("--compare", metavar="PATH", help="与之前保存的结果 JSON 对比")
+    args = parser.parse_args(argv)
+
+    config = {key: getattr(args, key) for key in
+              ("records", "pdf_kb", "record_kb", "latency_ms", "error_rate", "retries", "api_workers", "pdf_workers",
+               "batch_size")}
+    server, base_url = start_mock_inspire(num_records=args.records, pdf_size=args.pdf_kb * 1024,
+                                          latency=args.latency_ms / 1000, error_rate=args.error_rate,
+                                          record_size=args.record_kb * 1024)
+
+    results = {
+        "version": inspirehep_downloader.__version__,
+        "git": git_revision(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": config,
+        "scenarios": {},
+    }
+    try:
+        for name in args.scenario or list(SCENARIOS):
+            result = run_scenario(name, base_url, args)
+            results["scenarios"][name] = result
+            print(f"{name:<18} {result['records_per_sec']:>10.1f} records/s {result['mb_per_sec']:>8.1f} MB/s"
+                  f"  ({result['seconds']:.2f} s)")
+    finally:
+        server.shutdown()
+        server.server_close()
+    results["server_requests"] = server.requests
+
+    output = args.output or default_output(results)
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    print(f"\n结果已保存到 {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
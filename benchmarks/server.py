@@ -0,0 +1,180 @@
+"""
+基准测试使用的本地 HTTP 服务器。
+"""
+
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from urllib.parse import urlparse, parse_qs
+
+
+class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+class PayloadHandler(BaseHTTPRequestHandler):
+    """对任何 GET 请求返回服务器上的固定负载。"""
+
+    protocol_version = "HTTP/1.1"
+    # 头部和响应体分开写入时，Nagle 算法与延迟确认会给每个请求增加约 40 ms
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        payload = self.server.payload
+        self.send_response(200)
+        self.send_header("Content-Type", "application/pdf")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        view = memoryview(payload)
+        for start in range(0, len(payload), 1024 * 1024):
+            self.wfile.write(view[start:start + 1024 * 1024])
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(payload: bytes, handler=PayloadHandler):
+    """
+    在后台线程中启动服务器。
+
+    Args:
+        payload: 响应体
+        handler: 请求处理程序类 (默认值: PayloadHandler)
+
+    Returns:
+        (服务器, 基础 URL) 元组；使用完毕后调用 server.shutdown()
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.payload = payload
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def make_record(record_id: int, base_url: str, authors: int = 10, padding: int = 0) -> dict:
+    """
+    生成一条形如 INSPIRE 文献记录的合成记录，PDF 指向模拟服务器。
+
+    Args:
+        record_id: 记录 ID
+        base_url: 模拟服务器的基础 URL
+        authors: 作者数 (默认值: 10)
+        padding: 追加到摘要末尾的字符数，用于调整记录大小 (默认值: 0)
+
+    Returns:
+        原始记录字典
+    """
+    return {
+        "id": str(record_id),
+        "updated": "2024-01-01T00:00:00+00:00",
+        "metadata": {
+            "control_number": record_id,
+            "titles": [{"title": f"Synthetic paper {record_id}"}],
+            "authors": [{"full_name": f"Author, {i}"} for i in range(authors)],
+            "abstracts": [{"value": "Lorem ipsum dolor sit amet. " * 40 + "x" * padding}],
+            "preprint_date": "2024-01-01",
+            "arxiv_eprints": [{"value": f"2401.{record_id:05d}"}],
+            "dois": [{"value": f"10.0000/synthetic.{record_id}"}],
+            "citation_count": record_id % 500,
+            "keywords": [{"value": "benchmark"}, {"value": "synthetic"}],
+            "documents": [{"key": f"{record_id}.pdf", "url": f"{base_url}/files/{record_id}.pdf"}],
+        },
+    }
+
+
+class MockInspireHandler(BaseHTTPRequestHandler):
+    """
+    模拟 INSPIRE API 和 PDF 主机。
+
+    支持 /api/literature/<id>、/api/literature?q=... (包括 "recid:a or recid:b" 批量查询和分页)
+    以及 /files/<id>.pdf。每个请求先等待 server.latency 秒，并以 server.error_rate 的概率返回 503。
+    """
+
+    protocol_version = "HTTP/1.1"
+    # 头部和响应体分开写入时，Nagle 算法与延迟确认会给每个请求增加约 40 ms
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        server = self.server
+        if server.latency:
+            time.sleep(server.latency)
+        with server.lock:
+            server.requests += 1
+            failed = server.error_rate and server.random.random() < server.error_rate
+        if failed:
+            self._send(503, b'{"message": "unavailable"}', "application/json")
+            return
+
+        parsed = urlparse(self.path)
+        if parsed.path.startswith("/files/"):
+            self._send(200, server.payload, "application/pdf")
+        elif parsed.path.startswith("/api/literature/"):
+            record_id = parsed.path.rsplit("/", 1)[1]
+            if not record_id.isdigit() or not 0 < int(record_id) <= server.num_records:
+                self._send(404, b'{"message": "not found"}', "application/json")
+                return
+            self._send_json(make_record(int(record_id), server.base_url, server.authors, server.padding))
+        elif parsed.path == "/api/literature":
+            params = parse_qs(parsed.query)
+            query = params.get("q", [""])[0]
+            recids = re.findall(r"recid:(\d+)", query)
+            if recids:
+                ids = [int(r) for r in recids if 0 < int(r) <= server.num_records]
+            else:
+                size = int(params.get("size", ["10"])[0])
+                page = int(params.get("page", ["1"])[0])
+                ids = list(range((page - 1) * size + 1, min(page * size, server.num_records) + 1))
+            hits = [make_record(i, server.base_url, server.authors, server.padding) for i in ids]
+            total = len(ids) if recids else server.num_records
+            self._send_json({"hits": {"hits": hits, "total": total}})
+        else:
+            self._send(404, b"{}", "application/json")
+
+    def _send_json(self, data):
+        self._send(200, json.dumps(data).encode("utf-8"), "application/json")
+
+    def _send(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_mock_inspire(num_records: int = 1000, pdf_size: int = 1024 * 1024, latency: float = 0.0,
+                       error_rate: float = 0.0, authors: int = 10, seed: int = 0, record_size: int = 0):
+    """
+    在后台线程中启动模拟 INSPIRE 服务器。
+
+    Args:
+        num_records: 可查询的记录数，ID 为 1..num_records (默认值: 1000)
+        pdf_size: 每个 PDF 的字节数 (默认值: 1 MB)
+        latency: 每个请求的附加延迟秒数 (默认值: 0)
+        error_rate: 返回 503 的概率 (默认值: 0)
+        authors: 每条记录的作者数 (默认值: 10)
+        seed: 错误注入的随机种子 (默认值: 0)
+        record_size: 每条记录 JSON 的目标字节数，通过填充摘要达到；0 表示不填充 (默认值: 0)
+
+    Returns:
+        (服务器, 基础 URL) 元组；API 位于 {基础 URL}/api
+    """
+    server, base_url = start_server(b"%PDF-1.4\n" + b"\0" * max(0, pdf_size - 9), MockInspireHandler)
+    server.base_url = base_url
+    server.num_records = num_records
+    server.latency = latency
+    server.error_rate = error_rate
+    server.authors = authors
+    base_size = len(json.dumps(make_record(num_records, base_url, authors)).encode("utf-8"))
+    server.padding = max(0, record_size - base_size)
+    server.random = random.Random(seed)
+    server.lock = threading.Lock()
+    server.requests = 0
+    return server, base_url
@@ -1,12 +1,81 @@
 """
 INSPIRE-HEP 下载器
 一个使用其 API 从 inspirehep.net 下载 PDF 和元数据的 Python 库。
+
+子模块在第一次访问对应名称时才导入，因此 "import inspirehep_downloader" 不会加载
+requests、aiohttp 或 pyarrow 等依赖。
 """
 
+import importlib
+from typing import TYPE_CHECKING
+
 __version__ = "0.1.0"
 
-from .client import InspireHEPClient
-from .downloader import download_pdf, download_metadata, download_record
-from .checkmentor_integration import search_and_download_author_papers
+# 公开名称到其所在子模块的映射
+_EXPORTS = {
+    "InspireHEPClient": "client",
+    "AsyncInspireHEPClient": "async_client",
+    "RecordCache": "cache",
+    "RequestScheduler": "scheduler",
+    "MetricsCollector": "metrics",
+    "ProgressReporter": "progress",
+    "make_progress": "progress",
+    "MetadataIndex": "index",
+    "BlobStore": "store",
+    "download_pdf": "downloader",
+    "download_metadata": "downloader",
+    "download_record": "downloader",
+    "BulkDownloader": "bulk",
+    "download_records": "bulk",
+    "sync_literature": "sync",
+    "JSONLinesWriter": "export",
+    "export_jsonl": "export",
+    "export_table": "export",
+    "search_and_download_author_papers": "author",
+    "GraphCrawler": "graph",
+    "crawl_graph": "graph",
+    "iter_dump_records": "dump",
+    "ingest_dump": "dump",
+    "MetadataRecord": "records",
+    "extract_records": "records",
+    "get_backend": "jsonlib",
+    "set_default_backend": "jsonlib",
+    "PdfResolver": "sources",
+    "HostStats": "sources",
+}
+
+__all__ = list(_EXPORTS)
+
+if TYPE_CHECKING:
+    from .client import InspireHEPClient
+    from .async_client import AsyncInspireHEPClient
+    from .cache import RecordCache
+    from .scheduler import RequestScheduler
+    from .metrics import MetricsCollector
+    from .progress import ProgressReporter, make_progress
+    from .index import MetadataIndex
+    from .store import BlobStore
+    from .downloader import download_pdf, download_metadata, download_record
+    from .bulk import BulkDownloader, download_records
+    from .sync import sync_literature
+    from .export import JSONLinesWriter, export_jsonl, export_table
+    from .author import search_and_download_author_papers
+    from .graph import GraphCrawler, crawl_graph
+    from .dump import iter_dump_records, ingest_dump
+    from .records import MetadataRecord, extract_records
+    from .jsonlib import get_backend, set_default_backend
+    from .sources import PdfResolver, HostStats
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(f".{_EXPORTS[name]}", __name__)
+    value = getattr(module, name)
+    # 缓存到模块命名空间，之后的访问不再经过 __getattr__
+    globals()[name] = value
+    return value
+
 
-__all__ = ["InspireHEPClient", "download_pdf", "download_metadata", "download_record", "search_and_download_author_papers"]
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,177 @@
+"""
+用于与 INSPIRE-HEP API 交互的 asyncio 客户端。
+
+需要可选依赖 aiohttp (pip install inspirehep_downloader[async])。
+"""
+
+import os
+from typing import Dict, List, Optional
+from .records import MetadataRecord, extract_pdf_url, API_URL, METADATA_FIELDS, PDF_FIELDS
+from .jsonlib import JSONBackend, get_backend
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - 取决于安装环境
+    aiohttp = None
+
+
+class AsyncInspireHEPClient:
+    """
+    InspireHEPClient 的异步版本。
+
+    所有请求在同一个事件循环中运行，并共享一个 aiohttp 连接池，
+    因此可以同时进行成千上万个请求而无需为每个请求分配一个线程。
+    建议作为异步上下文管理器使用，以便在结束时关闭连接池。
+    """
+
+    BASE_URL = API_URL
+
+    def __init__(self, timeout: int = 30, limit: int = 100, limit_per_host: int = 0, json_backend=None):
+        """
+        初始化异步 INSPIRE-HEP 客户端。
+
+        Args:
+            timeout: 建立连接和每次读取的超时秒数，与同步客户端相同，不限制整个下载的总时长 (默认值: 30)
+            limit: 连接池中的最大连接总数 (默认值: 100)
+            limit_per_host: 每个主机的最大连接数，0 表示不限制 (默认值: 0)
+            json_backend: 解码响应的 JSON 后端，"auto"、"orjson"、"json" 或 JSONBackend 实例 (默认值: get_backend())
+
+        Raises:
+            ImportError: 如果未安装 aiohttp
+        """
+        if aiohttp is None:
+            raise ImportError("AsyncInspireHEPClient 需要 aiohttp: pip install inspirehep_downloader[async]")
+
+        self.timeout = timeout
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.json_backend = json_backend if isinstance(json_backend, JSONBackend) else get_backend(json_backend)
+        self._session = None
+
+    async def __aenter__(self):
+        self._get_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def _get_session(self) -> "aiohttp.ClientSession":
+        # ClientSession 必须在运行中的事件循环内创建，因此延迟到第一次请求
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.limit, limit_per_host=self.limit_per_host)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                # 不设 total：它会限制包括响应体在内的整个请求，使传输时间较长的大文件下载失败
+                timeout=aiohttp.ClientTimeout(sock_connect=self.timeout, sock_read=self.timeout),
+                headers={"Accept": "application/json"},
+            )
+        return self._session
+
+    async def close(self) -> None:
+        """关闭共享的连接池。"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def _get_json(self, url: str, params: Optional[Dict] = None) -> Dict:
+        async with self._get_session().get(url, params=params) as response:
+            response.raise_for_status()
+            return self.json_backend.loads(await response.read())
+
+    async def search_literature(self, query: str, size: int = 10, page: int = 1,
+                                fields: Optional[List[str]] = None) -> Dict:
+        """
+        在 INSPIRE-HEP 中搜索文献。
+
+        Args:
+            query: 搜索查询字符串 (例如, "author:witten", "title:supersymmetry")
+            size: 返回的结果数 (默认值: 10)
+            page: 用于分页的页码 (默认值: 1)
+            fields: 可选的字段列表，只返回这些元数据字段 (默认值: 全部字段)
+
+        Returns:
+            包含搜索结果的字典
+
+        Raises:
+            aiohttp.ClientError: 如果请求失败
+        """
+        url = f"{self.BASE_URL}/literature"
+        params = {
+            "q": query,
+            "size": size,
+            "page": page
+        }
+        if fields:
+            params["fields"] = ",".join(fields)
+        return await self._get_json(url, params)
+
+    async def get_record(self, record_id: str, fields: Optional[List[str]] = None) -> Dict:
+        """
+        按 ID 获取特定的文献记录。
+
+        Args:
+            record_id: INSPIRE-HEP 记录 ID
+            fields: 可选的字段列表，只返回这些元数据字段 (默认值: 全部字段)
+
+        Returns:
+            包含记录元数据的字典
+
+        Raises:
+            aiohttp.ClientError: 如果请求失败
+        """
+        params = {"fields": ",".join(fields)} if fields else None
+        return await self._get_json(f"{self.BASE_URL}/literature/{record_id}", params)
+
+    async def get_pdf_url(self, record_id: str) -> Optional[str]:
+        """
+        获取特定记录的 PDF URL。
+
+        Args:
+            record_id: INSPIRE-HEP 记录 ID
+
+        Returns:
+            PDF 的 URL (如果可用)，否则为 None
+        """
+        return extract_pdf_url(await self.get_record(record_id, fields=PDF_FIELDS))
+
+    async def get_metadata(self, record_id: str) -> Dict:
+        """
+        获取特定记录的格式化元数据。
+
+        Args:
+            record_id: INSPIRE-HEP 记录 ID
+
+        Returns:
+            包含格式化元数据的字典
+        """
+        record = await self.get_record(record_id, fields=METADATA_FIELDS)
+        return MetadataRecord.from_hit(record, record_id).to_dict()
+
+    async def download_file(self, url: str, output_path: str, chunk_size: int = 65536) -> None:
+        """
+        以流式方式从 URL 下载文件。
+
+        数据先写入 "{output_path}.part"，完成后再原子地重命名为最终路径；下载失败或任务被取消时
+        删除临时文件，因此最终路径上的文件总是完整的。
+
+        Args:
+            url: 要下载的文件的 URL
+            output_path: 文件应保存的路径
+            chunk_size: 每次读取的字节数 (默认值: 65536)
+
+        Raises:
+            aiohttp.ClientError: 如果下载失败
+        """
+        part_path = output_path + ".part"
+        try:
+            async with self._get_session().get(url) as response:
+                response.raise_for_status()
+                with open(part_path, "wb") as f:
+                    async for chunk in response.content.iter_chunked(chunk_size):
+                        f.write(chunk)
+        except BaseException:
+            # 没有断点续传，不完整的临时文件没有用处；BaseException 包括 asyncio.CancelledError
+            if os.path.exists(part_path):
+                os.remove(part_path)
+            raise
+        os.replace(part_path, output_path)
@@ -0,0 +1,181 @@
+"""
+按作者批量下载：解析作者并下载其全部文献的 PDF 和元数据。
+"""
+
+import json
+import os
+import re
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from .client import InspireHEPClient
+from .bulk import BulkDownloader
+from .index import MetadataIndex
+from .store import BlobStore
+from .progress import echo
+
+
+MANIFEST_FILENAME = "manifest.json"
+
+# INSPIRE 作者标识符 (BAI)，例如 "E.Witten.1"
+BAI_PATTERN = re.compile(r"^[A-Za-z][\w'-]*(\.[\w'-]+)*\.\d+$")
+
+
+def is_bai(author: str) -> bool:
+    """判断字符串是否为 INSPIRE 作者标识符 (BAI)。"""
+    return bool(BAI_PATTERN.match(author.strip()))
+
+
+def resolve_author(author: str, client: Optional[InspireHEPClient] = None) -> Dict:
+    """
+    将作者姓名或 BAI 解析为作者信息和对应的文献查询。
+
+    BAI 直接使用，不请求 API；姓名通过作者档案搜索解析，有多个匹配时使用第一个并打印警告。
+
+    Args:
+        author: 作者姓名 (例如, "Witten, Edward") 或 BAI (例如, "E.Witten.1")
+        client: 可选的共享客户端 (默认值: 新建一个 InspireHEPClient)
+
+    Returns:
+        包含 "bai"、"name"、"recid" 和 "query" 键的字典；缺少的信息为 None
+
+    Raises:
+        ValueError: 如果找不到该作者
+        requests.exceptions.RequestException: 如果搜索请求失败
+    """
+    author = author.strip()
+    if is_bai(author):
+        return {"bai": author, "name": None, "recid": None, "query": f"a {author}"}
+
+    if client is None:
+        client = InspireHEPClient()
+    results = client.search_authors(author, size=5, fields=client.AUTHOR_FIELDS)
+    hits = results.get("hits", {}).get("hits", [])
+    if not hits:
+        raise ValueError(f"未找到作者: {author}")
+
+    metadata = hits[0].get("metadata", {})
+    name = metadata.get("name", {}).get("value") or author
+    bai = next((i.get("value") for i in metadata.get("ids", []) if i.get("schema") == "INSPIRE BAI"), None)
+    recid = metadata.get("control_number") or hits[0].get("id")
+    if len(hits) > 1:
+        others = ", ".join(h.get("metadata", {}).get("name", {}).get("value", "N/A") for h in hits[1:])
+        echo(client.progress, f"警告: 找到 {results.get('hits', {}).get('total', len(hits))} 位匹配 \"{author}\" 的作者，"
+                              f"使用 {name} ({bai or recid})；其他匹配: {others}")
+
+    if bai:
+        query = f"a {bai}"
+    elif recid:
+        query = f"authors.recid:{recid}"
+    else:
+        query = f'a "{name}"'
+    return {"bai": bai, "name": name, "recid": str(recid) if recid else None, "query": query}
+
+
+def author_dirname(info: Dict) -> str:
+    """返回作者子目录名：优先使用 BAI，否则使用清理后的姓名。"""
+    name = info.get("bai") or info.get("name") or info.get("recid") or "author"
+    return re.sub(r"[^\w.-]+", "_", name).strip("_") or "author"
+
+
+def search_and_download_author_papers(author: str, output_dir: str = ".", per_author_dir: bool = True,
+                                      download_pdf_flag: bool = True, download_metadata_flag: bool = True,
+                                      api_workers: int = 4, pdf_workers: int = 4, format: str = "json",
+                                      skip_existing: bool = False, limit: Optional[int] = None,
+                                      page_size: int = 100, manifest: bool = True,
+                                      client: Optional[InspireHEPClient] = None,
+                                      index: Optional[MetadataIndex] = None,
+                                      store: Optional[BlobStore] = None) -> Dict:
+    """
+    解析作者并并发下载其全部文献的 PDF 和元数据。
+
+    搜索结果逐页获取 (后台预取下一页)，每条命中记录立即提交给 BulkDownloader，
+    因此翻页与下载同时进行；命中记录已包含所需字段，不再逐条请求 API。
+
+    Args:
+        author: 作者姓名或 BAI (例如, "E.Witten.1")
+        output_dir: 输出目录 (默认值: 当前目录)
+        per_author_dir: 是否把文件保存在以作者 BAI 或姓名命名的子目录中 (默认值: True)
+        download_pdf_flag: 是否下载 PDF (默认值: True)
+        download_metadata_flag: 是否下载元数据 (默认值: True)
+        api_workers: 同时进行的 INSPIRE API 请求数 (默认值: 4)
+        pdf_workers: 同时进行的 PDF 下载数 (默认值: 4)
+        format: 元数据格式，"json" 或 "txt" (默认值: "json")
+        skip_existing: 跳过磁盘上已存在的文件 (默认值: False)
+        limit: 最多下载的文献数，None 表示不限制 (默认值: None)
+        page_size: 每页的搜索结果数 (默认值: 100)
+        manifest: 是否在输出目录中写入 manifest.json 摘要 (默认值: True)
+        client: 可选的共享客户端
+        index: 可选的本地元数据索引
+        store: 可选的内容寻址 PDF 存储
+
+    Returns:
+        包含 "author"、"output_dir"、"matched"、"downloaded"、"failed" 和 "manifest" 键的摘要字典
+
+    Raises:
+        ValueError: 如果找不到该作者
+        requests.exceptions.RequestException: 如果搜索请求失败
+    """
+    if client is None:
+        client = InspireHEPClient(pool_maxsize=api_workers + pdf_workers)
+    info = resolve_author(author, client)
+    if per_author_dir:
+        output_dir = os.path.join(output_dir, author_dirname(info))
+    os.makedirs(output_dir, exist_ok=True)
+    echo(client.progress, f"正在下载作者 {info['name'] or info['bai']} 的文献: {info['query']}")
+
+    started = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    submitted = []
+    with BulkDownloader(output_dir, download_pdf_flag, download_metadata_flag, api_workers=api_workers,
+                        pdf_workers=pdf_workers, format=format, client=client, skip_existing=skip_existing,
+                        index=index, store=store) as bulk:
+        for hit in client.iter_literature(info["query"], size=page_size, limit=limit, fields=client.RECORD_FIELDS):
+            record_id = str(hit.get("id") or hit.get("metadata", {}).get("control_number"))
+            title = (hit.get("metadata", {}).get("titles") or [{}])[0].get("title")
+            submitted.append((title, bulk.submit(record_id, hit)))
+
+    records = []
+    failed = []
+    for title, future in submitted:
+        result = future.result()
+        records.append(dict(result, title=title))
+        if result["error"]:
+            failed.append(result["record_id"])
+
+    summary = {
+        "author": info,
+        "output_dir": output_dir,
+        "matched": len(records),
+        "downloaded": len(records) - len(failed),
+        "failed": failed,
+        "manifest": None,
+    }
+    if manifest:
+        summary["manifest"] = write_manifest(os.path.join(output_dir, MANIFEST_FILENAME), info, started, records)
+    return summary
+
+
+def write_manifest(path: str, info: Dict, started: str, records: List[Dict]) -> str:
+    """
+    以原子方式写入作者下载的摘要清单。
+
+    Args:
+        path: 清单文件路径
+        info: resolve_author 返回的作者信息
+        started: 开始下载的 ISO 时间
+        records: 每条记录的结果字典 (含 "title")
+
+    Returns:
+        清单文件路径
+    """
+    part_path = path + ".part"
+    with open(part_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "author": info,
+            "started": started,
+            "finished": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "total": len(records),
+            "failed": sum(1 for r in records if r["error"]),
+            "records": records,
+        }, f, indent=2, ensure_ascii=False)
+    os.replace(part_path, path)
+    return path
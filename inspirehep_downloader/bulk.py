@@ -0,0 +1,261 @@
+"""
+批量并发下载 INSPIRE-HEP 记录的 PDF 和元数据。
+"""
+
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterable, Optional
+from .client import InspireHEPClient
+from .index import MetadataIndex
+from .store import BlobStore
+from .metrics import inc
+from .progress import echo
+from .downloader import download_pdf, download_metadata, default_pdf_filename, default_metadata_filename
+
+
+class BulkDownloader:
+    """
+    使用有界线程池并发下载多条记录。
+
+    API 请求 (获取记录并写入元数据) 和 PDF 下载分别在两个线程池中运行，
+    因此可以为 INSPIRE API 和 PDF 主机设置不同的并发上限。所有线程共享同一个
+    客户端及其连接池。每条记录的 Future 总会完成，即使处理过程中出现意外的异常。
+    """
+
+    def __init__(self, output_dir: str = ".", download_pdf_flag: bool = True, download_metadata_flag: bool = True,
+                 api_workers: int = 4, pdf_workers: int = 4, format: str = "json",
+                 client: Optional[InspireHEPClient] = None, skip_existing: bool = False,
+                 index: Optional[MetadataIndex] = None, store: Optional[BlobStore] = None):
+        """
+        初始化批量下载器。
+
+        Args:
+            output_dir: 文件应保存的目录 (默认值: 当前目录)
+            download_pdf_flag: 是否下载 PDF (默认值: True)
+            download_metadata_flag: 是否下载元数据 (默认值: True)
+            api_workers: 同时进行的 INSPIRE API 请求数 (默认值: 4)
+            pdf_workers: 同时进行的 PDF 下载数 (默认值: 4)
+            format: 元数据格式，"json" 或 "txt" (默认值: "json")
+            client: 可选的共享客户端 (默认值: 新建一个连接池足够大的 InspireHEPClient)
+            skip_existing: 跳过磁盘上已存在的文件；全部存在时不请求 API (默认值: False)
+            index: 可选的本地元数据索引，随下载逐条更新
+            store: 可选的内容寻址 PDF 存储，相同的 PDF 只下载和保存一次
+        """
+        if api_workers < 1 or pdf_workers < 1:
+            raise ValueError("api_workers 和 pdf_workers 必须至少为 1")
+
+        self.output_dir = output_dir
+        self.download_pdf_flag = download_pdf_flag
+        self.download_metadata_flag = download_metadata_flag
+        self.format = format
+        self.skip_existing = skip_existing
+        self.index = index
+        self.store = store
+        self.client = client or InspireHEPClient(pool_maxsize=api_workers + pdf_workers)
+        self._api_pool = ThreadPoolExecutor(max_workers=api_workers)
+        self._pdf_pool = ThreadPoolExecutor(max_workers=pdf_workers)
+
+    def submit(self, record_id: str, record: Optional[Dict] = None) -> Future:
+        """
+        提交一条记录进行下载。
+
+        Args:
+            record_id: INSPIRE-HEP 记录 ID
+            record: 可选的已获取原始记录；提供时不再请求 API
+
+        Returns:
+            在该记录的所有下载完成后返回结果字典的 Future，结果包含
+            "record_id"、"metadata"、"pdf" 和 "error" 键
+        """
+        future = self._new_future(str(record_id))
+        self._api_pool.submit(self._api_stage, future, str(record_id), record)
+        return future
+
+    def submit_batch(self, record_ids: Iterable[str], batch_size: int = 50) -> Dict[str, Future]:
+        """
+        提交一批记录进行下载。
+
+        整批记录在 API 线程池中通过一次 get_records 请求获取，因此多个批次的获取彼此并行，
+        并与已获取记录的 PDF 下载重叠；批量请求失败或没有返回的记录退回到逐条获取。
+
+        Args:
+            record_ids: 一批 INSPIRE-HEP 记录 ID
+            batch_size: 传给 get_records 的每次请求记录数 (默认值: 50)
+
+        Returns:
+            以记录 ID 为键的 Future 字典，结果与 submit 相同
+        """
+        futures = {}
+        for record_id in map(str, record_ids):
+            if record_id not in futures:
+                futures[record_id] = self._new_future(record_id)
+        self._api_pool.submit(self._batch_stage, futures, batch_size)
+        return futures
+
+    def close(self, wait: bool = True) -> None:
+        """
+        关闭线程池。
+
+        Args:
+            wait: 是否等待所有已提交的记录完成 (默认值: True)
+        """
+        # API 阶段可能还会向 PDF 线程池提交任务，因此必须先关闭它
+        self._api_pool.shutdown(wait=wait)
+        self._pdf_pool.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def is_complete(self, record_id: str) -> bool:
+        """
+        判断在 skip_existing 模式下该记录是否已无需任何下载。
+
+        Args:
+            record_id: INSPIRE-HEP 记录 ID
+
+        Returns:
+            如果所有请求的文件都已存在于磁盘上，则为 True
+        """
+        _, need_metadata, need_pdf = self._check_existing(str(record_id))
+        return not need_metadata and not need_pdf
+
+    def _check_existing(self, record_id: str):
+        result = {"record_id": record_id, "metadata": None, "pdf": None, "error": None}
+        need_metadata = self.download_metadata_flag
+        need_pdf = self.download_pdf_flag
+
+        if self.skip_existing:
+            metadata_path = os.path.join(self.output_dir, default_metadata_filename(record_id, self.format))
+            if need_metadata and os.path.exists(metadata_path):
+                result["metadata"] = metadata_path
+                need_metadata = False
+            pdf_path = os.path.join(self.output_dir, default_pdf_filename(record_id))
+            if need_pdf and os.path.exists(pdf_path):
+                result["pdf"] = pdf_path
+                need_pdf = False
+
+        return result, need_metadata, need_pdf
+
+    def _new_future(self, record_id: str) -> Future:
+        future = Future()
+        future.set_running_or_notify_cancel()
+        if self.client.progress is not None:
+            self.client.progress.record_started(record_id)
+        return future
+
+    def _batch_stage(self, futures: Dict[str, Future], batch_size: int) -> None:
+        records = {}
+        try:
+            to_fetch = [record_id for record_id in futures if not self.is_complete(record_id)]
+            if to_fetch:
+                records, _ = self.client.get_records(to_fetch, chunk_size=batch_size,
+                                                     fields=self.client.RECORD_FIELDS)
+        except Exception as e:
+            echo(self.client.progress, f"警告: 批量获取记录失败，改为逐条获取: {e}")
+        for record_id, future in futures.items():
+            self._api_stage(future, record_id, records.get(record_id))
+
+    def _api_stage(self, future: Future, record_id: str, record: Optional[Dict]) -> None:
+        result = {"record_id": record_id, "metadata": None, "pdf": None, "error": None}
+        try:
+            result, need_metadata, need_pdf = self._check_existing(record_id)
+            if not need_metadata and not need_pdf:
+                return
+
+            try:
+                if record is None:
+                    record = self.client.get_record(record_id, fields=self.client.RECORD_FIELDS)
+            except Exception as e:
+                _add_error(result, f"无法获取记录: {e}")
+                return
+
+            if need_metadata:
+                try:
+                    result["metadata"] = download_metadata(record_id, self.output_dir, format=self.format,
+                                                           client=self.client, record=record, index=self.index)
+                except Exception as e:
+                    _add_error(result, f"无法下载元数据: {e}")
+
+            if need_pdf:
+                self._pdf_pool.submit(self._pdf_stage, future, result, record)
+                # PDF 阶段负责完成 Future
+                future = None
+        except BaseException as e:
+            _add_error(result, f"处理记录失败: {e}")
+        finally:
+            if future is not None:
+                self._finish(future, result)
+
+    def _pdf_stage(self, future: Future, result: Dict, record: Dict) -> None:
+        try:
+            result["pdf"] = download_pdf(result["record_id"], self.output_dir, client=self.client, record=record,
+                                         index=self.index, store=self.store)
+        except BaseException as e:
+            _add_error(result, f"无法下载 PDF: {e}")
+        finally:
+            self._finish(future, result)
+
+    def _finish(self, future: Future, result: Dict) -> None:
+        try:
+            inc(self.client.metrics, "records_failed_total" if result["error"] else "records_downloaded_total")
+            if self.client.progress is not None:
+                self.client.progress.record_finished(result["record_id"], not result["error"])
+        except BaseException as e:
+            future.set_exception(e)
+        else:
+            future.set_result(result)
+
+
+def _add_error(result: Dict, message: str) -> None:
+    # 同一条记录的元数据和 PDF 可能都失败，保留所有错误
+    result["error"] = message if not result["error"] else f"{result['error']}; {message}"
+
+
+def download_records(record_ids: Iterable[str], output_dir: str = ".", download_pdf_flag: bool = True,
+                     download_metadata_flag: bool = True, api_workers: int = 4, pdf_workers: int = 4,
+                     format: str = "json", client: Optional[InspireHEPClient] = None,
+                     skip_existing: bool = False, batch_size: int = 50,
+                     index: Optional[MetadataIndex] = None, store: Optional[BlobStore] = None) -> Dict[str, Dict]:
+    """
+    并发下载多条 INSPIRE-HEP 记录的 PDF 和元数据。
+
+    启用 batch_size 时，记录通过 InspireHEPClient.get_records 按批获取，每批只需
+    一次 API 请求；各批次在 API 线程池中并行获取，并与 PDF 下载重叠。批量请求中没有
+    返回的记录会退回到逐条获取。
+
+    Args:
+        record_ids: INSPIRE-HEP 记录 ID 的可迭代对象
+        output_dir: 文件应保存的目录 (默认值: 当前目录)
+        download_pdf_flag: 是否下载 PDF (默认值: True)
+        download_metadata_flag: 是否下载元数据 (默认值: True)
+        api_workers: 同时进行的 INSPIRE API 请求数 (默认值: 4)
+        pdf_workers: 同时进行的 PDF 下载数 (默认值: 4)
+        format: 元数据格式，"json" 或 "txt" (默认值: "json")
+        client: 可选的共享客户端
+        skip_existing: 跳过磁盘上已存在的文件 (默认值: False)
+        batch_size: 每次批量获取的记录数，0 表示逐条获取 (默认值: 50)
+        index: 可选的本地元数据索引
+        store: 可选的内容寻址 PDF 存储
+
+    Returns:
+        以记录 ID 为键、每条记录结果字典为值的字典
+    """
+    ids = list(dict.fromkeys(str(record_id) for record_id in record_ids))
+    futures = {}
+    with BulkDownloader(output_dir, download_pdf_flag, download_metadata_flag, api_workers=api_workers,
+                        pdf_workers=pdf_workers, format=format, client=client,
+                        skip_existing=skip_existing, index=index,
+                        store=store) as bulk:
+        if bulk.client.progress is not None:
+            bulk.client.progress.add_total(len(ids))
+        if batch_size < 1 or not (download_pdf_flag or download_metadata_flag):
+            for record_id in ids:
+                futures[record_id] = bulk.submit(record_id)
+        else:
+            for start in range(0, len(ids), batch_size):
+                futures.update(bulk.submit_batch(ids[start:start + batch_size], batch_size=batch_size))
+
+    return {record_id: future.result() for record_id, future in futures.items()}
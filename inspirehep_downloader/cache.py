@@ -0,0 +1,158 @@
+"""
+INSPIRE-HEP API 响应的持久化磁盘缓存。
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from typing import Dict, Optional
+from urllib.parse import urlencode
+
+
+CacheEntry = namedtuple("CacheEntry", ["body", "etag", "last_modified", "stored_at"])
+
+
+class RecordCache:
+    """
+    基于 SQLite 的 API 响应缓存。
+
+    条目在 TTL 内直接返回；过期后客户端使用 ETag / Last-Modified 发送条件请求，
+    服务器返回 304 时只需刷新时间戳。缓存总大小超过字节预算时，按最近访问时间
+    淘汰最久未使用的条目。同一个缓存对象可以在多个线程之间共享。
+    """
+
+    def __init__(self, path: str, ttl: float = 86400, max_bytes: int = 256 * 1024 * 1024):
+        """
+        初始化缓存。
+
+        Args:
+            path: 缓存目录 (不存在时自动创建)，数据库存放在其中的 cache.sqlite
+            ttl: 条目无需重新验证即可直接使用的秒数 (默认值: 86400)
+            max_bytes: 缓存响应体的总字节预算 (默认值: 256 MB)
+        """
+        directory = os.path.expanduser(path)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, "cache.sqlite")
+
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " key TEXT PRIMARY KEY,"
+                " body BLOB NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " etag TEXT,"
+                " last_modified TEXT,"
+                " stored_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at)")
+
+    @staticmethod
+    def make_key(url: str, params: Optional[Dict] = None) -> str:
+        """
+        为请求生成缓存键。
+
+        Args:
+            url: 请求 URL
+            params: 可选的查询参数
+
+        Returns:
+            与参数顺序无关的缓存键
+        """
+        if not params:
+            return url
+        return f"{url}?{urlencode(sorted(params.items()))}"
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """
+        查找缓存条目并更新其访问时间。
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            缓存条目 (无论是否过期)，未命中时为 None
+        """
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT body, etag, last_modified, stored_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        return CacheEntry(*row)
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        """
+        判断条目是否仍在 TTL 内。
+
+        Args:
+            entry: 缓存条目
+
+        Returns:
+            如果条目无需重新验证即可使用，则为 True
+        """
+        return time.time() - entry.stored_at < self.ttl
+
+    def set(self, key: str, body: bytes, etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        """
+        存储响应体，并在超出字节预算时淘汰最久未使用的条目。
+
+        Args:
+            key: 缓存键
+            body: 原始响应体
+            etag: 可选的 ETag 响应头
+            last_modified: 可选的 Last-Modified 响应头
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, body, size, etag, last_modified, stored_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, sqlite3.Binary(body), len(body), etag, last_modified, now, now),
+            )
+            self._evict()
+
+    def touch(self, key: str) -> None:
+        """
+        在重新验证成功 (304) 后刷新条目的存储时间。
+
+        Args:
+            key: 缓存键
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE entries SET stored_at = ?, accessed_at = ? WHERE key = ?", (now, now, key))
+
+    def clear(self) -> None:
+        """删除所有缓存条目。"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM entries")
+
+    def total_bytes(self) -> int:
+        """返回缓存响应体的总字节数。"""
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def close(self) -> None:
+        """关闭数据库连接。"""
+        with self._lock:
+            self._conn.close()
+
+    def _evict(self) -> None:
+        # 调用方必须持有锁并处于事务中
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._conn.execute("SELECT key, size FROM entries ORDER BY accessed_at").fetchall():
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
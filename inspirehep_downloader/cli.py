@@ -3,13 +3,221 @@ INSPIRE-HEP 下载器的命令行界面。
 """
 
 import argparse
+import json
+import os
 import sys
-from .downloader import download_pdf, download_metadata, download_record
-from .client import InspireHEPClient
+# 这里只导入轻量模块；依赖 requests 的客户端和下载模块在解析参数后才导入，
+# 因此 --help、参数错误和 "query" 子命令不需要加载网络栈
+from .export import (
+    COMPRESSIONS, TABLE_FORMATS, JSONLinesWriter, open_table_writer, iter_search_metadata, iter_records_metadata
+)
+from .index import ORDERS, MetadataIndex
+from .jsonlib import BACKENDS, set_default_backend
+from .metrics import MetricsCollector
+from .progress import PROGRESS_MODES, make_progress
+from .store import BlobStore
 
 
-def main():
+def read_record_ids(stream):
+    """
+    从文本流中读取记录 ID，每行一个。
+
+    空行和以 "#" 开头的行会被忽略。
+
+    Args:
+        stream: 可迭代的文本行 (例如打开的文件或 sys.stdin)
+
+    Returns:
+        记录 ID 的生成器
+    """
+    for line in stream:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            yield line
+
+
+def read_ids_file(path):
+    """
+    从文件或标准输入 ("-") 读取记录 ID。
+
+    Args:
+        path: ID 文件路径
+
+    Returns:
+        记录 ID 的生成器
+    """
+    if path == "-":
+        yield from read_record_ids(sys.stdin)
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            yield from read_record_ids(f)
+
+
+def build_client(args):
+    """
+    根据命令行参数创建共享客户端。
+
+    Args:
+        args: 解析后的命令行参数
+
+    Returns:
+        InspireHEPClient 实例
+    """
+    from .client import InspireHEPClient
+    from .cache import RecordCache
+    from .scheduler import RequestScheduler
+    from .sources import PdfResolver
+    
+    cache = None
+    cache_dir = args.cache_dir or os.environ.get("INSPIREHEP_CACHE_DIR")
+    if cache_dir and not args.no_cache:
+        cache = RecordCache(cache_dir, ttl=args.cache_ttl, max_bytes=args.cache_max_mb * 1024 * 1024)
+    rates = None if args.rate is None else {"inspirehep.net": args.rate}
+    scheduler = RequestScheduler(rates=rates, max_retries=args.retries)
+    metrics = MetricsCollector() if args.stats or args.metrics else None
+    chunk_size = InspireHEPClient.DOWNLOAD_CHUNK_SIZE if args.chunk_size_kb is None else args.chunk_size_kb * 1024
+    pdf_resolver = None
+    if args.hedge_after is not None or args.unpaywall_email:
+        pdf_resolver = PdfResolver(hedge_after=2.0 if args.hedge_after is None else args.hedge_after,
+                                   unpaywall_email=args.unpaywall_email)
+    return InspireHEPClient(pool_maxsize=max(10, args.api_workers + args.pdf_workers), cache=cache,
+                            scheduler=scheduler, chunk_size=chunk_size, preallocate=args.preallocate,
+                            metrics=metrics, pdf_resolver=pdf_resolver)
+
+
+def print_hit(index, hit):
+    """
+    打印一条搜索结果。
+
+    Args:
+        index: 结果序号
+        hit: 搜索结果中的单条原始记录
+    """
+    metadata = hit.get("metadata", {})
+    record_id = hit.get("id", "N/A")
+    title = metadata.get("titles", [{}])[0].get("title", "N/A")
+    authors = metadata.get("authors", [])
+    author_names = ", ".join([a.get("full_name", "") for a in authors[:3]])
+    if len(authors) > 3:
+        author_names += f" (以及另外 {len(authors) - 3} 位)"
+    
+    print(f"{index}. [{record_id}] {title}")
+    print(f"   作者: {author_names}")
+    print()
+
+
+def print_indexed(index, row):
+    """
+    打印一条本地索引检索结果。
+
+    Args:
+        index: 结果序号
+        row: MetadataIndex.search 返回的单条结果
+    """
+    authors = row["authors"]
+    author_names = ", ".join(authors[:3])
+    if len(authors) > 3:
+        author_names += f" (以及另外 {len(authors) - 3} 位)"
+    
+    print(f"{index}. [{row['record_id']}] {row['title'] or 'N/A'}")
+    print(f"   作者: {author_names}")
+    print(f"   日期: {row['publication_date'] or 'N/A'}  引用: {row['citations'] or 0}")
+    for path in (row["metadata_path"], row["pdf_path"]):
+        if path:
+            print(f"   文件: {path}")
+    print()
+
+
+def query_main(argv=None):
+    """离线检索本地元数据索引的 "query" 子命令。"""
+    parser = argparse.ArgumentParser(
+        prog="inspirehep-download query",
+        description="离线检索下载时建立的本地元数据索引",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+示例:
+  # 摘要、标题或关键字中提到 "black hole" 的论文
+  inspirehep-download query "black hole" --index ./mirror/index.sqlite
+
+  # 某位作者被引用最多的论文
+  inspirehep-download query --author witten --order citations --limit 10
+        """
+    )
+    
+    parser.add_argument(
+        "text",
+        nargs="*",
+        help="全文查询，匹配标题、摘要、关键字和作者 (支持 FTS5 语法)"
+    )
+    
+    parser.add_argument(
+        "--index",
+        default=os.environ.get("INSPIREHEP_INDEX"),
+        help="索引文件或其所在目录 (默认值: $INSPIREHEP_INDEX)"
+    )
+    
+    parser.add_argument(
+        "--author", "-a",
+        help="只返回作者名包含此字符串的记录 (不区分大小写)"
+    )
+    
+    parser.add_argument(
+        "--order",
+        choices=ORDERS,
+        default="relevance",
+        help="排序方式 (默认值: relevance；无全文查询时按引用数)"
+    )
+    
+    parser.add_argument(
+        "--limit", "-n",
+        type=int,
+        default=20,
+        help="最多显示的结果数 (默认值: 20)"
+    )
+    
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="以 JSON Lines 格式输出结果"
+    )
+    
+    args = parser.parse_args(argv)
+    
+    if not args.index:
+        print("错误: 请使用 --index 或 $INSPIREHEP_INDEX 指定索引", file=sys.stderr)
+        return 1
+    if not os.path.exists(os.path.expanduser(args.index)):
+        print(f"错误: 索引不存在: {args.index}", file=sys.stderr)
+        return 1
+    
+    try:
+        with MetadataIndex(args.index) as index:
+            rows = index.search(" ".join(args.text) or None, author=args.author, order=args.order,
+                                limit=args.limit)
+    except Exception as e:
+        print(f"检索期间出错: {e}", file=sys.stderr)
+        return 1
+    
+    if args.json:
+        for row in rows:
+            print(json.dumps(row, ensure_ascii=False))
+        return 0
+    
+    if not rows:
+        print("未找到结果。")
+        return 0
+    for i, row in enumerate(rows, 1):
+        print_indexed(i, row)
+    return 0
+
+
+def main(argv=None):
     """CLI 的主入口点。"""
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv and argv[0] == "query":
+        return query_main(argv[1:])
+    
     parser = argparse.ArgumentParser(
         description="从 inspirehep.net 下载 PDF 和元数据",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -32,6 +240,49 @@ def main():
 
   # 搜索记录
   inspirehep-download --search "author:witten" --size 5
+
+  # 自动翻页列出最多 500 个搜索结果
+  inspirehep-download --search "author:witten" --size 100 --limit 500
+
+  # 并发下载文件中列出的所有记录 (每行一个 ID，"-" 表示标准输入)
+  inspirehep-download --ids-file ids.txt --api-workers 4 --pdf-workers 8
+
+  # 将全部搜索结果的元数据流式导出到一个压缩的 JSON Lines 文件
+  inspirehep-download --search "author:witten" --jsonl witten.jsonl.gz
+
+  # 将搜索结果导出为 Parquet 表格，便于分析
+  inspirehep-download --search "author:witten" --table witten.parquet
+
+  # 离线导入批量导出文件，生成 Parquet 表格和本地索引
+  inspirehep-download --dump literature.jsonl.gz --table literature.parquet --index ./literature.sqlite
+
+  # 增量同步：只下载自上次运行以来更新过的记录
+  inspirehep-download --sync "author:witten" -o ./witten_mirror
+
+  # 下载某位作者的全部文献到 ./papers/E.Witten.1/，并写入 manifest.json 摘要
+  inspirehep-download --author E.Witten.1 -o ./papers --skip-existing
+
+  # 爬取记录的参考文献和引用 (两层，最多 300 条记录)，并下载所有访问到的记录
+  inspirehep-download 12345 --graph --depth 2 --max-nodes 300 --graph-download -o ./graph
+
+  # 使用磁盘缓存 (也可以通过 INSPIREHEP_CACHE_DIR 环境变量启用)
+  inspirehep-download 12345 --cache-dir ~/.cache/inspirehep --cache-ttl 3600
+
+  # 下载时更新本地元数据索引，之后可以离线检索
+  inspirehep-download --ids-file ids.txt -o ./mirror --index ./mirror/index.sqlite
+  inspirehep-download query "black hole" --index ./mirror/index.sqlite
+
+  # 多个项目共享一个 PDF 存储，相同的 PDF 只下载和保存一次
+  inspirehep-download --ids-file ids.txt -o ./project_a --store ~/.cache/inspirehep/pdfs
+
+  # 在 INSPIRE、arXiv 及其镜像之间选择 PDF 来源，1 秒内没有响应就同时请求下一个来源
+  inspirehep-download --ids-file ids.txt --hedge-after 1
+
+  # 以 JSON Lines 在标准错误上输出进度事件，供编排程序解析
+  inspirehep-download --ids-file ids.txt --progress json
+
+  # 结束时打印各阶段耗时摘要，并写入 Prometheus 文本文件
+  inspirehep-download --ids-file ids.txt --stats --metrics /var/lib/node_exporter/inspirehep.prom
         """
     )
     
@@ -75,17 +326,418 @@ def main():
         "--size",
         type=int,
         default=10,
-        help="要显示的搜索结果数 (默认值: 10)"
+        help="要显示的搜索结果数；与 --limit 一起使用时为每页大小 (默认值: 10)"
+    )
+    
+    parser.add_argument(
+        "--limit",
+        type=int,
+        help="自动翻页并最多列出这么多搜索结果"
+    )
+    
+    parser.add_argument(
+        "--ids-file",
+        help="包含记录 ID 的文件 (每行一个)，用于批量并发下载；使用 \"-\" 从标准输入读取"
+    )
+    
+    parser.add_argument(
+        "--api-workers",
+        type=int,
+        default=4,
+        help="批量模式下同时进行的 INSPIRE API 请求数 (默认值: 4)"
+    )
+    
+    parser.add_argument(
+        "--pdf-workers",
+        type=int,
+        default=4,
+        help="批量模式下同时进行的 PDF 下载数 (默认值: 4)"
+    )
+    
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=50,
+        help="批量模式下每次 API 请求获取的记录数，0 表示逐条获取 (默认值: 50)"
+    )
+    
+    parser.add_argument(
+        "--jsonl",
+        metavar="PATH",
+        help="将 --search 的全部结果 (可用 --limit 限制) 或 --ids-file 中记录的元数据导出到一个 JSON Lines 文件；"
+             "\"-\" 表示标准输出"
+    )
+    
+    parser.add_argument(
+        "--table",
+        metavar="PATH",
+        help="与 --jsonl 类似，但导出为扁平化的表格；.parquet 扩展名写入 Parquet，其余写入 CSV"
+    )
+    
+    parser.add_argument(
+        "--table-format",
+        choices=TABLE_FORMATS,
+        help="表格格式 (默认值: 根据扩展名推断)"
+    )
+    
+    parser.add_argument(
+        "--compression",
+        choices=COMPRESSIONS,
+        help="导出文件的压缩格式 (默认值: 根据扩展名推断，.gz 为 gzip，.zst 为 zstd)；对 Parquet 表格是列压缩编码 (默认值: snappy)"
+    )
+    
+    parser.add_argument(
+        "--dump",
+        metavar="PATH",
+        help="离线导入 INSPIRE 批量导出文件 (JSON Lines 或 JSON 数组，可为 .gz / .zst 压缩)，"
+             "写入 --jsonl、--table 和/或 --index，不访问网络"
+    )
+    
+    parser.add_argument(
+        "--sync",
+        metavar="QUERY",
+        help="增量同步此搜索查询匹配的记录，只下载自上次同步以来更新过的记录"
+    )
+    
+    parser.add_argument(
+        "--author",
+        metavar="NAME_OR_BAI",
+        help="下载此作者的全部文献 (可用 --limit 限制)；可以是作者标识符 (例如, E.Witten.1) 或姓名"
+    )
+    
+    parser.add_argument(
+        "--flat",
+        action="store_true",
+        help="--author 模式下直接保存到输出目录，不创建以作者命名的子目录"
+    )
+    
+    parser.add_argument(
+        "--no-manifest",
+        action="store_true",
+        help="--author 模式下不写入 manifest.json 摘要"
+    )
+    
+    parser.add_argument(
+        "--graph",
+        action="store_true",
+        help="从 record_id (或 --ids-file 中的记录) 出发，广度优先爬取参考文献和引用关系，并把边写入 CSV 文件"
+    )
+    
+    parser.add_argument(
+        "--depth",
+        type=int,
+        default=1,
+        help="--graph 模式下从种子出发的最大层数 (默认值: 1)"
+    )
+    
+    parser.add_argument(
+        "--max-nodes",
+        type=int,
+        default=500,
+        help="--graph 模式下最多访问的记录数 (默认值: 500)"
+    )
+    
+    parser.add_argument(
+        "--direction",
+        choices=["both", "references", "citations"],
+        default="both",
+        help="--graph 模式下扩展的方向 (默认值: both)"
+    )
+    
+    parser.add_argument(
+        "--edges",
+        metavar="PATH",
+        help="--graph 模式下的边文件 (默认值: {output-dir}/graph_edges.csv)"
+    )
+    
+    parser.add_argument(
+        "--graph-download",
+        action="store_true",
+        help="--graph 模式下同时下载所有访问到的记录的元数据和 PDF"
+    )
+    
+    parser.add_argument(
+        "--state-file",
+        help="增量同步的状态文件 (默认值: {output-dir}/.inspirehep_sync.json)"
+    )
+    
+    parser.add_argument(
+        "--rate",
+        type=float,
+        help="对 inspirehep.net 的最大每秒请求数 (默认值: 3)"
+    )
+    
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=3,
+        help="遇到 429/5xx 或连接错误时每个请求的最大重试次数 (默认值: 3)"
+    )
+    
+    parser.add_argument(
+        "--chunk-size-kb",
+        type=int,
+        help="PDF 下载的读缓冲区大小 (KB) (默认值: 256)"
+    )
+    
+    parser.add_argument(
+        "--preallocate",
+        action="store_true",
+        help="根据 Content-Length 预先分配 PDF 文件的磁盘空间"
+    )
+    
+    parser.add_argument(
+        "--skip-existing",
+        action="store_true",
+        help="跳过磁盘上已完整存在的文件，不进行任何网络请求"
+    )
+    
+    parser.add_argument(
+        "--hedge-after",
+        type=float,
+        metavar="SECONDS",
+        help="启用多来源 PDF 下载：按主机的历史延迟和成功率排序来源，首选来源在此秒数内没有响应时同时请求下一个来源"
+    )
+    
+    parser.add_argument(
+        "--unpaywall-email",
+        default=os.environ.get("INSPIREHEP_UNPAYWALL_EMAIL"),
+        help="记录自身的 PDF 来源都失败时，用此邮箱通过 Unpaywall 查找 DOI 的开放获取副本；隐含启用多来源下载 (默认值: $INSPIREHEP_UNPAYWALL_EMAIL)"
+    )
+    
+    parser.add_argument(
+        "--json-backend",
+        choices=BACKENDS,
+        default=os.environ.get("INSPIREHEP_JSON_BACKEND", "auto"),
+        help="JSON 编解码后端：auto 在安装了 orjson 时使用 orjson，否则使用标准库 (默认值: $INSPIREHEP_JSON_BACKEND 或 auto)"
+    )
+    
+    parser.add_argument(
+        "--index",
+        default=os.environ.get("INSPIREHEP_INDEX"),
+        help="下载元数据时同时更新此本地索引 (文件或目录)，供 \"query\" 子命令离线检索 (默认值: $INSPIREHEP_INDEX)"
+    )
+    
+    parser.add_argument(
+        "--store",
+        default=os.environ.get("INSPIREHEP_STORE"),
+        help="按内容寻址的 PDF 存储目录；输出文件为指向存储的硬链接，已存储的 URL 不再下载 (默认值: $INSPIREHEP_STORE)"
+    )
+    
+    parser.add_argument(
+        "--progress",
+        choices=PROGRESS_MODES,
+        default="auto",
+        help="下载进度的显示方式：auto 在终端上显示进度行，否则不输出；json 在标准错误上逐行输出 JSON 事件 (默认值: auto)"
+    )
+    
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="结束时在标准错误上打印各阶段耗时、字节数、重试和缓存命中的摘要"
+    )
+    
+    parser.add_argument(
+        "--metrics",
+        metavar="PATH",
+        help="结束时把指标以 Prometheus 文本格式写入此文件 (同时打印摘要)"
+    )
+    
+    parser.add_argument(
+        "--cache-dir",
+        help="启用 API 响应磁盘缓存并存放在此目录 (默认值: $INSPIREHEP_CACHE_DIR)"
+    )
+    
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=86400,
+        help="缓存条目无需重新验证即可使用的秒数 (默认值: 86400)"
+    )
+    
+    parser.add_argument(
+        "--cache-max-mb",
+        type=int,
+        default=256,
+        help="缓存的最大大小，超出后淘汰最久未使用的条目 (默认值: 256)"
+    )
+    
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="绕过磁盘缓存，即使设置了 --cache-dir 或 $INSPIREHEP_CACHE_DIR"
     )
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
+    
+    try:
+        set_default_backend(args.json_backend)
+    except (ImportError, ValueError) as e:
+        print(f"错误: {e}", file=sys.stderr)
+        return 1
+    
+    if args.dump:
+        return ingest_main(args)
+    
+    try:
+        client = build_client(args)
+    except Exception as e:
+        print(f"错误: 无法初始化客户端: {e}", file=sys.stderr)
+        return 1
+    
+    index = None
+    store = None
+    downloading = not (args.jsonl or args.table or args.search)
+    if downloading:
+        client.progress = make_progress(args.progress)
+    try:
+        if args.index and downloading:
+            index = MetadataIndex(args.index)
+        if args.store and downloading and not args.metadata_only:
+            store = BlobStore(args.store)
+    except Exception as e:
+        print(f"错误: 无法打开索引或存储: {e}", file=sys.stderr)
+        if index is not None:
+            index.close()
+        return 1
+    
+    try:
+        return run(parser, args, client, index, store)
+    finally:
+        if index is not None:
+            index.close()
+        if store is not None:
+            store.close()
+        if client.progress is not None:
+            client.progress.close()
+        if client.metrics is not None:
+            report_metrics(client.metrics, args.metrics)
+
+
+def ingest_main(args):
+    """
+    离线导入批量导出文件，写入 --jsonl、--table 和 --index，不创建网络客户端。
+
+    Args:
+        args: 解析后的命令行参数
+
+    Returns:
+        进程退出码
+    """
+    from .dump import ingest_dump
+    
+    if not (args.jsonl or args.table or args.index):
+        print("错误: --dump 需要 --jsonl、--table 或 --index 中的至少一个", file=sys.stderr)
+        return 1
+    
+    writers = []
+    index = None
+    try:
+        if args.jsonl:
+            writers.append(JSONLinesWriter(args.jsonl, args.compression))
+        if args.table:
+            writers.append(open_table_writer(args.table, args.table_format, args.compression))
+        if args.index:
+            index = MetadataIndex(args.index)
+        print(f"正在导入: {args.dump}", file=sys.stderr)
+        count = ingest_dump(args.dump, writers, index=index, limit=args.limit)
+    except Exception as e:
+        print(f"导入期间出错: {e}", file=sys.stderr)
+        return 1
+    finally:
+        for writer in writers:
+            writer.close()
+        if index is not None:
+            index.close()
+    
+    targets = ", ".join(path for path in (args.jsonl, args.table, args.index) if path)
+    print(f"已导入 {count} 条记录到 {targets}", file=sys.stderr)
+    return 0
+
+
+def report_metrics(metrics, path=None):
+    """
+    在标准错误上打印指标摘要，并可选地写入 Prometheus 文本文件。
+
+    Args:
+        metrics: MetricsCollector 实例
+        path: 可选的 Prometheus 文本文件路径
+    """
+    print(f"\n{metrics.summary()}", file=sys.stderr)
+    if path:
+        try:
+            metrics.write_prometheus(path)
+        except OSError as e:
+            print(f"警告: 无法写入指标文件: {e}", file=sys.stderr)
+
+
+def run(parser, args, client, index, store=None):
+    """
+    根据解析后的参数执行相应的模式。
+
+    Args:
+        parser: 参数解析器，用于在缺少参数时打印帮助
+        args: 解析后的命令行参数
+        client: 共享客户端
+        index: 可选的本地元数据索引
+        store: 可选的内容寻址 PDF 存储
+
+    Returns:
+        进程退出码
+    """
+    from .downloader import download_pdf, download_metadata, download_record
+    from .bulk import download_records
+    from .sync import sync_literature
+    from .author import search_and_download_author_papers
+    from .graph import DIRECTIONS, EDGES_FILENAME, crawl_graph
+    
+    # 处理导出模式
+    if (args.jsonl or args.table) and (args.search or args.ids_file):
+        writers = []
+        try:
+            if args.jsonl:
+                writers.append(JSONLinesWriter(args.jsonl, args.compression))
+            if args.table:
+                writers.append(open_table_writer(args.table, args.table_format, args.compression))
+            
+            if args.search:
+                print(f"正在导出搜索结果: {args.search}", file=sys.stderr)
+                items = iter_search_metadata(client, args.search, limit=args.limit)
+            else:
+                items = iter_records_metadata(client, read_ids_file(args.ids_file), batch_size=max(1, args.batch_size))
+            
+            count = 0
+            for metadata in items:
+                for writer in writers:
+                    writer.write(metadata)
+                count += 1
+        except Exception as e:
+            print(f"导出期间出错: {e}", file=sys.stderr)
+            return 1
+        finally:
+            for writer in writers:
+                writer.close()
+        
+        targets = ", ".join(path for path in (args.jsonl, args.table) if path)
+        print(f"已导出 {count} 条记录的元数据到 {targets}", file=sys.stderr)
+        return 0
     
     # 处理搜索模式
     if args.search:
-        client = InspireHEPClient()
         try:
             print(f"正在搜索: {args.search}")
-            results = client.search_literature(args.search, size=args.size)
+            
+            if args.limit is not None:
+                # 逐页遍历，--size 作为每页大小
+                hits = client.iter_literature(args.search, size=args.size, limit=args.limit,
+                                              fields=client.LISTING_FIELDS)
+                count = 0
+                for count, hit in enumerate(hits, 1):
+                    print_hit(count, hit)
+                print("未找到结果。" if count == 0 else f"共列出 {count} 个结果。")
+                return 0
+            
+            results = client.search_literature(args.search, size=args.size, fields=client.LISTING_FIELDS)
             hits = results.get("hits", {}).get("hits", [])
             
             if not hits:
@@ -95,23 +747,142 @@ def main():
             print(f"\n找到 {results.get('hits', {}).get('total', 0)} 个结果 (显示 {len(hits)} 个):\n")
             
             for i, hit in enumerate(hits, 1):
-                metadata = hit.get("metadata", {})
-                record_id = hit.get("id", "N/A")
-                title = metadata.get("titles", [{}])[0].get("title", "N/A")
-                authors = metadata.get("authors", [])
-                author_names = ", ".join([a.get("full_name", "") for a in authors[:3]])
-                if len(authors) > 3:
-                    author_names += f" (以及另外 {len(authors) - 3} 位)"
-                
-                print(f"{i}. [{record_id}] {title}")
-                print(f"   作者: {author_names}")
-                print()
+                print_hit(i, hit)
             
             return 0
         except Exception as e:
             print(f"搜索期间出错: {e}", file=sys.stderr)
             return 1
     
+    # 处理增量同步模式
+    if args.sync:
+        try:
+            summary = sync_literature(
+                args.sync,
+                args.output_dir,
+                state_path=args.state_file,
+                download_pdf_flag=not args.metadata_only,
+                download_metadata_flag=not args.pdf_only,
+                api_workers=args.api_workers,
+                pdf_workers=args.pdf_workers,
+                format=args.format,
+                client=client,
+                index=index,
+                store=store,
+            )
+        except Exception as e:
+            print(f"同步期间出错: {e}", file=sys.stderr)
+            return 1
+        
+        since = summary["since"] or "首次同步"
+        print(f"\n同步完成 (自 {since}): 匹配 {summary['matched']}, 下载 {summary['downloaded']}, "
+              f"未变 {summary['unchanged']}, 失败 {len(summary['failed'])}")
+        return 1 if summary["failed"] else 0
+    
+    # 处理作者下载模式
+    if args.author:
+        try:
+            summary = search_and_download_author_papers(
+                args.author,
+                args.output_dir,
+                per_author_dir=not args.flat,
+                download_pdf_flag=not args.metadata_only,
+                download_metadata_flag=not args.pdf_only,
+                api_workers=args.api_workers,
+                pdf_workers=args.pdf_workers,
+                format=args.format,
+                skip_existing=args.skip_existing,
+                limit=args.limit,
+                manifest=not args.no_manifest,
+                client=client,
+                index=index,
+                store=store,
+            )
+        except Exception as e:
+            print(f"下载作者文献期间出错: {e}", file=sys.stderr)
+            return 1
+        
+        for record_id in summary["failed"]:
+            print(f"失败 [{record_id}]", file=sys.stderr)
+        print(f"\n完成 {summary['matched']} 篇文献: 成功 {summary['downloaded']}, 失败 {len(summary['failed'])}")
+        if summary["manifest"]:
+            print(f"摘要已写入 {summary['manifest']}")
+        return 1 if summary["failed"] else 0
+    
+    # 处理引用关系图模式
+    if args.graph:
+        if args.ids_file:
+            seeds = list(read_ids_file(args.ids_file))
+        elif args.record_id:
+            seeds = [args.record_id]
+        else:
+            parser.print_help()
+            return 1
+        
+        edges_path = args.edges or os.path.join(args.output_dir, EDGES_FILENAME)
+        try:
+            summary = crawl_graph(
+                seeds,
+                max_depth=args.depth,
+                max_nodes=args.max_nodes,
+                directions=DIRECTIONS if args.direction == "both" else [args.direction],
+                workers=args.api_workers,
+                edges_path=edges_path,
+                download=args.graph_download,
+                output_dir=args.output_dir,
+                download_pdf_flag=not args.metadata_only,
+                download_metadata_flag=not args.pdf_only,
+                pdf_workers=args.pdf_workers,
+                format=args.format,
+                skip_existing=args.skip_existing,
+                client=client,
+                index=index,
+                store=store,
+            )
+        except Exception as e:
+            print(f"爬取引用关系图期间出错: {e}", file=sys.stderr)
+            return 1
+        
+        for record_id, error in summary["errors"].items():
+            print(f"失败 [{record_id}]: {error}", file=sys.stderr)
+        failed = [r for r in summary["downloads"].values() if r["error"]]
+        for result in failed:
+            print(f"失败 [{result['record_id']}]: {result['error']}", file=sys.stderr)
+        note = " (已达到 --max-nodes 上限)" if summary["truncated"] else ""
+        print(f"\n访问 {len(summary['nodes'])} 条记录{note}，{summary['edges']} 条边已写入 {edges_path}")
+        if args.graph_download:
+            print(f"下载 {len(summary['downloads'])} 条记录: 失败 {len(failed)}")
+        return 1 if failed or summary["errors"] else 0
+    
+    # 处理批量下载模式
+    if args.ids_file:
+        try:
+            record_ids = list(read_ids_file(args.ids_file))
+            
+            results = download_records(
+                record_ids,
+                args.output_dir,
+                download_pdf_flag=not args.metadata_only,
+                download_metadata_flag=not args.pdf_only,
+                api_workers=args.api_workers,
+                pdf_workers=args.pdf_workers,
+                format=args.format,
+                client=client,
+                skip_existing=args.skip_existing,
+                batch_size=args.batch_size,
+                index=index,
+                store=store,
+            )
+        except Exception as e:
+            print(f"错误: {e}", file=sys.stderr)
+            return 1
+        
+        failed = [r for r in results.values() if r["error"]]
+        for result in failed:
+            print(f"失败 [{result['record_id']}]: {result['error']}", file=sys.stderr)
+        print(f"\n完成 {len(results)} 条记录: 成功 {len(results) - len(failed)}, 失败 {len(failed)}")
+        return 1 if failed else 0
+    
     # 处理下载模式
     if not args.record_id:
         parser.print_help()
@@ -124,13 +895,17 @@ def main():
         
         if args.metadata_only:
             # 仅下载元数据
-            download_metadata(args.record_id, args.output_dir, format=args.format)
+            download_metadata(args.record_id, args.output_dir, format=args.format, client=client,
+                              skip_existing=args.skip_existing, index=index)
         elif args.pdf_only:
             # 仅下载 PDF
-            download_pdf(args.record_id, args.output_dir)
+            download_pdf(args.record_id, args.output_dir, client=client, skip_existing=args.skip_existing,
+                         index=index, store=store)
         else:
             # 下载两者
-            download_record(args.record_id, args.output_dir, download_pdf_flag, download_metadata_flag)
+            download_record(args.record_id, args.output_dir, download_pdf_flag, download_metadata_flag, client=client,
+                            skip_existing=args.skip_existing, format=args.format, index=index,
+                            store=store)
         
         return 0
     
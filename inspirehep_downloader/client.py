@@ -2,30 +2,156 @@
 用于与 INSPIRE-HEP API 交互的客户端。
 """
 
+import io
+import os
+import time
 import requests
-from typing import Dict, List, Optional
-import json
+from urllib3.exceptions import ProtocolError, ReadTimeoutError
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from .cache import RecordCache
+from .scheduler import RequestScheduler
+from .metrics import MetricsCollector, observe, inc
+from .progress import ProgressReporter
+from .records import MetadataRecord, extract_records, extract_pdf_url, API_URL, METADATA_FIELDS, PDF_FIELDS
+from .jsonlib import JSONBackend, get_backend
 
 
 class InspireHEPClient:
     """用于访问 INSPIRE-HEP API 的客户端。"""
     
-    BASE_URL = "https://inspirehep.net/api"
+    BASE_URL = API_URL
     
-    def __init__(self, timeout: int = 30):
+    # 通过 fields 参数只请求实际用到的字段，避免下载庞大的参考文献列表等内容
+    METADATA_FIELDS = METADATA_FIELDS
+    PDF_FIELDS = PDF_FIELDS
+    SOURCE_FIELDS = PDF_FIELDS + ["urls.value", "dois.value"]
+    RECORD_FIELDS = METADATA_FIELDS + ["documents.key", "documents.url", "urls.value"]
+    LISTING_FIELDS = ["control_number", "titles.title", "authors.full_name"]
+    AUTHOR_FIELDS = ["control_number", "name", "ids"]
+    
+    # 文件下载的默认读缓冲区大小；大缓冲区显著减少 Python 层面的循环次数
+    DOWNLOAD_CHUNK_SIZE = 256 * 1024
+    
+    def __init__(self, timeout: int = 30, pool_maxsize: int = 10, cache: Optional[RecordCache] = None,
+                 scheduler: Optional[RequestScheduler] = None, chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+                 preallocate: bool = False, metrics: Optional[MetricsCollector] = None,
+                 progress: Optional[ProgressReporter] = None, json_backend=None, pdf_resolver=None):
         """
         初始化 INSPIRE-HEP 客户端。
         
         Args:
             timeout: 请求超时秒数 (默认值: 30)
+            pool_maxsize: 每个主机保持的最大连接数，供多线程共享 (默认值: 10)
+            cache: 可选的磁盘缓存，用于 get_record 和 search_literature (默认值: 不缓存)
+            scheduler: 负责限速和重试的请求调度器 (默认值: 使用默认设置的 RequestScheduler)
+            chunk_size: download_file 的默认读缓冲区字节数 (默认值: 256 KB)
+            preallocate: download_file 是否默认根据 Content-Length 预分配磁盘空间 (默认值: False)
+            metrics: 可选的指标收集器，记录各阶段耗时、字节数、重试和缓存命中 (默认值: 不记录)
+            progress: 可选的进度报告器，接收文件下载和批量下载的进度 (默认值: 不报告)
+            json_backend: 解码 API 响应的 JSON 后端，"auto"、"orjson"、"json" 或 JSONBackend 实例
+                (默认值: get_backend() 的默认值，安装了 orjson 时使用 orjson)
+            pdf_resolver: 可选的 PdfResolver；提供时 download_pdf 在多个 PDF 来源之间排序并对冲请求
+                (默认值: 只使用 extract_pdf_url 给出的来源)
         """
         self.timeout = timeout
+        self.chunk_size = chunk_size
+        self.preallocate = preallocate
+        self.metrics = metrics
+        self.progress = progress
+        self.pdf_resolver = pdf_resolver
+        self.json_backend = json_backend if isinstance(json_backend, JSONBackend) else get_backend(json_backend)
+        self.cache = cache
+        self.scheduler = scheduler or RequestScheduler()
         self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_maxsize, pool_maxsize=pool_maxsize)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
         self.session.headers.update({
             "Accept": "application/json"
         })
     
-    def search_literature(self, query: str, size: int = 10, page: int = 1) -> Dict:
+    def _get_json(self, url: str, params: Optional[Dict] = None) -> Dict:
+        """
+        发送 GET 请求并解码 JSON 响应，启用缓存时先查询缓存。
+        
+        新鲜的缓存条目直接返回；过期条目使用 ETag / Last-Modified 发送条件请求，
+        服务器返回 304 时复用缓存内容。
+        """
+        start = time.perf_counter()
+        if self.cache is None:
+            response = self.scheduler.get(self.session, url, params=params, timeout=self.timeout,
+                                          metrics=self.metrics)
+            response.raise_for_status()
+            self._record_response(response, start)
+            return self._parse_json(response=response)
+        
+        key = self.cache.make_key(url, params)
+        entry = self.cache.get(key)
+        if entry is not None and self.cache.is_fresh(entry):
+            inc(self.metrics, "cache_hits_total")
+            return self._parse_json(body=entry.body)
+        
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+        
+        response = self.scheduler.get(self.session, url, params=params, headers=headers, timeout=self.timeout,
+                                      metrics=self.metrics)
+        if entry is not None and response.status_code == 304:
+            self._record_response(response, start)
+            inc(self.metrics, "cache_revalidated_total")
+            self.cache.touch(key)
+            return self._parse_json(body=entry.body)
+        
+        response.raise_for_status()
+        self._record_response(response, start)
+        inc(self.metrics, "cache_misses_total")
+        self.cache.set(key, response.content, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+        return self._parse_json(response=response)
+    
+    def get_external_json(self, url: str, params: Optional[Dict] = None) -> Dict:
+        """
+        从 INSPIRE 以外的服务 (例如 Unpaywall) 获取 JSON。
+        
+        请求经过调度器 (按主机限速和重试) 并共享连接池，但不读写记录缓存，也不计入 INSPIRE API 的指标。
+        
+        Args:
+            url: 请求 URL
+            params: 可选的查询参数
+        
+        Returns:
+            解码后的 JSON
+        
+        Raises:
+            requests.exceptions.RequestException: 如果请求失败
+        """
+        response = self.scheduler.get(self.session, url, params=params, timeout=self.timeout)
+        response.raise_for_status()
+        return self.json_backend.decode_response(response)
+    
+    def _record_response(self, response: requests.Response, start: float) -> None:
+        # 记录一次 API 调用的总时间、首字节时间和响应体大小
+        if self.metrics is not None:
+            observe(self.metrics, "request", start)
+            self.metrics.observe("ttfb", response.elapsed.total_seconds())
+            self.metrics.inc("bytes_downloaded_total", len(response.content))
+    
+    def _parse_json(self, response: Optional[requests.Response] = None, body: Optional[bytes] = None):
+        start = time.perf_counter()
+        if response is not None:
+            data = self.json_backend.decode_response(response)
+        else:
+            data = self.json_backend.loads(body)
+        observe(self.metrics, "json_parse", start)
+        return data
+    
+    def search_literature(self, query: str, size: int = 10, page: int = 1,
+                          fields: Optional[List[str]] = None) -> Dict:
         """
         在 INSPIRE-HEP 中搜索文献。
         
@@ -33,6 +159,7 @@ class InspireHEPClient:
             query: 搜索查询字符串 (例如, "author:witten", "title:supersymmetry")
             size: 返回的结果数 (默认值: 10)
             page: 用于分页的页码 (默认值: 1)
+            fields: 可选的字段列表，只返回这些元数据字段 (默认值: 全部字段)
         
         Returns:
             包含搜索结果的字典
@@ -46,17 +173,142 @@ class InspireHEPClient:
             "size": size,
             "page": page
         }
+        if fields:
+            params["fields"] = ",".join(fields)
         
-        response = self.session.get(url, params=params, timeout=self.timeout)
-        response.raise_for_status()
-        return response.json()
+        return self._get_json(url, params)
+    
+    def search_authors(self, query: str, size: int = 10, fields: Optional[List[str]] = None) -> Dict:
+        """
+        在 INSPIRE-HEP 中搜索作者档案。
+        
+        Args:
+            query: 作者姓名或其他作者搜索查询 (例如, "witten", "ids.value:E.Witten.1")
+            size: 返回的结果数 (默认值: 10)
+            fields: 可选的字段列表，只返回这些元数据字段 (默认值: 全部字段)
+        
+        Returns:
+            包含搜索结果的字典
+        
+        Raises:
+            requests.exceptions.RequestException: 如果请求失败
+        """
+        url = f"{self.BASE_URL}/authors"
+        params = {
+            "q": query,
+            "size": size
+        }
+        if fields:
+            params["fields"] = ",".join(fields)
+        
+        return self._get_json(url, params)
+    
+    def iter_literature(self, query: str, size: int = 100, limit: Optional[int] = None,
+                        start_page: int = 1, prefetch: bool = True,
+                        fields: Optional[List[str]] = None) -> Iterator[Dict]:
+        """
+        逐页遍历搜索结果，每次产出一条命中记录。
+        
+        内存中最多只保留当前页和预取的下一页；启用预取时，调用方处理当前页的
+        同时，后台线程已经在请求下一页。
+        
+        Args:
+            query: 搜索查询字符串 (例如, "author:witten", "title:supersymmetry")
+            size: 每页的结果数 (默认值: 100)
+            limit: 最多产出的结果数，None 表示不限制 (默认值: None)
+            start_page: 开始的页码，可用于断点续传 (默认值: 1)
+            prefetch: 是否在后台预取下一页 (默认值: True)
+            fields: 可选的字段列表，只返回这些元数据字段 (默认值: 全部字段)
+        
+        Yields:
+            搜索结果中的单条原始记录
+        
+        Raises:
+            requests.exceptions.RequestException: 如果请求失败
+        """
+        for hits in self.iter_literature_pages(query, size=size, limit=limit, start_page=start_page,
+                                               prefetch=prefetch, fields=fields):
+            yield from hits
+    
+    def iter_literature_pages(self, query: str, size: int = 100, limit: Optional[int] = None,
+                              start_page: int = 1, prefetch: bool = True,
+                              fields: Optional[List[str]] = None) -> Iterator[List[Dict]]:
+        """
+        逐页遍历搜索结果，每次产出一页命中记录的列表。参数与 iter_literature 相同。
+        
+        Yields:
+            每页的原始记录列表；设置 limit 时最后一页会被截断
+        
+        Raises:
+            requests.exceptions.RequestException: 如果请求失败
+        """
+        if limit is not None and limit <= 0:
+            return
+        
+        executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+        
+        def fetch(page_number):
+            return self.search_literature(query, size=size, page=page_number, fields=fields)
+        
+        page = start_page
+        pending = executor.submit(fetch, page) if executor else None
+        yielded = 0
+        
+        try:
+            while True:
+                results = pending.result() if executor else fetch(page)
+                hits = results.get("hits", {}).get("hits", [])
+                total = results.get("hits", {}).get("total", 0)
+                del results
+                
+                has_more = len(hits) == size and page * size < total
+                if has_more and executor and (limit is None or yielded + len(hits) < limit):
+                    pending = executor.submit(fetch, page + 1)
+                
+                if limit is not None and yielded + len(hits) >= limit:
+                    yield hits[:limit - yielded]
+                    return
+                if hits:
+                    yield hits
+                    yielded += len(hits)
+                
+                if not has_more:
+                    return
+                page += 1
+        finally:
+            if executor:
+                executor.shutdown(wait=False)
+    
+    def iter_literature_records(self, query: str, size: int = 100, limit: Optional[int] = None,
+                                pdf_url: bool = False) -> Iterator[MetadataRecord]:
+        """
+        逐条产出搜索结果的 MetadataRecord，适合把大量结果保存在内存中分析。
+        
+        每页原始 JSON 在一次遍历中转换为紧凑的记录后立即丢弃，并且只请求元数据所需的字段。
+        
+        Args:
+            query: 搜索查询字符串
+            size: 每页的结果数 (默认值: 100)
+            limit: 最多产出的结果数，None 表示不限制 (默认值: None)
+            pdf_url: 是否同时请求文档字段并提取 PDF URL (默认值: False)
+        
+        Yields:
+            MetadataRecord 实例
+        
+        Raises:
+            requests.exceptions.RequestException: 如果请求失败
+        """
+        fields = self.RECORD_FIELDS if pdf_url else self.METADATA_FIELDS
+        for hits in self.iter_literature_pages(query, size=size, limit=limit, fields=fields):
+            yield from extract_records(hits, pdf_url=pdf_url)
     
-    def get_record(self, record_id: str) -> Dict:
+    def get_record(self, record_id: str, fields: Optional[List[str]] = None) -> Dict:
         """
         按 ID 获取特定的文献记录。
         
         Args:
             record_id: INSPIRE-HEP 记录 ID
+            fields: 可选的字段列表，只返回这些元数据字段 (默认值: 全部字段)
         
         Returns:
             包含记录元数据的字典
@@ -65,10 +317,46 @@ class InspireHEPClient:
             requests.exceptions.RequestException: 如果请求失败
         """
         url = f"{self.BASE_URL}/literature/{record_id}"
+        params = {"fields": ",".join(fields)} if fields else None
         
-        response = self.session.get(url, timeout=self.timeout)
-        response.raise_for_status()
-        return response.json()
+        return self._get_json(url, params)
+    
+    def get_records(self, record_ids: Iterable[str], chunk_size: int = 50,
+                    fields: Optional[List[str]] = None) -> Tuple[Dict[str, Dict], List[str]]:
+        """
+        通过搜索端点批量获取多条记录。
+        
+        每 chunk_size 个 ID 打包成一个 "recid:a or recid:b ..." 查询，因此获取
+        N 条记录只需约 N / chunk_size 次请求。chunk_size 同时受 URL 长度和
+        每页结果数的限制，不宜过大。
+        
+        Args:
+            record_ids: INSPIRE-HEP 记录 ID 的可迭代对象
+            chunk_size: 每次请求包含的 ID 数 (默认值: 50)
+            fields: 可选的字段列表，只返回这些元数据字段 (默认值: 全部字段)
+        
+        Returns:
+            (以记录 ID 为键的原始记录字典, 未找到的记录 ID 列表)
+        
+        Raises:
+            requests.exceptions.RequestException: 如果请求失败
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size 必须至少为 1")
+        
+        ids = list(dict.fromkeys(str(record_id) for record_id in record_ids))
+        records = {}
+        
+        for start in range(0, len(ids), chunk_size):
+            chunk = ids[start:start + chunk_size]
+            query = " or ".join(f"recid:{record_id}" for record_id in chunk)
+            results = self.search_literature(query, size=len(chunk), fields=fields)
+            for hit in results.get("hits", {}).get("hits", []):
+                record_id = str(hit.get("id") or hit.get("metadata", {}).get("control_number"))
+                records[record_id] = hit
+        
+        missing = [record_id for record_id in ids if record_id not in records]
+        return records, missing
     
     def get_pdf_url(self, record_id: str) -> Optional[str]:
         """
@@ -80,23 +368,7 @@ class InspireHEPClient:
         Returns:
             PDF 的 URL (如果可用)，否则为 None
         """
-        record = self.get_record(record_id)
-        metadata = record.get("metadata", {})
-        
-        # 检查带有 PDF 的文档
-        documents = metadata.get("documents", [])
-        for doc in documents:
-            if doc.get("key", "").endswith(".pdf"):
-                return doc.get("url")
-        
-        # 检查 arxiv eprints
-        arxiv_eprints = metadata.get("arxiv_eprints", [])
-        if arxiv_eprints:
-            arxiv_id = arxiv_eprints[0].get("value")
-            if arxiv_id:
-                return f"https://arxiv.org/pdf/{arxiv_id}.pdf"
-        
-        return None
+        return self.extract_pdf_url(self.get_record(record_id, fields=self.PDF_FIELDS))
     
     def get_metadata(self, record_id: str) -> Dict:
         """
@@ -108,40 +380,201 @@ class InspireHEPClient:
         Returns:
             包含格式化元数据的字典
         """
-        record = self.get_record(record_id)
-        metadata = record.get("metadata", {})
-        
-        # 提取相关元数据
-        formatted_metadata = {
-            "record_id": record_id,
-            "title": metadata.get("titles", [{}])[0].get("title", "N/A"),
-            "authors": [author.get("full_name", "N/A") for author in metadata.get("authors", [])],
-            "abstract": metadata.get("abstracts", [{}])[0].get("value", "N/A"),
-            "publication_date": metadata.get("preprint_date") or metadata.get("publication_info", [{}])[0].get("year", "N/A"),
-            "arxiv_id": metadata.get("arxiv_eprints", [{}])[0].get("value", "N/A"),
-            "doi": metadata.get("dois", [{}])[0].get("value", "N/A"),
-            "citations": metadata.get("citation_count", 0),
-            "keywords": [kw.get("value", "") for kw in metadata.get("keywords", [])],
-            "inspire_url": f"https://inspirehep.net/literature/{record_id}",
-        }
+        return self.extract_metadata(self.get_record(record_id, fields=self.METADATA_FIELDS), record_id)
+    
+    @staticmethod
+    def extract_pdf_url(record: Dict) -> Optional[str]:
+        """
+        从已获取的原始记录中提取 PDF URL，不发起任何请求。
+        
+        Args:
+            record: get_record 或搜索结果中的单条原始记录
+        
+        Returns:
+            PDF 的 URL (如果可用)，否则为 None
+        """
+        return extract_pdf_url(record)
+    
+    @staticmethod
+    def extract_metadata(record: Dict, record_id: Optional[str] = None) -> Dict:
+        """
+        从已获取的原始记录中提取格式化元数据，不发起任何请求。
+        
+        提取规则与 MetadataRecord.from_hit 相同 (缺失或为空的字段取 "N/A")，返回普通字典。
+        
+        Args:
+            record: get_record 或搜索结果中的单条原始记录
+            record_id: 可选的记录 ID (默认值: 记录中的 id 或 control_number)
         
-        return formatted_metadata
+        Returns:
+            包含格式化元数据的字典
+        """
+        return MetadataRecord.from_hit(record, record_id).to_dict()
     
-    def download_file(self, url: str, output_path: str) -> None:
+    def download_file(self, url: str, output_path: str, resume: bool = True, skip_existing: bool = False,
+                      chunk_size: Optional[int] = None, preallocate: Optional[bool] = None,
+                      on_response: Optional[Callable[[requests.Response], None]] = None) -> int:
         """
         从 URL 下载文件。
         
+        数据先写入 "{output_path}.part"，校验长度后再原子地重命名为最终路径，
+        因此最终路径上的文件总是完整的。中断后再次调用时，使用 HTTP Range
+        请求从 .part 文件的末尾继续下载。
+        
+        未压缩的响应体通过 readinto 读入一个复用的缓冲区再写入磁盘，不为每个数据块
+        分配新的对象。
+        
         Args:
             url: 要下载的文件的 URL
             output_path: 文件应保存的路径
+            resume: 是否从已有的 .part 文件继续下载 (默认值: True)
+            skip_existing: 如果最终文件已存在，则不进行任何网络请求直接返回 (默认值: False)
+            chunk_size: 读缓冲区字节数 (默认值: 客户端的 chunk_size)
+            preallocate: 是否根据服务器声明的长度预先分配磁盘空间，减少碎片 (默认值: 客户端的 preallocate)
+            on_response: 可选的回调，在收到成功的响应头之后、写入任何数据之前以响应调用；
+                抛出异常可以放弃这次下载 (响应被关闭，不创建或修改 .part 文件)
+        
+        Returns:
+            本次实际传输的字节数 (跳过时为 0)
         
         Raises:
-            requests.exceptions.RequestException: 如果下载失败
+            requests.exceptions.RequestException: 如果下载失败或下载的长度与服务器声明的不一致
         """
-        response = self.session.get(url, stream=True, timeout=self.timeout)
+        if skip_existing and os.path.exists(output_path):
+            return 0
+        if chunk_size is None:
+            chunk_size = self.chunk_size
+        if preallocate is None:
+            preallocate = self.preallocate
+        
+        part_path = output_path + ".part"
+        offset = os.path.getsize(part_path) if resume and os.path.exists(part_path) else 0
+        
+        headers = {"Range": f"bytes={offset}-"} if offset else None
+        response = self.scheduler.get(self.session, url, stream=True, headers=headers, timeout=self.timeout,
+                                      metrics=self.metrics)
+        if offset and response.status_code == 416:
+            # .part 文件与服务器上的文件不一致，从头开始
+            response.close()
+            offset = 0
+            response = self.scheduler.get(self.session, url, stream=True, timeout=self.timeout, metrics=self.metrics)
         response.raise_for_status()
+        if self.metrics is not None:
+            self.metrics.observe("ttfb", response.elapsed.total_seconds())
+        if on_response is not None:
+            try:
+                on_response(response)
+            except BaseException:
+                response.close()
+                raise
+        
+        expected_size = None
+        if offset and response.status_code == 206:
+            start, expected_size = self._parse_content_range(response.headers.get("Content-Range"))
+            if start != offset:
+                response.close()
+                raise requests.exceptions.RequestException(f"服务器返回的范围 {start} 与请求的偏移 {offset} 不一致")
+        else:
+            # 服务器忽略了 Range 头，返回了完整文件
+            offset = 0
+            if response.headers.get("Content-Length") and response.headers.get("Content-Encoding", "identity") == "identity":
+                expected_size = int(response.headers["Content-Length"])
+        
+        progress = self.progress
+        on_chunk = None
+        if progress is not None:
+            progress.file_started(output_path, None if expected_size is None else expected_size - offset)
+            on_chunk = partial(progress.file_progress, output_path)
         
-        with open(output_path, "wb") as f:
-            for chunk in response.iter_content(chunk_size=8192):
+        ok = False
+        try:
+            with open(part_path, "r+b" if offset else "wb") as f:
+                f.seek(offset)
+                preallocated = preallocate and expected_size is not None and self._preallocate(f, offset, expected_size)
+                transfer_start = time.perf_counter()
+                try:
+                    write_seconds = self._write_body(response, f, chunk_size, timed=self.metrics is not None,
+                                                     on_chunk=on_chunk)
+                finally:
+                    written = f.tell() - offset
+                    if preallocated:
+                        # 截掉未写入的预分配空间，使 .part 文件的长度仍然等于已下载的字节数
+                        f.truncate(offset + written)
+            ok = expected_size is None or offset + written == expected_size
+        finally:
+            if progress is not None:
+                progress.file_finished(output_path, ok)
+        
+        if self.metrics is not None:
+            self.metrics.observe("body_transfer", time.perf_counter() - transfer_start - write_seconds)
+            self.metrics.observe("disk_write", write_seconds)
+            self.metrics.inc("bytes_downloaded_total", written)
+            self.metrics.inc("bytes_written_total", written)
+        
+        if not ok:
+            # 保留 .part 文件，以便下次继续下载
+            raise requests.exceptions.RequestException(
+                f"下载不完整: 预期 {expected_size} 字节，实际 {offset + written} 字节"
+            )
+        
+        os.replace(part_path, output_path)
+        return written
+    
+    @staticmethod
+    def _write_body(response: requests.Response, f, chunk_size: int, timed: bool = False,
+                    on_chunk: Optional[Callable[[int], None]] = None) -> float:
+        # 返回写盘所用的秒数 (timed 为 False 时为 0)；on_chunk 在每个数据块写入后以其长度调用
+        write_seconds = 0.0
+        raw = response.raw
+        if not isinstance(raw, io.IOBase) or response.headers.get("Content-Encoding", "identity") != "identity":
+            # 压缩的响应需要 requests 解码；raw 不是真正的流时同样退回 iter_content
+            for chunk in response.iter_content(chunk_size=chunk_size):
                 if chunk:
+                    start = time.perf_counter() if timed else 0.0
                     f.write(chunk)
+                    if timed:
+                        write_seconds += time.perf_counter() - start
+                    if on_chunk is not None:
+                        on_chunk(len(chunk))
+            return write_seconds
+        
+        buffer = bytearray(chunk_size)
+        view = memoryview(buffer)
+        try:
+            while True:
+                n = raw.readinto(buffer)
+                if not n:
+                    break
+                start = time.perf_counter() if timed else 0.0
+                f.write(view[:n])
+                if timed:
+                    write_seconds += time.perf_counter() - start
+                if on_chunk is not None:
+                    on_chunk(n)
+        except ProtocolError as e:
+            # 与 iter_content 一样，把 urllib3 的异常转换为 requests 的异常
+            raise requests.exceptions.ChunkedEncodingError(e)
+        except ReadTimeoutError as e:
+            raise requests.exceptions.ConnectionError(e)
+        return write_seconds
+    
+    @staticmethod
+    def _preallocate(f, offset: int, size: int) -> bool:
+        if size <= offset or not hasattr(os, "posix_fallocate"):
+            return False
+        try:
+            os.posix_fallocate(f.fileno(), offset, size - offset)
+        except OSError:
+            return False
+        return True
+    
+    @staticmethod
+    def _parse_content_range(value: Optional[str]):
+        # 解析 "bytes start-end/total"，total 未知 ("*") 时为 None
+        try:
+            spec = value.partition(" ")[2]
+            byte_range, _, total = spec.partition("/")
+            start = int(byte_range.split("-")[0])
+        except (AttributeError, ValueError):
+            raise requests.exceptions.RequestException(f"无效的 Content-Range: {value!r}")
+        return start, (int(total) if total.isdigit() else None)
@@ -3,12 +3,31 @@
 """
 
 import os
-import json
+import time
 from typing import Optional, Dict
 from .client import InspireHEPClient
+from .index import MetadataIndex
+from .store import BlobStore
+from .metrics import observe, inc
+from .records import MetadataRecord, as_dict
+from .sources import record_sources
+from .progress import echo
 
 
-def download_pdf(record_id: str, output_dir: str = ".", filename: Optional[str] = None) -> str:
+def default_pdf_filename(record_id: str) -> str:
+    """返回记录 PDF 的默认文件名。"""
+    return f"{record_id}.pdf"
+
+
+def default_metadata_filename(record_id: str, format: str = "json") -> str:
+    """返回记录元数据的默认文件名。"""
+    return f"{record_id}_metadata.{format}"
+
+
+def download_pdf(record_id: str, output_dir: str = ".", filename: Optional[str] = None,
+                 client: Optional[InspireHEPClient] = None, record: Optional[Dict] = None,
+                 skip_existing: bool = False, index: Optional[MetadataIndex] = None,
+                 store: Optional[BlobStore] = None) -> str:
     """
     下载特定 INSPIRE-HEP 记录的 PDF。
     
@@ -16,6 +35,13 @@ def download_pdf(record_id: str, output_dir: str = ".", filename: Optional[str]
         record_id: INSPIRE-HEP 记录 ID
         output_dir: PDF 应保存的目录 (默认值: 当前目录)
         filename: 可选的自定义文件名 (默认值: {record_id}.pdf)
+        client: 可选的共享客户端 (默认值: 新建一个 InspireHEPClient)
+        record: 可选的已获取原始记录；提供时不再请求 API
+        skip_existing: 如果 PDF 已完整存在于磁盘上，则不进行任何网络请求 (默认值: False)
+        index: 可选的本地元数据索引，下载完成后记录 PDF 路径
+        store: 可选的内容寻址存储；提供时输出路径为指向存储的链接，已存储的 URL 不再下载
+    
+    客户端设置了 pdf_resolver 时，在记录的所有 PDF 来源之间排序并对冲下载，而不是只使用 get_pdf_url 给出的来源。
     
     Returns:
         下载的 PDF 文件的路径
@@ -24,31 +50,81 @@ def download_pdf(record_id: str, output_dir: str = ".", filename: Optional[str]
         ValueError: 如果记录没有可用的 PDF
         requests.exceptions.RequestException: 如果下载失败
     """
-    client = InspireHEPClient()
+    # 设置文件名
+    if filename is None:
+        filename = default_pdf_filename(record_id)
+    
+    output_path = os.path.join(output_dir, filename)
+    
+    # 最终路径只会通过原子重命名生成，存在即表示完整
+    if skip_existing and os.path.exists(output_path):
+        echo(client.progress if client is not None else None, f"PDF 已存在，跳过: {output_path}")
+        return output_path
+    
+    if client is None:
+        client = InspireHEPClient()
+    
+    if client.pdf_resolver is not None:
+        if record is None:
+            record = client.get_record(record_id, fields=client.SOURCE_FIELDS)
+        os.makedirs(output_dir, exist_ok=True)
+        _download_resolved_pdf(client, record, output_path, store)
+        echo(client.progress, f"PDF 已保存到 {output_path}")
+        if index is not None:
+            index.set_pdf_path(record_id, output_path)
+        return output_path
     
     # 获取 PDF URL
-    pdf_url = client.get_pdf_url(record_id)
+    if record is not None:
+        pdf_url = client.extract_pdf_url(record)
+    else:
+        pdf_url = client.get_pdf_url(record_id)
     if not pdf_url:
         raise ValueError(f"记录 {record_id} 没有可用的 PDF")
     
     # 如果输出目录不存在，则创建它
     os.makedirs(output_dir, exist_ok=True)
     
-    # 设置文件名
-    if filename is None:
-        filename = f"{record_id}.pdf"
-    
-    output_path = os.path.join(output_dir, filename)
-    
     # 下载 PDF
-    print(f"正在从 {pdf_url} 下载 PDF...")
-    client.download_file(pdf_url, output_path)
-    print(f"PDF 已保存到 {output_path}")
+    if store is not None:
+        blob = store.lookup(pdf_url)
+        if blob is None:
+            echo(client.progress, f"正在从 {pdf_url} 下载 PDF...")
+            blob = store.fetch(client, pdf_url)
+        else:
+            echo(client.progress, f"PDF 已在存储中: {pdf_url}")
+        store.link(blob, output_path)
+    else:
+        echo(client.progress, f"正在从 {pdf_url} 下载 PDF...")
+        client.download_file(pdf_url, output_path)
+    echo(client.progress, f"PDF 已保存到 {output_path}")
+    
+    if index is not None:
+        index.set_pdf_path(record_id, output_path)
     
     return output_path
 
 
-def download_metadata(record_id: str, output_dir: str = ".", filename: Optional[str] = None, format: str = "json") -> str:
+def _download_resolved_pdf(client, record, output_path, store):
+    # 任何一个来源已在存储中时直接链接，否则由 pdf_resolver 选择来源下载后再移入存储
+    resolver = client.pdf_resolver
+    if store is not None:
+        for source in record_sources(record, arxiv_mirror=resolver.arxiv_mirror):
+            blob = store.lookup(source.url)
+            if blob is not None:
+                echo(client.progress, f"PDF 已在存储中: {source.url}")
+                store.link(blob, output_path)
+                return
+    echo(client.progress, f"正在下载 PDF (对冲 {resolver.hedge_after:g} 秒)...")
+    source = resolver.download(client, record, output_path)
+    echo(client.progress, f"PDF 来自 {source.url}")
+    if store is not None:
+        store.link(store.add_file(output_path, source.url), output_path)
+
+
+def download_metadata(record_id: str, output_dir: str = ".", filename: Optional[str] = None, format: str = "json",
+                      client: Optional[InspireHEPClient] = None, record: Optional[Dict] = None,
+                      skip_existing: bool = False, index: Optional[MetadataIndex] = None) -> str:
     """
     下载特定 INSPIRE-HEP 记录的元数据。
     
@@ -57,6 +133,10 @@ def download_metadata(record_id: str, output_dir: str = ".", filename: Optional[
         output_dir: 元数据应保存的目录 (默认值: 当前目录)
         filename: 可选的自定义文件名 (默认值: {record_id}_metadata.{format})
         format: 输出格式，"json" 或 "txt" (默认值: "json")
+        client: 可选的共享客户端 (默认值: 新建一个 InspireHEPClient)
+        record: 可选的已获取原始记录或 MetadataRecord；提供时不再请求 API
+        skip_existing: 如果元数据文件已存在，则不进行任何网络请求 (默认值: False)
+        index: 可选的本地元数据索引，写入文件后同时更新索引
     
     Returns:
         保存的元数据文件的路径
@@ -68,27 +148,41 @@ def download_metadata(record_id: str, output_dir: str = ".", filename: Optional[
     if format not in ["json", "txt"]:
         raise ValueError(f"不支持的格式: {format}。请使用 'json' 或 'txt'")
     
-    client = InspireHEPClient()
+    # 设置文件名
+    if filename is None:
+        filename = default_metadata_filename(record_id, format)
+    
+    output_path = os.path.join(output_dir, filename)
+    
+    if skip_existing and os.path.exists(output_path):
+        echo(client.progress if client is not None else None, f"元数据已存在，跳过: {output_path}")
+        return output_path
+    
+    if client is None:
+        client = InspireHEPClient()
     
     # 获取元数据
-    print(f"正在获取记录 {record_id} 的元数据...")
-    metadata = client.get_metadata(record_id)
+    if isinstance(record, MetadataRecord):
+        metadata = record
+    elif record is not None:
+        metadata = client.extract_metadata(record, record_id)
+    else:
+        echo(client.progress, f"正在获取记录 {record_id} 的元数据...")
+        metadata = client.get_metadata(record_id)
     
     # 如果输出目录不存在，则创建它
     os.makedirs(output_dir, exist_ok=True)
     
-    # 设置文件名
-    if filename is None:
-        filename = f"{record_id}_metadata.{format}"
-    
-    output_path = os.path.join(output_dir, filename)
+    # 先写入临时文件再原子重命名，避免中断时留下不完整的文件
+    part_path = output_path + ".part"
+    start = time.perf_counter()
     
     # 以请求的格式保存元数据
     if format == "json":
-        with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(metadata, f, indent=2, ensure_ascii=False)
+        with open(part_path, "wb") as f:
+            f.write(client.json_backend.dumpb(as_dict(metadata), indent=True))
     else:  # txt 格式
-        with open(output_path, "w", encoding="utf-8") as f:
+        with open(part_path, "w", encoding="utf-8") as f:
             f.write(f"INSPIRE-HEP 记录: {metadata['record_id']}\n")
             f.write("=" * 80 + "\n\n")
             f.write(f"标题: {metadata['title']}\n\n")
@@ -101,21 +195,42 @@ def download_metadata(record_id: str, output_dir: str = ".", filename: Optional[
             if metadata['keywords']:
                 f.write(f"关键字: {', '.join(metadata['keywords'])}\n\n")
             f.write(f"摘要:\n{metadata['abstract']}\n")
+    os.replace(part_path, output_path)
     
-    print(f"元数据已保存到 {output_path}")
+    metrics = client.metrics
+    if metrics is not None:
+        observe(metrics, "disk_write", start)
+        inc(metrics, "bytes_written_total", os.path.getsize(output_path))
+    
+    if index is not None:
+        index.add(metadata, metadata_path=output_path)
+    
+    echo(client.progress, f"元数据已保存到 {output_path}")
     
     return output_path
 
 
-def download_record(record_id: str, output_dir: str = ".", download_pdf_flag: bool = True, download_metadata_flag: bool = True) -> Dict[str, str]:
+def download_record(record_id: str, output_dir: str = ".", download_pdf_flag: bool = True, download_metadata_flag: bool = True,
+                    client: Optional[InspireHEPClient] = None, record: Optional[Dict] = None,
+                    skip_existing: bool = False, format: str = "json",
+                    index: Optional[MetadataIndex] = None, store: Optional[BlobStore] = None) -> Dict[str, str]:
     """
     下载特定 INSPIRE-HEP 记录的 PDF 和元数据。
     
+    原始记录只获取一次，元数据文件和 PDF URL 都从同一份记录中提取，
+    因此每条记录只需一次 API 请求。
+    
     Args:
         record_id: INSPIRE-HEP 记录 ID
         output_dir: 文件应保存的目录 (默认值: 当前目录)
         download_pdf_flag: 是否下载 PDF (默认值: True)
         download_metadata_flag: 是否下载元数据 (默认值: True)
+        client: 可选的共享客户端 (默认值: 新建一个 InspireHEPClient)
+        record: 可选的已获取原始记录；提供时不再请求 API
+        skip_existing: 跳过磁盘上已存在的文件；全部存在时不请求 API (默认值: False)
+        format: 元数据格式，"json" 或 "txt" (默认值: "json")
+        index: 可选的本地元数据索引
+        store: 可选的内容寻址 PDF 存储
     
     Returns:
         包含下载文件路径的字典
@@ -125,20 +240,47 @@ def download_record(record_id: str, output_dir: str = ".", download_pdf_flag: bo
     """
     results = {}
     
+    if skip_existing:
+        metadata_path = os.path.join(output_dir, default_metadata_filename(record_id, format))
+        if download_metadata_flag and os.path.exists(metadata_path):
+            results["metadata"] = metadata_path
+            download_metadata_flag = False
+        pdf_path = os.path.join(output_dir, default_pdf_filename(record_id))
+        if download_pdf_flag and os.path.exists(pdf_path):
+            results["pdf"] = pdf_path
+            download_pdf_flag = False
+    
+    if client is None:
+        client = InspireHEPClient()
+    
+    if record is None and (download_metadata_flag or download_pdf_flag):
+        try:
+            echo(client.progress, f"正在获取记录 {record_id}...")
+            record = client.get_record(record_id, fields=client.RECORD_FIELDS)
+        except Exception as e:
+            echo(client.progress, f"警告: 无法获取记录: {e}")
+            if download_metadata_flag:
+                results["metadata"] = None
+            if download_pdf_flag:
+                results["pdf"] = None
+            return results
+    
     if download_metadata_flag:
         try:
-            metadata_path = download_metadata(record_id, output_dir)
+            metadata_path = download_metadata(record_id, output_dir, format=format, client=client, record=record,
+                                              index=index)
             results["metadata"] = metadata_path
         except Exception as e:
-            print(f"警告: 无法下载元数据: {e}")
+            echo(client.progress, f"警告: 无法下载元数据: {e}")
             results["metadata"] = None
     
     if download_pdf_flag:
         try:
-            pdf_path = download_pdf(record_id, output_dir)
+            pdf_path = download_pdf(record_id, output_dir, client=client, record=record, index=index,
+                                    store=store)
             results["pdf"] = pdf_path
         except Exception as e:
-            print(f"警告: 无法下载 PDF: {e}")
+            echo(client.progress, f"警告: 无法下载 PDF: {e}")
             results["pdf"] = None
     
     return results
@@ -0,0 +1,220 @@
+"""
+离线导入 INSPIRE 批量 JSON 导出文件，逐条流式解析，不访问网络。
+"""
+
+import gzip
+import io
+import json
+from typing import Dict, Iterable, Iterator, Optional
+from .export import _import_zstandard
+from .index import MetadataIndex
+from .jsonlib import JSONBackend, get_backend
+from .records import MetadataRecord
+
+
+# 每次从文件读取的字符数；单条记录可以跨越多个块
+READ_SIZE = 1024 * 1024
+
+_GZIP_MAGIC = b"\x1f\x8b"
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+_WHITESPACE = " \t\r\n,"
+
+
+def open_dump(path: str):
+    """
+    以文本方式打开导出文件，根据文件头自动识别 gzip 和 zstd 压缩。
+
+    Args:
+        path: 导出文件路径
+
+    Returns:
+        UTF-8 文本流
+
+    Raises:
+        ImportError: 如果文件是 zstd 压缩但未安装 zstandard
+    """
+    raw = open(path, "rb")
+    try:
+        magic = raw.read(4)
+        raw.seek(0)
+        if magic.startswith(_GZIP_MAGIC):
+            stream = gzip.GzipFile(fileobj=raw, mode="rb")
+        elif magic == _ZSTD_MAGIC:
+            stream = _import_zstandard().ZstdDecompressor().stream_reader(raw, closefd=True)
+        else:
+            stream = raw
+        return io.TextIOWrapper(stream, encoding="utf-8")
+    except Exception:
+        raw.close()
+        raise
+
+
+def iter_json_values(stream, read_size: int = READ_SIZE, backend: Optional[JSONBackend] = None) -> Iterator:
+    """
+    从文本流中逐个解析 JSON 值，内存占用只与单条记录的大小有关。
+
+    支持 JSON Lines、首尾相接的 JSON 对象，以及最外层为数组的 JSON 文件 (逐个产出数组元素)。
+    使用 orjson 等更快的后端时，完整的一行先整体交给后端解码，失败 (例如多行格式化的记录) 时
+    再退回到标准库的增量解析。
+
+    Args:
+        stream: 文本流
+        read_size: 每次读取的字符数 (默认值: 1 MB)
+        backend: JSON 后端 (默认值: get_backend())
+
+    Yields:
+        解析出的 JSON 值
+
+    Raises:
+        ValueError: 如果文件不是合法的 JSON
+    """
+    decoder = json.JSONDecoder()
+    backend = backend or get_backend()
+    # 标准库的 raw_decode 本身就是最快的路径，不需要先按行切分
+    fast_loads = None if type(backend) is JSONBackend else backend.loads
+    buffer = ""
+    pos = 0
+    eof = False
+    in_array = None
+
+    while True:
+        # 跳过值之间的空白和数组分隔符
+        while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+            pos += 1
+        if in_array is None and pos < len(buffer):
+            in_array = buffer[pos] == "["
+            if in_array:
+                pos += 1
+                continue
+        if in_array and pos < len(buffer) and buffer[pos] == "]":
+            return
+        if fast_loads is not None and in_array is False:
+            newline = buffer.find("\n", pos)
+            if newline != -1:
+                try:
+                    value = fast_loads(buffer[pos:newline])
+                except ValueError:
+                    pass
+                else:
+                    yield value
+                    pos = newline + 1
+                    continue
+        if pos < len(buffer):
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError as e:
+                # 记录可能被块边界截断；读入更多数据后重试，文件结束时才报错
+                if eof:
+                    raise ValueError(f"无效的 JSON (位置 {e.pos}): {e.msg}") from None
+            else:
+                # 数字可能被块边界截断 (例如 "12" 后面还有 "3")，在确定后面还有分隔符之前不产出
+                if end < len(buffer) or eof:
+                    yield value
+                    pos = end
+                    continue
+        elif eof:
+            if in_array:
+                raise ValueError("无效的 JSON: 数组没有结束")
+            return
+
+        chunk = stream.read(read_size)
+        buffer = buffer[pos:] + chunk
+        pos = 0
+        eof = not chunk
+
+
+def normalize_dump_record(value: Dict) -> Dict:
+    """
+    将导出文件中的一个条目转换为 API 返回的记录结构。
+
+    导出文件中的条目可能是完整记录 (含 "metadata")，也可能只有元数据本身。
+
+    Args:
+        value: 导出文件中的一个 JSON 对象
+
+    Returns:
+        包含 "id" 和 "metadata" 的记录
+    """
+    if isinstance(value.get("metadata"), dict):
+        return value
+    return {"id": str(value.get("control_number", "")), "metadata": value}
+
+
+def iter_dump_records(path: str, limit: Optional[int] = None, include_deleted: bool = False) -> Iterator[Dict]:
+    """
+    逐条产出导出文件中的原始记录。
+
+    Args:
+        path: 导出文件路径 (可以是 .gz 或 .zst 压缩)
+        limit: 最多产出的记录数，None 表示不限制 (默认值: None)
+        include_deleted: 是否包括标记为已删除的记录 (默认值: False)
+
+    Yields:
+        与 get_record 结构相同的原始记录
+
+    Raises:
+        ValueError: 如果文件不是合法的 JSON
+    """
+    if limit is not None and limit <= 0:
+        return
+    count = 0
+    with open_dump(path) as stream:
+        for value in iter_json_values(stream):
+            if not isinstance(value, dict):
+                continue
+            record = normalize_dump_record(value)
+            if record["metadata"].get("deleted") and not include_deleted:
+                continue
+            yield record
+            count += 1
+            if limit is not None and count >= limit:
+                return
+
+
+def iter_dump_metadata(path: str, limit: Optional[int] = None) -> Iterator[MetadataRecord]:
+    """
+    逐条产出导出文件中记录的格式化元数据。
+
+    使用与 get_metadata 相同的提取逻辑，并附加 get_pdf_url 给出的 "pdf_url" 键。
+
+    Args:
+        path: 导出文件路径
+        limit: 最多产出的记录数，None 表示不限制 (默认值: None)
+
+    Yields:
+        MetadataRecord 实例
+    """
+    for record in iter_dump_records(path, limit=limit):
+        yield MetadataRecord.from_hit(record, pdf_url=True)
+
+
+def ingest_dump(path: str, writers: Iterable = (), index: Optional[MetadataIndex] = None,
+                limit: Optional[int] = None, index_batch_size: int = 5000) -> int:
+    """
+    将导出文件中的记录写入导出写入器和本地索引。
+
+    Args:
+        path: 导出文件路径
+        writers: JSONLinesWriter、CSVTableWriter 等具有 write(metadata) 方法的写入器
+        index: 可选的本地元数据索引；记录按批在一个事务中写入
+        limit: 最多处理的记录数，None 表示不限制 (默认值: None)
+        index_batch_size: 每个索引事务包含的记录数 (默认值: 5000)
+
+    Returns:
+        处理的记录数
+    """
+    writers = list(writers)
+    batch = []
+    count = 0
+    for metadata in iter_dump_metadata(path, limit=limit):
+        for writer in writers:
+            writer.write(metadata)
+        if index is not None:
+            batch.append(metadata)
+            if len(batch) >= index_batch_size:
+                index.add_many(batch)
+                batch = []
+        count += 1
+    if batch:
+        index.add_many(batch)
+    return count
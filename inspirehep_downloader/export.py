@@ -0,0 +1,432 @@
+"""
+将多条记录的元数据流式导出到单个文件。
+"""
+
+import csv
+import gzip
+import io
+import sys
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional
+
+from .records import MetadataRecord, as_dict
+from .jsonlib import get_backend
+
+if TYPE_CHECKING:
+    from .client import InspireHEPClient
+
+
+COMPRESSIONS = ("none", "gzip", "zstd")
+TABLE_FORMATS = ("csv", "parquet")
+
+# 表格导出的列及其类型；authors 和 keywords 在 Parquet 中是字符串列表，在 CSV 中以 "; " 连接
+TABLE_COLUMNS = [
+    ("record_id", "string"),
+    ("title", "string"),
+    ("authors", "list"),
+    ("author_count", "int"),
+    ("abstract", "string"),
+    ("publication_date", "string"),
+    ("arxiv_id", "string"),
+    ("doi", "string"),
+    ("citations", "int"),
+    ("keywords", "list"),
+    ("inspire_url", "string"),
+]
+
+
+def detect_compression(path: str) -> str:
+    """
+    根据文件扩展名推断压缩格式。
+
+    Args:
+        path: 输出文件路径
+
+    Returns:
+        "gzip"、"zstd" 或 "none"
+    """
+    if path.endswith(".gz"):
+        return "gzip"
+    if path.endswith(".zst"):
+        return "zstd"
+    return "none"
+
+
+def _import_zstandard():
+    # 可选依赖只在真正使用时导入，避免拖慢包和命令行的启动
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError("zstd 压缩需要 zstandard: pip install zstandard") from None
+    return zstandard
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Parquet 导出需要 pyarrow: pip install inspirehep_downloader[parquet]") from None
+    return pyarrow
+
+
+class TextOutput:
+    """
+    (可选压缩的) UTF-8 文本输出流。
+
+    关闭时依次刷新文本层、写出压缩尾部并关闭文件；输出到标准输出时不会关闭它。
+    """
+
+    def __init__(self, path: str, compression: Optional[str] = None):
+        """
+        打开输出流。
+
+        Args:
+            path: 输出文件路径；"-" 表示标准输出
+            compression: "none"、"gzip" 或 "zstd"，None 表示根据扩展名推断 (默认值: None)
+
+        Raises:
+            ValueError: 如果压缩格式不受支持
+            ImportError: 如果请求 zstd 但未安装 zstandard
+        """
+        if compression is None:
+            compression = "none" if path == "-" else detect_compression(path)
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"不支持的压缩格式: {compression}。请使用 {', '.join(COMPRESSIONS)}")
+        if compression == "zstd":
+            zstandard = _import_zstandard()
+
+        self._owns_raw = path != "-"
+        self._raw = open(path, "wb") if self._owns_raw else sys.stdout.buffer
+        if compression == "gzip":
+            self._compressor = gzip.GzipFile(fileobj=self._raw, mode="wb")
+        elif compression == "zstd":
+            self._compressor = zstandard.ZstdCompressor().stream_writer(self._raw, closefd=False)
+        else:
+            self._compressor = None
+        target = self._compressor if self._compressor is not None else self._raw
+        self.stream = io.TextIOWrapper(target, encoding="utf-8", newline="")
+
+    def write(self, text: str) -> None:
+        """写入文本。"""
+        self.stream.write(text)
+
+    def flush(self) -> None:
+        """将已写入的数据推送到下游。"""
+        self.stream.flush()
+
+    def close(self) -> None:
+        """刷新并关闭输出流。"""
+        if self.stream is None:
+            return
+        self.stream.flush()
+        # 分离文本层，避免它连带关闭标准输出
+        self.stream.detach()
+        self.stream = None
+        if self._compressor is not None:
+            self._compressor.close()
+        if self._owns_raw:
+            self._raw.close()
+        else:
+            self._raw.flush()
+
+
+class JSONLinesWriter:
+    """
+    将元数据字典逐行写入 JSON Lines 文件，可选 gzip 或 zstd 压缩。
+
+    每条记录写完即可丢弃，内存占用与记录数无关；每写入 flush_every 条记录刷新
+    一次缓冲区，以便中途读取或管道下游能及时看到数据。
+    """
+
+    def __init__(self, path: str, compression: Optional[str] = None, flush_every: int = 1000):
+        """
+        打开输出文件。
+
+        Args:
+            path: 输出文件路径；"-" 表示标准输出
+            compression: "none"、"gzip" 或 "zstd"，None 表示根据扩展名推断 (默认值: None)
+            flush_every: 每写入多少条记录刷新一次 (默认值: 1000)
+        """
+        self.path = path
+        self.flush_every = flush_every
+        self.count = 0
+        self._output = TextOutput(path, compression)
+        self._json = get_backend()
+
+    def write(self, metadata: Dict) -> None:
+        """
+        写入一条元数据。
+
+        Args:
+            metadata: get_metadata / extract_metadata 返回的元数据字典或 MetadataRecord
+        """
+        self._output.write(self._json.dumps(as_dict(metadata)) + "\n")
+        self.count += 1
+        if self.flush_every and self.count % self.flush_every == 0:
+            self._output.flush()
+
+    def close(self) -> None:
+        """刷新并关闭输出文件。"""
+        self._output.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def flatten_metadata(metadata: Dict) -> Dict:
+    """
+    将元数据字典转换为 TABLE_COLUMNS 描述的一行。
+
+    Args:
+        metadata: get_metadata / extract_metadata 返回的元数据字典或 MetadataRecord
+
+    Returns:
+        以列名为键的行字典
+    """
+    authors = list(metadata.get("authors", []))
+    return {
+        "record_id": str(metadata.get("record_id", "")),
+        "title": metadata.get("title"),
+        "authors": authors,
+        "author_count": len(authors),
+        "abstract": metadata.get("abstract"),
+        "publication_date": None if metadata.get("publication_date") is None else str(metadata["publication_date"]),
+        "arxiv_id": metadata.get("arxiv_id"),
+        "doi": metadata.get("doi"),
+        "citations": int(metadata.get("citations") or 0),
+        "keywords": list(metadata.get("keywords", [])),
+        "inspire_url": metadata.get("inspire_url"),
+    }
+
+
+class CSVTableWriter:
+    """将元数据按行写入 CSV 表格，可选 gzip 或 zstd 压缩。"""
+
+    def __init__(self, path: str, compression: Optional[str] = None):
+        """
+        打开输出文件并写入表头。
+
+        Args:
+            path: 输出文件路径；"-" 表示标准输出
+            compression: "none"、"gzip" 或 "zstd"，None 表示根据扩展名推断 (默认值: None)
+        """
+        self.path = path
+        self.count = 0
+        self._output = TextOutput(path, compression)
+        self._writer = csv.writer(self._output.stream)
+        self._writer.writerow([name for name, _ in TABLE_COLUMNS])
+
+    def write(self, metadata: Dict) -> None:
+        """
+        写入一条元数据。
+
+        Args:
+            metadata: get_metadata / extract_metadata 返回的元数据字典或 MetadataRecord
+        """
+        row = flatten_metadata(metadata)
+        self._writer.writerow([
+            "; ".join(row[name]) if kind == "list" else row[name] for name, kind in TABLE_COLUMNS
+        ])
+        self.count += 1
+
+    def close(self) -> None:
+        """刷新并关闭输出文件。"""
+        self._output.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class ParquetTableWriter:
+    """
+    将元数据以行组为单位写入 Parquet 文件。
+
+    每累积 batch_size 条记录就写出一个行组，内存占用只与 batch_size 有关。
+    需要可选依赖 pyarrow。
+    """
+
+    def __init__(self, path: str, batch_size: int = 10000, compression: Optional[str] = None):
+        """
+        打开输出文件。
+
+        Args:
+            path: 输出文件路径
+            batch_size: 每个行组的记录数 (默认值: 10000)
+            compression: 列数据的压缩编码，"none"、"gzip" 或 "zstd"；None 表示 pyarrow 的默认值 snappy
+                (默认值: None)
+
+        Raises:
+            ValueError: 如果压缩格式不受支持
+            ImportError: 如果未安装 pyarrow
+        """
+        if compression is not None and compression not in COMPRESSIONS:
+            raise ValueError(f"不支持的压缩格式: {compression}。请使用 {', '.join(COMPRESSIONS)}")
+        pyarrow = _import_pyarrow()
+
+        types = {"string": pyarrow.string(), "int": pyarrow.int64(), "list": pyarrow.list_(pyarrow.string())}
+        self.path = path
+        self.batch_size = batch_size
+        self.count = 0
+        self.schema = pyarrow.schema([(name, types[kind]) for name, kind in TABLE_COLUMNS])
+        self._columns = {name: [] for name, _ in TABLE_COLUMNS}
+        if compression is None:
+            self._writer = pyarrow.parquet.ParquetWriter(path, self.schema)
+        else:
+            self._writer = pyarrow.parquet.ParquetWriter(path, self.schema, compression=compression)
+
+    def write(self, metadata: Dict) -> None:
+        """
+        写入一条元数据。
+
+        Args:
+            metadata: get_metadata / extract_metadata 返回的元数据字典或 MetadataRecord
+        """
+        row = flatten_metadata(metadata)
+        for name, values in self._columns.items():
+            values.append(row[name])
+        self.count += 1
+        if self.count % self.batch_size == 0:
+            self._flush()
+
+    def close(self) -> None:
+        """写出剩余的行并关闭文件。"""
+        if self._writer is not None:
+            self._flush()
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _flush(self) -> None:
+        if not self._columns["record_id"]:
+            return
+        pyarrow = _import_pyarrow()
+        self._writer.write_table(pyarrow.Table.from_pydict(self._columns, schema=self.schema))
+        self._columns = {name: [] for name, _ in TABLE_COLUMNS}
+
+
+def open_table_writer(path: str, format: Optional[str] = None, compression: Optional[str] = None,
+                      batch_size: int = 10000):
+    """
+    根据格式或扩展名创建表格写入器。
+
+    Args:
+        path: 输出文件路径
+        format: "csv" 或 "parquet"，None 表示根据扩展名推断 (.parquet 为 Parquet，其余为 CSV)
+        compression: "none"、"gzip" 或 "zstd"；CSV 压缩整个文件，None 表示根据扩展名推断；
+            Parquet 压缩列数据，None 表示 snappy (默认值: None)
+        batch_size: Parquet 每个行组的记录数 (默认值: 10000)
+
+    Returns:
+        CSVTableWriter 或 ParquetTableWriter
+
+    Raises:
+        ValueError: 如果格式不受支持
+    """
+    if format is None:
+        format = "parquet" if path.endswith(".parquet") else "csv"
+    if format == "parquet":
+        return ParquetTableWriter(path, batch_size=batch_size, compression=compression)
+    if format == "csv":
+        return CSVTableWriter(path, compression)
+    raise ValueError(f"不支持的表格格式: {format}。请使用 {', '.join(TABLE_FORMATS)}")
+
+
+def iter_search_metadata(client: "InspireHEPClient", query: str, limit: Optional[int] = None,
+                         page_size: int = 100) -> Iterator[MetadataRecord]:
+    """
+    逐条产出搜索结果的格式化元数据，只请求元数据所需的字段。
+
+    Args:
+        client: 用于搜索的客户端
+        query: 搜索查询字符串
+        limit: 最多产出的记录数，None 表示不限制 (默认值: None)
+        page_size: 每页的结果数 (默认值: 100)
+
+    Yields:
+        MetadataRecord 实例
+    """
+    for hit in client.iter_literature(query, size=page_size, limit=limit, fields=client.METADATA_FIELDS):
+        yield MetadataRecord.from_hit(hit)
+
+
+def iter_records_metadata(client: "InspireHEPClient", record_ids: Iterable[str], batch_size: int = 50,
+                          missing: Optional[List[str]] = None) -> Iterator[MetadataRecord]:
+    """
+    按批获取记录并逐条产出格式化元数据。
+
+    Args:
+        client: 用于获取记录的客户端
+        record_ids: INSPIRE-HEP 记录 ID 的可迭代对象
+        batch_size: 每次请求获取的记录数 (默认值: 50)
+        missing: 可选的列表，未找到的记录 ID 会追加到其中
+
+    Yields:
+        MetadataRecord 实例，顺序与 record_ids 一致
+    """
+    batch = []
+    for record_id in record_ids:
+        batch.append(str(record_id))
+        if len(batch) >= batch_size:
+            yield from _batch_metadata(client, batch, missing)
+            batch = []
+    if batch:
+        yield from _batch_metadata(client, batch, missing)
+
+
+def _batch_metadata(client, batch, missing):
+    records, not_found = client.get_records(batch, chunk_size=len(batch), fields=client.METADATA_FIELDS)
+    if missing is not None:
+        missing.extend(not_found)
+    for record_id in batch:
+        if record_id in records:
+            yield MetadataRecord.from_hit(records.pop(record_id), record_id)
+
+
+def export_jsonl(metadata_items: Iterable[Dict], path: str, compression: Optional[str] = None) -> int:
+    """
+    将元数据流式写入 JSON Lines 文件。
+
+    Args:
+        metadata_items: 元数据字典的可迭代对象 (例如 iter_search_metadata 的结果)
+        path: 输出文件路径；"-" 表示标准输出
+        compression: "none"、"gzip" 或 "zstd"，None 表示根据扩展名推断 (默认值: None)
+
+    Returns:
+        写入的记录数
+    """
+    with JSONLinesWriter(path, compression) as writer:
+        for metadata in metadata_items:
+            writer.write(metadata)
+    return writer.count
+
+
+def export_table(metadata_items: Iterable[Dict], path: str, format: Optional[str] = None,
+                 compression: Optional[str] = None, batch_size: int = 10000) -> int:
+    """
+    将元数据写入列式表格 (Parquet) 或 CSV 表格。
+
+    Args:
+        metadata_items: 元数据字典的可迭代对象 (例如 iter_search_metadata 的结果)
+        path: 输出文件路径
+        format: "csv" 或 "parquet"，None 表示根据扩展名推断
+        compression: "none"、"gzip" 或 "zstd"，含义见 open_table_writer (默认值: None)
+        batch_size: Parquet 每个行组的记录数 (默认值: 10000)
+
+    Returns:
+        写入的记录数
+    """
+    with open_table_writer(path, format, compression, batch_size) as writer:
+        for metadata in metadata_items:
+            writer.write(metadata)
+    return writer.count
@@ -0,0 +1,316 @@
+"""
+按广度优先遍历 INSPIRE-HEP 记录的参考文献和引用关系。
+"""
+
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, Iterable, List, Optional
+from .client import InspireHEPClient
+from .bulk import BulkDownloader
+from .index import MetadataIndex
+from .store import BlobStore
+from .progress import echo
+
+
+DIRECTIONS = ("references", "citations")
+
+EDGES_FILENAME = "graph_edges.csv"
+
+_RECORD_REF = re.compile(r"/literature/(\d+)/?$")
+
+
+def reference_ids(record: Dict) -> List[str]:
+    """
+    从原始记录中提取被引用记录的 ID (metadata.references[].record.$ref)。
+
+    Args:
+        record: 包含 references.record 字段的原始记录
+
+    Returns:
+        去重后的记录 ID 列表；没有链接到 INSPIRE 记录的参考文献会被忽略
+    """
+    ids = []
+    for reference in record.get("metadata", {}).get("references", []):
+        match = _RECORD_REF.search(reference.get("record", {}).get("$ref", ""))
+        if match and match.group(1) not in ids:
+            ids.append(match.group(1))
+    return ids
+
+
+def _hit_id(hit):
+    return str(hit.get("id") or hit.get("metadata", {}).get("control_number"))
+
+
+class GraphCrawler:
+    """
+    从种子记录出发，按层广度优先扩展参考文献和引用。
+
+    每一层的记录用 get_records 按批获取，引用通过 "refersto:recid:N" 搜索获取，二者都在一个
+    有界线程池中并发执行；已访问的记录只扩展一次。被发现的边立即追加到 CSV 文件
+    ("citing,cited"，即前者引用后者)。传入 BulkDownloader 时，每个节点的记录会直接交给它下载
+    元数据和 PDF，不再重复请求 API。
+
+    达到 max_nodes 后不再翻页获取引用：还没有扫描完的节点在爬取结束时用
+    "refersto:recid:N and (recid:a or ...)" 只查询已访问节点中的引用，补全它们之间的边，
+    因此请求数取决于 max_nodes 而不是被引次数。
+    """
+
+    # 扩展节点需要参考文献链接；其余字段供下载元数据和 PDF 使用
+    NODE_FIELDS = InspireHEPClient.RECORD_FIELDS + ["references.record"]
+
+    def __init__(self, client: Optional[InspireHEPClient] = None, max_depth: int = 1, max_nodes: int = 500,
+                 directions: Iterable[str] = DIRECTIONS, workers: int = 4, edges_path: Optional[str] = None,
+                 bulk: Optional[BulkDownloader] = None, batch_size: int = 50, page_size: int = 250):
+        """
+        初始化爬取器。
+
+        Args:
+            client: 可选的共享客户端 (默认值: 新建一个 InspireHEPClient)
+            max_depth: 从种子出发的最大层数，0 表示只处理种子本身 (默认值: 1)
+            max_nodes: 最多访问的记录数 (包括种子)；达到后不再加入新记录 (默认值: 500)
+            directions: 要扩展的方向，"references" 和/或 "citations" (默认值: 两者)
+            workers: 同时进行的 API 请求数 (默认值: 4)
+            edges_path: 可选的边文件路径，发现的边会逐条追加到其中
+            bulk: 可选的批量下载器，所有节点会提交给它下载
+            batch_size: 每次批量获取的记录数 (默认值: 50)
+            page_size: 引用搜索的每页结果数 (默认值: 250)
+        """
+        directions = tuple(directions)
+        for direction in directions:
+            if direction not in DIRECTIONS:
+                raise ValueError(f"不支持的方向: {direction}。请使用 {', '.join(DIRECTIONS)}")
+        if workers < 1:
+            raise ValueError("workers 必须至少为 1")
+
+        self.client = client or (bulk.client if bulk is not None else InspireHEPClient(pool_maxsize=workers))
+        self.max_depth = max_depth
+        self.max_nodes = max_nodes
+        self.directions = directions
+        self.workers = workers
+        self.edges_path = edges_path
+        self.bulk = bulk
+        self.batch_size = batch_size
+        self.page_size = page_size
+        self.nodes = {}
+        self.edges = set()
+        self.errors = {}
+        self.downloads = {}
+        self.truncated = False
+        self._records = {}
+        self._unfinished = []
+        self._lock = threading.Lock()
+        self._edges_file = None
+
+    def crawl(self, seeds: Iterable[str]) -> Dict:
+        """
+        从种子记录开始爬取。
+
+        Args:
+            seeds: 种子记录 ID 的可迭代对象
+
+        Returns:
+            包含 "nodes" (记录 ID 到层数的映射)、"edges" (边数)、"truncated" (是否因 max_nodes 停止扩展)、
+            "errors" (记录 ID 到错误信息的映射) 和 "downloads" (提交下载时为每条记录的结果字典) 的摘要
+        """
+        level = []
+        for seed in dict.fromkeys(str(seed) for seed in seeds):
+            if self._admit(seed, 0):
+                level.append(seed)
+
+        if self.edges_path:
+            directory = os.path.dirname(self.edges_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._edges_file = open(self.edges_path, "w", encoding="utf-8")
+            self._edges_file.write("citing,cited\n")
+
+        futures = {}
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                depth = 0
+                while level:
+                    level = self._crawl_level(pool, level, depth, futures)
+                    if self._edges_file is not None:
+                        self._edges_file.flush()
+                    depth += 1
+                self._close_edges(pool)
+        finally:
+            if self._edges_file is not None:
+                self._edges_file.close()
+                self._edges_file = None
+
+        for record_id, future in futures.items():
+            self.downloads[record_id] = future.result()
+        return {
+            "nodes": dict(self.nodes),
+            "edges": len(self.edges),
+            "truncated": self.truncated,
+            "errors": dict(self.errors),
+            "downloads": self.downloads,
+        }
+
+    def _crawl_level(self, pool, level, depth, futures):
+        expand = depth < self.max_depth
+        next_level = []
+
+        # 本层中还没有记录的节点按批获取；不扩展也不下载的叶子节点不需要请求
+        if expand or self.bulk is not None:
+            fields = self.NODE_FIELDS if expand else self.client.RECORD_FIELDS
+            to_fetch = [record_id for record_id in level if record_id not in self._records]
+            batches = [pool.submit(self.client.get_records, to_fetch[i:i + self.batch_size],
+                                   chunk_size=self.batch_size, fields=fields)
+                       for i in range(0, len(to_fetch), self.batch_size)]
+            for batch in batches:
+                try:
+                    records, missing = batch.result()
+                except Exception as e:
+                    echo(self.client.progress, f"警告: 批量获取记录失败: {e}")
+                    continue
+                with self._lock:
+                    self._records.update(records)
+                    for record_id in missing:
+                        self.errors[record_id] = "记录不存在"
+
+        searches = []
+        for record_id in level:
+            with self._lock:
+                record = self._records.pop(record_id, None)
+            if record is None:
+                if expand or self.bulk is not None:
+                    with self._lock:
+                        self.errors.setdefault(record_id, "无法获取记录")
+                continue
+            if self.bulk is not None:
+                futures[record_id] = self.bulk.submit(record_id, record)
+            if not expand:
+                continue
+            if "references" in self.directions:
+                for cited in reference_ids(record):
+                    self._link(record_id, cited, cited, depth + 1, next_level)
+            if "citations" in self.directions:
+                searches.append(pool.submit(self._expand_citations, record_id, depth + 1, next_level))
+
+        wait(searches)
+        for search in searches:
+            if search.exception() is not None:
+                echo(self.client.progress, f"警告: 获取引用失败: {search.exception()}")
+        return next_level
+
+    def _expand_citations(self, record_id, depth, next_level):
+        # 引用记录本身就是下一层的节点，直接请求下一层需要的字段，省去再次获取
+        if depth < self.max_depth:
+            fields = self.NODE_FIELDS
+        elif self.bulk is not None:
+            fields = self.client.RECORD_FIELDS
+        else:
+            fields = ["control_number"]
+        if not self.truncated:
+            # 不预取：预算用完时已在途的下一页会白白下载完整的字段
+            for hits in self.client.iter_literature_pages(f"refersto:recid:{record_id}", size=self.page_size,
+                                                          fields=fields, prefetch=False):
+                for hit in hits:
+                    citing = _hit_id(hit)
+                    if self._link(citing, record_id, citing, depth, next_level) and fields != ["control_number"]:
+                        with self._lock:
+                            self._records[citing] = hit
+                if self.truncated:
+                    break
+            else:
+                return
+        # 预算已用完：剩余的引用记录不会再加入，它们与已访问节点之间的边在结束时由 _close_edges 补全
+        with self._lock:
+            self._unfinished.append(record_id)
+
+    def _close_edges(self, pool):
+        # 对引用没有扫描完的节点，只查询已访问节点中引用它的记录；每个查询最多返回一页
+        if not self._unfinished:
+            return
+        nodes = sorted(self.nodes)
+        chunks = [nodes[i:i + self.batch_size] for i in range(0, len(nodes), self.batch_size)]
+        searches = [pool.submit(self._close_edges_chunk, record_id, chunk)
+                    for record_id in self._unfinished for chunk in chunks]
+        wait(searches)
+        for search in searches:
+            if search.exception() is not None:
+                echo(self.client.progress, f"警告: 获取引用失败: {search.exception()}")
+        self._unfinished = []
+
+    def _close_edges_chunk(self, record_id, chunk):
+        query = f"refersto:recid:{record_id} and ({' or '.join(f'recid:{n}' for n in chunk)})"
+        for hit in self.client.iter_literature(query, size=len(chunk), fields=["control_number"], prefetch=False):
+            citing = _hit_id(hit)
+            with self._lock:
+                known = citing in self.nodes
+            if known:
+                self._link(citing, record_id, citing, 0, [])
+
+    def _admit(self, record_id, depth):
+        # 调用方必须持有锁或处于单线程阶段
+        if record_id in self.nodes:
+            return False
+        if len(self.nodes) >= self.max_nodes:
+            self.truncated = True
+            return False
+        self.nodes[record_id] = depth
+        return True
+
+    def _link(self, citing, cited, new_node, depth, next_level):
+        """记录一条边；new_node 是第一次访问时需要加入下一层的一端。返回是否加入了新节点。"""
+        with self._lock:
+            admitted = self._admit(new_node, depth)
+            if admitted:
+                next_level.append(new_node)
+            elif new_node not in self.nodes:
+                return False
+            if (citing, cited) not in self.edges:
+                self.edges.add((citing, cited))
+                if self._edges_file is not None:
+                    self._edges_file.write(f"{citing},{cited}\n")
+            return admitted
+
+
+def crawl_graph(seeds: Iterable[str], max_depth: int = 1, max_nodes: int = 500,
+                directions: Iterable[str] = DIRECTIONS, workers: int = 4, edges_path: Optional[str] = None,
+                download: bool = False, output_dir: str = ".", download_pdf_flag: bool = True,
+                download_metadata_flag: bool = True, pdf_workers: int = 4, format: str = "json",
+                skip_existing: bool = False, client: Optional[InspireHEPClient] = None,
+                index: Optional[MetadataIndex] = None, store: Optional[BlobStore] = None) -> Dict:
+    """
+    广度优先爬取种子记录的参考文献和引用，可选地下载所有访问到的记录。
+
+    Args:
+        seeds: 种子记录 ID 的可迭代对象
+        max_depth: 从种子出发的最大层数 (默认值: 1)
+        max_nodes: 最多访问的记录数 (默认值: 500)
+        directions: "references" 和/或 "citations" (默认值: 两者)
+        workers: 同时进行的 INSPIRE API 请求数 (默认值: 4)
+        edges_path: 可选的边文件路径 (CSV，"citing,cited")
+        download: 是否下载所有访问到的记录 (默认值: False)
+        output_dir: 下载文件的保存目录 (默认值: 当前目录)
+        download_pdf_flag: 下载时是否下载 PDF (默认值: True)
+        download_metadata_flag: 下载时是否下载元数据 (默认值: True)
+        pdf_workers: 同时进行的 PDF 下载数 (默认值: 4)
+        format: 元数据格式，"json" 或 "txt" (默认值: "json")
+        skip_existing: 跳过磁盘上已存在的文件 (默认值: False)
+        client: 可选的共享客户端
+        index: 可选的本地元数据索引
+        store: 可选的内容寻址 PDF 存储
+
+    Returns:
+        GraphCrawler.crawl 返回的摘要字典
+    """
+    if client is None:
+        client = InspireHEPClient(pool_maxsize=workers * 2 + pdf_workers)
+    if not download:
+        crawler = GraphCrawler(client, max_depth=max_depth, max_nodes=max_nodes, directions=directions,
+                               workers=workers, edges_path=edges_path)
+        return crawler.crawl(seeds)
+
+    with BulkDownloader(output_dir, download_pdf_flag, download_metadata_flag, api_workers=workers,
+                        pdf_workers=pdf_workers, format=format, client=client, skip_existing=skip_existing,
+                        index=index, store=store) as bulk:
+        crawler = GraphCrawler(client, max_depth=max_depth, max_nodes=max_nodes, directions=directions,
+                               workers=workers, edges_path=edges_path, bulk=bulk)
+        return crawler.crawl(seeds)
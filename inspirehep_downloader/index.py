@@ -0,0 +1,256 @@
+"""
+已下载记录的本地元数据索引，支持离线全文检索。
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+
+DEFAULT_INDEX_FILENAME = "inspirehep_index.sqlite"
+
+ORDERS = ("relevance", "citations", "date")
+
+
+class MetadataIndex:
+    """
+    基于 SQLite 的本地元数据索引。
+
+    下载器写入元数据时逐条更新索引，无需重建。标题、摘要、关键字和作者通过
+    FTS5 全文索引检索 (使用 Porter 词干，"hole" 也能匹配 "holes")；如果 SQLite
+    未编译 FTS5，则退回到 LIKE 匹配。
+    同一个索引对象可以在多个线程之间共享。
+    """
+
+    def __init__(self, path: str):
+        """
+        打开 (或创建) 索引。
+
+        Args:
+            path: SQLite 数据库文件路径；如果是目录，则使用其中的 inspirehep_index.sqlite
+        """
+        path = os.path.expanduser(path)
+        if os.path.isdir(path):
+            path = os.path.join(path, DEFAULT_INDEX_FILENAME)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS records ("
+                " record_id TEXT PRIMARY KEY,"
+                " title TEXT,"
+                " authors TEXT,"
+                " abstract TEXT,"
+                " publication_date TEXT,"
+                " arxiv_id TEXT,"
+                " doi TEXT,"
+                " citations INTEGER,"
+                " keywords TEXT,"
+                " inspire_url TEXT,"
+                " metadata_path TEXT,"
+                " pdf_path TEXT,"
+                " indexed_at REAL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS record_authors (record_id TEXT NOT NULL, author TEXT NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS record_authors_author ON record_authors (author COLLATE NOCASE)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS record_authors_record ON record_authors (record_id)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS records_citations ON records (citations)")
+            try:
+                self._conn.execute(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS records_fts USING fts5("
+                    " record_id UNINDEXED, title, abstract, keywords, authors, tokenize = 'porter unicode61')"
+                )
+                self.fts = True
+            except sqlite3.OperationalError:
+                self.fts = False
+
+    def add(self, metadata: Dict, metadata_path: Optional[str] = None, pdf_path: Optional[str] = None) -> None:
+        """
+        插入或更新一条记录。
+
+        Args:
+            metadata: get_metadata / extract_metadata 返回的元数据字典
+            metadata_path: 可选的元数据文件路径
+            pdf_path: 可选的 PDF 文件路径
+        """
+        with self._lock, self._conn:
+            self._insert(metadata, metadata_path, pdf_path)
+
+    def add_many(self, items: Iterable[Dict]) -> int:
+        """
+        在一个事务中插入或更新多条记录，用于批量导入。
+
+        Args:
+            items: 元数据字典的可迭代对象
+
+        Returns:
+            写入的记录数
+        """
+        count = 0
+        with self._lock, self._conn:
+            for metadata in items:
+                self._insert(metadata)
+                count += 1
+        return count
+
+    def _insert(self, metadata, metadata_path=None, pdf_path=None):
+        # 调用方必须持有锁并处于事务中
+        record_id = str(metadata["record_id"])
+        authors = list(metadata.get("authors", []))
+        keywords = "; ".join(metadata.get("keywords", []))
+        row = (
+            record_id,
+            metadata.get("title"),
+            "; ".join(authors),
+            metadata.get("abstract"),
+            None if metadata.get("publication_date") is None else str(metadata["publication_date"]),
+            metadata.get("arxiv_id"),
+            metadata.get("doi"),
+            int(metadata.get("citations") or 0),
+            keywords,
+            metadata.get("inspire_url"),
+            metadata_path,
+            pdf_path,
+            time.time(),
+        )
+        self._conn.execute(
+            "INSERT INTO records (record_id, title, authors, abstract, publication_date, arxiv_id, doi,"
+            " citations, keywords, inspire_url, metadata_path, pdf_path, indexed_at)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+            " ON CONFLICT (record_id) DO UPDATE SET"
+            " title = excluded.title, authors = excluded.authors, abstract = excluded.abstract,"
+            " publication_date = excluded.publication_date, arxiv_id = excluded.arxiv_id, doi = excluded.doi,"
+            " citations = excluded.citations, keywords = excluded.keywords, inspire_url = excluded.inspire_url,"
+            " metadata_path = COALESCE(excluded.metadata_path, records.metadata_path),"
+            " pdf_path = COALESCE(excluded.pdf_path, records.pdf_path),"
+            " indexed_at = excluded.indexed_at",
+            row,
+        )
+        self._conn.execute("DELETE FROM record_authors WHERE record_id = ?", (record_id,))
+        self._conn.executemany(
+            "INSERT INTO record_authors (record_id, author) VALUES (?, ?)",
+            [(record_id, author) for author in authors],
+        )
+        if self.fts:
+            # 按 rowid 删除旧的全文索引行；按未索引的 record_id 列删除需要扫描整个表
+            rowid = self._conn.execute("SELECT rowid FROM records WHERE record_id = ?", (record_id,)).fetchone()[0]
+            self._conn.execute("DELETE FROM records_fts WHERE rowid = ?", (rowid,))
+            self._conn.execute(
+                "INSERT INTO records_fts (rowid, record_id, title, abstract, keywords, authors)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (rowid, record_id, row[1], row[3], keywords, row[2]),
+            )
+
+    def set_pdf_path(self, record_id: str, pdf_path: str) -> None:
+        """
+        记录已下载 PDF 的路径。
+
+        Args:
+            record_id: INSPIRE-HEP 记录 ID
+            pdf_path: PDF 文件路径
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO records (record_id, pdf_path, indexed_at) VALUES (?, ?, ?)"
+                " ON CONFLICT (record_id) DO UPDATE SET pdf_path = excluded.pdf_path",
+                (str(record_id), pdf_path, time.time()),
+            )
+
+    def search(self, text: Optional[str] = None, author: Optional[str] = None, order: str = "relevance",
+               limit: int = 20) -> List[Dict]:
+        """
+        离线检索索引中的记录。
+
+        Args:
+            text: 可选的全文查询，匹配标题、摘要、关键字和作者 (支持 FTS5 语法)
+            author: 可选的作者名，不区分大小写的子串匹配
+            order: 排序方式，"relevance"、"citations" 或 "date" (默认值: "relevance")
+            limit: 最多返回的结果数 (默认值: 20)
+
+        Returns:
+            结果字典列表，authors 和 keywords 为列表
+
+        Raises:
+            ValueError: 如果排序方式不受支持
+        """
+        if order not in ORDERS:
+            raise ValueError(f"不支持的排序方式: {order}。请使用 {', '.join(ORDERS)}")
+
+        try:
+            return self._search(text, author, order, limit)
+        except sqlite3.OperationalError:
+            if not text or not self.fts:
+                raise
+            # 查询不是合法的 FTS5 语法时，把每个词当作普通短语
+            quoted = " ".join('"{}"'.format(term.replace('"', '""')) for term in text.split())
+            return self._search(quoted, author, order, limit)
+
+    def count(self) -> int:
+        """返回索引中的记录数。"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+
+    def close(self) -> None:
+        """关闭数据库连接。"""
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _search(self, text, author, order, limit):
+        sql = "SELECT r.* FROM records r"
+        where = []
+        params = []
+        rank = None
+
+        if text:
+            if self.fts:
+                sql += " JOIN records_fts f ON f.rowid = r.rowid"
+                where.append("records_fts MATCH ?")
+                params.append(text)
+                rank = "bm25(records_fts)"
+            else:
+                like = f"%{text}%"
+                where.append("(r.title LIKE ? OR r.abstract LIKE ? OR r.keywords LIKE ? OR r.authors LIKE ?)")
+                params.extend([like] * 4)
+        if author:
+            where.append("r.record_id IN (SELECT record_id FROM record_authors WHERE author LIKE ?)")
+            params.append(f"%{author}%")
+
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        if order == "citations":
+            sql += " ORDER BY r.citations DESC"
+        elif order == "date":
+            sql += " ORDER BY r.publication_date DESC"
+        elif rank:
+            sql += f" ORDER BY {rank}"
+        else:
+            sql += " ORDER BY r.citations DESC"
+        sql += " LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+
+        results = []
+        for row in rows:
+            result = dict(row)
+            result["authors"] = result["authors"].split("; ") if result["authors"] else []
+            result["keywords"] = result["keywords"].split("; ") if result["keywords"] else []
+            results.append(result)
+        return results
@@ -0,0 +1,158 @@
+"""
+可替换的 JSON 编解码后端。
+
+安装了 orjson 时默认使用 orjson，否则使用标准库 json。两者产生相同的 Python 对象；
+编码结果只在空白上有差别 (orjson 的紧凑输出不含空格)。
+"""
+
+import json
+from typing import Optional, Union
+
+
+BACKENDS = ("auto", "orjson", "json")
+
+_default_name = "auto"
+_backends = {}
+
+
+class JSONBackend:
+    """
+    基于标准库 json 的后端；也是其他后端的基类。
+    """
+
+    name = "json"
+
+    def loads(self, data: Union[bytes, str]):
+        """
+        解码 JSON 文档。
+
+        Args:
+            data: UTF-8 字节串或字符串
+
+        Returns:
+            解码后的 Python 对象
+
+        Raises:
+            ValueError: 如果数据不是合法的 JSON
+        """
+        return json.loads(data)
+
+    def dumps(self, obj, indent: bool = False) -> str:
+        """
+        将对象编码为 JSON 字符串，非 ASCII 字符原样保留。
+
+        Args:
+            obj: 要编码的对象 (dict、list、str、int 等)
+            indent: 是否使用两个空格缩进 (默认值: False)
+
+        Returns:
+            JSON 字符串
+        """
+        return json.dumps(obj, ensure_ascii=False, indent=2 if indent else None)
+
+    def dumpb(self, obj, indent: bool = False) -> bytes:
+        """
+        与 dumps 相同，但返回 UTF-8 字节串，可以直接写入二进制文件。
+        """
+        return self.dumps(obj, indent=indent).encode("utf-8")
+
+    def decode_response(self, response):
+        """
+        解码 requests 响应体。
+
+        Args:
+            response: requests.Response
+
+        Returns:
+            解码后的 Python 对象
+        """
+        return response.json()
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self.name}>"
+
+
+class OrjsonBackend(JSONBackend):
+    """
+    基于 orjson 的后端；解码和编码都比标准库快数倍。
+    """
+
+    name = "orjson"
+
+    def __init__(self):
+        self._orjson = _import_orjson()
+
+    def loads(self, data: Union[bytes, str]):
+        return self._orjson.loads(data)
+
+    def dumps(self, obj, indent: bool = False) -> str:
+        return self.dumpb(obj, indent=indent).decode("utf-8")
+
+    def dumpb(self, obj, indent: bool = False) -> bytes:
+        return self._orjson.dumps(obj, option=self._orjson.OPT_INDENT_2 if indent else 0)
+
+    def decode_response(self, response):
+        # 直接解码原始字节，跳过 requests 的编码探测和解码为 str 的中间步骤
+        return self._orjson.loads(response.content)
+
+
+def _import_orjson():
+    try:
+        import orjson
+    except ImportError:
+        raise ImportError("orjson 后端需要 orjson: pip install inspirehep_downloader[fast]") from None
+    return orjson
+
+
+def get_backend(name: Optional[str] = None) -> JSONBackend:
+    """
+    返回指定名称的 JSON 后端 (同一名称总是返回同一实例)。
+
+    Args:
+        name: "auto"、"orjson" 或 "json"；None 表示使用 set_default_backend 设置的默认值 (初始为 "auto")。
+              "auto" 在安装了 orjson 时使用 orjson，否则使用标准库
+
+    Returns:
+        JSONBackend 实例
+
+    Raises:
+        ValueError: 如果名称不受支持
+        ImportError: 如果明确要求 orjson 但未安装
+    """
+    if name is None:
+        name = _default_name
+    if name not in BACKENDS:
+        raise ValueError(f"不支持的 JSON 后端: {name}。请使用 {', '.join(BACKENDS)}")
+    backend = _backends.get(name)
+    if backend is None:
+        if name == "json":
+            backend = JSONBackend()
+        elif name == "orjson":
+            backend = OrjsonBackend()
+        else:
+            try:
+                backend = get_backend("orjson")
+            except ImportError:
+                backend = get_backend("json")
+        _backends[name] = backend
+    return backend
+
+
+def set_default_backend(name: str) -> JSONBackend:
+    """
+    设置 get_backend() 默认使用的后端，并立即检查它是否可用。
+
+    Args:
+        name: "auto"、"orjson" 或 "json"
+
+    Returns:
+        新的默认后端
+
+    Raises:
+        ValueError: 如果名称不受支持
+        ImportError: 如果要求 orjson 但未安装
+    """
+    global _default_name
+    backend = get_backend(name)
+    _default_name = name
+    return backend
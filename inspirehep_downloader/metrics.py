@@ -0,0 +1,253 @@
+"""
+客户端和下载器的计时与计数指标。
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional, Sequence
+
+
+# 各阶段延迟直方图的桶上界 (秒)
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# 阶段名称及其含义；requests 不单独暴露 DNS 和连接时间，它们包含在 ttfb 中
+STAGES = {
+    "rate_limit_wait": "在限速器中等待令牌的时间",
+    "request": "一次 API 调用的总时间，包括重试",
+    "ttfb": "从发送请求到收到响应头的时间 (包括 DNS 和连接)",
+    "json_parse": "解码 JSON 响应的时间",
+    "body_transfer": "接收文件响应体的时间 (不含写盘)",
+    "disk_write": "写入 PDF 和元数据文件的时间",
+}
+
+COUNTERS = {
+    "requests_total": "发送的 HTTP 请求数 (包括重试)",
+    "retries_total": "因 429/5xx 或连接错误而重试的次数",
+    "cache_hits_total": "直接使用新鲜缓存条目的次数",
+    "cache_revalidated_total": "过期缓存条目经 304 重新验证的次数",
+    "cache_misses_total": "缓存未命中或内容已变化的次数",
+    "bytes_downloaded_total": "从网络接收的响应体字节数",
+    "bytes_written_total": "写入磁盘的字节数",
+    "records_downloaded_total": "成功处理的记录数",
+    "records_failed_total": "处理失败的记录数",
+    "pdf_hedges_total": "首选 PDF 来源未在期限内响应而向其他来源发出的对冲请求数",
+    "pdf_source_failures_total": "失败后换用其他来源的 PDF 下载尝试数",
+}
+
+
+class Histogram:
+    """累积桶直方图，与 Prometheus 的 histogram 类型对应。"""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        """
+        初始化直方图。
+
+        Args:
+            buckets: 递增的桶上界 (默认值: DEFAULT_BUCKETS)
+        """
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        """
+        记录一个观测值。调用方负责加锁。
+
+        Args:
+            value: 观测值 (秒)
+        """
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """
+        用桶上界估计分位数。
+
+        Args:
+            q: 0 到 1 之间的分位数
+
+        Returns:
+            包含该分位数的桶的上界；落在最后一个桶时返回最大观测值
+        """
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            if cumulative >= target:
+                return min(bound, self.max)
+        return self.max
+
+
+class MetricsCollector:
+    """
+    线程安全的指标收集器。
+
+    通过 InspireHEPClient(metrics=...) 接入后，客户端、调度器和下载函数会记录各阶段的
+    延迟直方图以及字节数、重试次数和缓存命中等计数。可以继承并重写 observe 和 inc，
+    把指标转发到其他系统。
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        """
+        初始化收集器。
+
+        Args:
+            buckets: 延迟直方图的桶上界 (默认值: DEFAULT_BUCKETS)
+        """
+        self.buckets = tuple(buckets)
+        self.histograms = {}
+        self.counters = {name: 0 for name in COUNTERS}
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, seconds: float) -> None:
+        """
+        记录一个阶段的耗时。
+
+        Args:
+            stage: 阶段名称，见 STAGES
+            seconds: 耗时秒数
+        """
+        with self._lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def inc(self, name: str, value: int = 1) -> None:
+        """
+        增加一个计数器。
+
+        Args:
+            name: 计数器名称，见 COUNTERS
+            value: 增量 (默认值: 1)
+        """
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    @contextmanager
+    def time(self, stage: str):
+        """
+        记录 with 语句块耗时的上下文管理器。
+
+        Args:
+            stage: 阶段名称
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def summary(self) -> str:
+        """
+        生成可读的摘要。
+
+        Returns:
+            多行文本，每个阶段一行，随后是非零的计数器
+        """
+        lines = ["阶段耗时 (次数 / 平均 / p50 / p95 / 最大 / 合计):"]
+        with self._lock:
+            for stage, histogram in self.histograms.items():
+                mean = histogram.sum / histogram.count
+                lines.append(
+                    f"  {stage:<16} {histogram.count:>7}  {_ms(mean):>9}  {_ms(histogram.quantile(0.5)):>9}  "
+                    f"{_ms(histogram.quantile(0.95)):>9}  {_ms(histogram.max):>9}  {histogram.sum:>8.2f} s"
+                )
+            counters = [(name, value) for name, value in self.counters.items() if value]
+        if counters:
+            lines.append("计数:")
+            for name, value in counters:
+                if name.startswith("bytes_"):
+                    lines.append(f"  {name:<26} {value / 1e6:.1f} MB")
+                else:
+                    lines.append(f"  {name:<26} {value}")
+        return "\n".join(lines)
+
+    def to_prometheus(self, prefix: str = "inspirehep") -> str:
+        """
+        以 Prometheus 文本格式导出所有指标。
+
+        Args:
+            prefix: 指标名前缀 (默认值: "inspirehep")
+
+        Returns:
+            Prometheus 文本格式的字符串
+        """
+        lines = []
+        with self._lock:
+            name = f"{prefix}_stage_seconds"
+            lines.append(f"# HELP {name} 各阶段耗时")
+            lines.append(f"# TYPE {name} histogram")
+            for stage, histogram in self.histograms.items():
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{stage="{stage}",le="{bound:g}"}} {cumulative}')
+                lines.append(f'{name}_bucket{{stage="{stage}",le="+Inf"}} {histogram.count}')
+                lines.append(f'{name}_sum{{stage="{stage}"}} {histogram.sum:.6f}')
+                lines.append(f'{name}_count{{stage="{stage}"}} {histogram.count}')
+            for counter, value in self.counters.items():
+                name = f"{prefix}_{counter}"
+                lines.append(f"# HELP {name} {COUNTERS.get(counter, counter)}")
+                lines.append(f"# TYPE {name} counter")
+                lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str, prefix: str = "inspirehep") -> None:
+        """
+        以原子方式把指标写入 Prometheus 文本文件 (例如供 node_exporter 的 textfile 收集器读取)。
+
+        Args:
+            path: 输出文件路径
+            prefix: 指标名前缀 (默认值: "inspirehep")
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        part_path = path + ".part"
+        with open(part_path, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus(prefix))
+        os.replace(part_path, path)
+
+
+def _ms(seconds: float) -> str:
+    return f"{seconds * 1000:.1f} ms"
+
+
+def observe(metrics: Optional[MetricsCollector], stage: str, start: float) -> None:
+    """
+    如果启用了指标，记录从 start (time.perf_counter) 到现在的耗时。
+
+    Args:
+        metrics: 可选的收集器
+        stage: 阶段名称
+        start: 开始时间
+    """
+    if metrics is not None:
+        metrics.observe(stage, time.perf_counter() - start)
+
+
+def inc(metrics: Optional[MetricsCollector], name: str, value: int = 1) -> None:
+    """
+    如果启用了指标，增加计数器。
+
+    Args:
+        metrics: 可选的收集器
+        name: 计数器名称
+        value: 增量 (默认值: 1)
+    """
+    if metrics is not None:
+        metrics.inc(name, value)
@@ -0,0 +1,317 @@
+"""
+批量下载和大文件下载的进度报告。
+"""
+
+import abc
+import json
+import sys
+import threading
+import time
+from typing import Optional, TextIO
+
+
+PROGRESS_MODES = ("auto", "tty", "json", "none")
+
+
+class ProgressReporter:
+    """
+    进度报告器的基类，所有方法都不做任何事情。
+
+    客户端在 download_file 的数据块循环中调用 file_*，BulkDownloader 在记录提交和完成时
+    调用 record_*。这些方法可能在多个线程中被调用。
+    """
+
+    def add_total(self, records: int) -> None:
+        """
+        增加预计处理的记录数，用于计算 ETA。
+
+        Args:
+            records: 新增的记录数
+        """
+
+    def record_started(self, record_id: str) -> None:
+        """
+        一条记录开始处理。
+
+        Args:
+            record_id: INSPIRE-HEP 记录 ID
+        """
+
+    def record_finished(self, record_id: str, ok: bool) -> None:
+        """
+        一条记录处理完成。
+
+        Args:
+            record_id: INSPIRE-HEP 记录 ID
+            ok: 是否成功
+        """
+
+    def file_started(self, path: str, total: Optional[int]) -> None:
+        """
+        开始下载一个文件。
+
+        Args:
+            path: 输出路径
+            total: 本次要传输的字节数，未知时为 None
+        """
+
+    def file_progress(self, path: str, nbytes: int) -> None:
+        """
+        文件又收到了一些字节。
+
+        Args:
+            path: 输出路径
+            nbytes: 新收到的字节数
+        """
+
+    def file_finished(self, path: str, ok: bool) -> None:
+        """
+        文件下载结束。
+
+        Args:
+            path: 输出路径
+            ok: 是否成功
+        """
+
+    def message(self, text: str) -> None:
+        """
+        输出一条面向用户的状态消息 (默认打印到标准输出)。
+
+        下载函数在报告器存在时通过此方法输出消息，在终端上显示进度行的报告器可以先清除进度行，
+        避免消息和进度行交错。
+
+        Args:
+            text: 消息文本
+        """
+        print(text)
+
+    def close(self) -> None:
+        """输出最终状态。"""
+
+
+class NullProgress(ProgressReporter):
+    """不输出任何内容的报告器，用于非 TTY 环境。"""
+
+
+class _AggregateProgress(ProgressReporter, abc.ABC):
+    """汇总计数和吞吐量，并按固定间隔输出。子类实现 _emit。"""
+
+    def __init__(self, stream: Optional[TextIO] = None, interval: float = 0.5):
+        self.stream = stream if stream is not None else sys.stderr
+        self.interval = interval
+        self.total = 0
+        self.started = 0
+        self.completed = 0
+        self.failed = 0
+        self.bytes_done = 0
+        self.bytes_total = 0
+        self.rate = 0.0
+        self._start = time.monotonic()
+        self._last_emit = self._start
+        self._last_bytes = 0
+        self._lock = threading.Lock()
+
+    def add_total(self, records):
+        with self._lock:
+            self.total += records
+
+    def record_started(self, record_id):
+        with self._lock:
+            self.started += 1
+        self._maybe_emit()
+
+    def record_finished(self, record_id, ok):
+        with self._lock:
+            if ok:
+                self.completed += 1
+            else:
+                self.failed += 1
+        self._maybe_emit()
+
+    def file_started(self, path, total):
+        if total:
+            with self._lock:
+                self.bytes_total += total
+
+    def file_progress(self, path, nbytes):
+        with self._lock:
+            self.bytes_done += nbytes
+        self._maybe_emit()
+
+    def close(self):
+        with self._lock:
+            self._update_rate(time.monotonic())
+            state = self._state()
+        self._emit(state, final=True)
+
+    def _maybe_emit(self):
+        # 每个数据块都会调用，因此不到间隔时只做一次时间比较
+        now = time.monotonic()
+        if now - self._last_emit < self.interval:
+            return
+        with self._lock:
+            if now - self._last_emit < self.interval:
+                return
+            self._update_rate(now)
+            state = self._state()
+        self._emit(state, final=False)
+
+    def _update_rate(self, now):
+        # 调用方必须持有锁；吞吐量取指数移动平均，避免读数跳动
+        elapsed = now - self._last_emit
+        if elapsed > 0:
+            current = (self.bytes_done - self._last_bytes) / elapsed
+            self.rate = current if self._last_bytes == 0 else 0.3 * current + 0.7 * self.rate
+        self._last_emit = now
+        self._last_bytes = self.bytes_done
+
+    def _state(self):
+        elapsed = time.monotonic() - self._start
+        done = self.completed + self.failed
+        eta = None
+        if self.total and done:
+            eta = (self.total - done) * elapsed / done
+        elif self.bytes_total and self.rate > 0:
+            eta = max(0, self.bytes_total - self.bytes_done) / self.rate
+        return {
+            "completed": self.completed,
+            "failed": self.failed,
+            "in_flight": self.started - done,
+            "total": self.total or None,
+            "bytes": self.bytes_done,
+            "bytes_total": self.bytes_total or None,
+            "bytes_per_sec": round(self.rate, 1),
+            "elapsed": round(elapsed, 3),
+            "eta": None if eta is None else round(eta, 1),
+        }
+
+    @abc.abstractmethod
+    def _emit(self, state, final):
+        """输出汇总状态；final 为 True 时是 close 输出的最终状态。"""
+
+
+class TTYProgress(_AggregateProgress):
+    """
+    在终端上用一行 (以 \\r 刷新) 显示计数、吞吐量和 ETA。
+
+    状态消息打印前先清除进度行，打印后再重绘，因此工作线程的输出不会和进度行混在一起。
+    """
+
+    def __init__(self, stream: Optional[TextIO] = None, interval: float = 0.5):
+        super().__init__(stream, interval)
+        self._line = None
+        self._output_lock = threading.Lock()
+
+    def message(self, text):
+        with self._output_lock:
+            if self._line is not None:
+                self.stream.write("\r\x1b[K")
+                self.stream.flush()
+            print(text, flush=True)
+            if self._line is not None:
+                self.stream.write(self._line)
+                self.stream.flush()
+
+    def _emit(self, state, final):
+        if final and not (state["completed"] or state["failed"] or state["in_flight"] or state["bytes"]):
+            # 什么都没有下载时不留下空的进度行
+            return
+        parts = []
+        if state["total"] or state["completed"] or state["failed"] or state["in_flight"]:
+            counts = f"完成 {state['completed']}"
+            if state["total"]:
+                counts += f"/{state['total']}"
+            parts.append(f"{counts}  失败 {state['failed']}  进行中 {state['in_flight']}")
+        size = _format_bytes(state["bytes"])
+        if state["bytes_total"]:
+            size += f"/{_format_bytes(state['bytes_total'])}"
+        parts.append(f"{size}  {_format_bytes(state['bytes_per_sec'])}/s")
+        if state["eta"] is not None and not final:
+            parts.append(f"剩余 {_format_duration(state['eta'])}")
+        else:
+            parts.append(f"用时 {_format_duration(state['elapsed'])}")
+        line = "\r\x1b[K" + " | ".join(parts)
+        with self._output_lock:
+            self.stream.write(line + ("\n" if final else ""))
+            self.stream.flush()
+            self._line = None if final else line
+
+
+class JSONProgress(_AggregateProgress):
+    """
+    每行输出一个 JSON 事件，供编排程序解析。
+
+    "progress" 事件按间隔输出汇总状态；每条记录完成时输出 "record" 事件；结束时输出 "done" 事件。
+    """
+
+    def record_finished(self, record_id, ok):
+        super().record_finished(record_id, ok)
+        self._write({"event": "record", "record_id": record_id, "ok": ok})
+
+    def file_finished(self, path, ok):
+        self._write({"event": "file", "path": path, "ok": ok})
+
+    def _emit(self, state, final):
+        self._write(dict({"event": "done" if final else "progress"}, **state))
+
+    def _write(self, event):
+        event["time"] = round(time.time(), 3)
+        line = json.dumps(event, ensure_ascii=False) + "\n"
+        with self._lock:
+            self.stream.write(line)
+            self.stream.flush()
+
+
+def make_progress(mode: str = "auto", stream: Optional[TextIO] = None, interval: float = 0.5) -> ProgressReporter:
+    """
+    根据模式创建进度报告器。
+
+    Args:
+        mode: "auto" (终端上为 tty，否则不输出)、"tty"、"json" 或 "none" (默认值: "auto")
+        stream: 输出流 (默认值: sys.stderr)
+        interval: 汇总状态的最小输出间隔秒数 (默认值: 0.5)
+
+    Returns:
+        ProgressReporter 实例
+
+    Raises:
+        ValueError: 如果模式不受支持
+    """
+    if mode not in PROGRESS_MODES:
+        raise ValueError(f"不支持的进度模式: {mode}。请使用 {', '.join(PROGRESS_MODES)}")
+    stream = stream if stream is not None else sys.stderr
+    if mode == "auto":
+        mode = "tty" if stream.isatty() else "none"
+    if mode == "tty":
+        return TTYProgress(stream, interval)
+    if mode == "json":
+        return JSONProgress(stream, interval)
+    return NullProgress()
+
+
+def echo(progress: Optional[ProgressReporter], text: str) -> None:
+    """
+    输出一条状态消息：有进度报告器时交给它输出，否则直接打印。
+
+    Args:
+        progress: 客户端的进度报告器，可以为 None
+        text: 消息文本
+    """
+    if progress is None:
+        print(text)
+    else:
+        progress.message(text)
+
+
+def _format_bytes(n: float) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if n < 1024 or unit == "GB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+
+
+def _format_duration(seconds: float) -> str:
+    seconds = int(seconds)
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
@@ -0,0 +1,233 @@
+"""
+紧凑的元数据记录类型，以及从原始记录批量提取元数据的快速路径。
+
+这里是从原始记录中提取元数据和 PDF 链接的唯一实现；InspireHEPClient.extract_metadata、
+InspireHEPClient.extract_pdf_url、sources.record_sources 和 AsyncInspireHEPClient 都调用这里的函数。
+"""
+
+import sys
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+# pdf_url 未提取时的占位值，与 "已提取但没有 PDF" (None) 区分
+_NOT_EXTRACTED = object()
+
+ARXIV_PDF_URL = "https://arxiv.org/pdf"
+
+API_URL = "https://inspirehep.net/api"
+
+# 提取元数据和 PDF 链接所读取的字段；同步和异步客户端都通过 fields 参数只请求这些字段，
+# 避免下载庞大的参考文献列表等内容
+METADATA_FIELDS = [
+    "control_number",
+    "titles.title",
+    "authors.full_name",
+    "abstracts.value",
+    "preprint_date",
+    "publication_info.year",
+    "arxiv_eprints.value",
+    "dois.value",
+    "citation_count",
+    "keywords.value",
+]
+PDF_FIELDS = ["documents.key", "documents.url", "arxiv_eprints.value"]
+
+
+class MetadataRecord(Mapping):
+    """
+    一条记录的格式化元数据，字段与 InspireHEPClient.extract_metadata 返回的字典相同。
+
+    使用 __slots__ 而不是实例字典，作者和关键字字符串被驻留 (同一作者在大量记录中重复出现)，
+    inspire_url 按需计算。实现了只读的 Mapping 接口，与相同内容的元数据字典比较相等，因此可以
+    像元数据字典一样传给 download_metadata、导出写入器和 MetadataIndex。
+    """
+
+    __slots__ = ("record_id", "title", "authors", "abstract", "publication_date", "arxiv_id", "doi",
+                 "citations", "keywords", "_pdf_url")
+
+    # Mapping 接口的键，顺序与 extract_metadata 相同；pdf_url 仅在提取过时出现
+    FIELDS = ("record_id", "title", "authors", "abstract", "publication_date", "arxiv_id", "doi",
+              "citations", "keywords", "inspire_url")
+
+    def __init__(self, record_id: str, title: str = "N/A", authors: Optional[List[str]] = None, abstract: str = "N/A",
+                 publication_date=None, arxiv_id: str = "N/A", doi: str = "N/A", citations: int = 0,
+                 keywords: Optional[List[str]] = None, pdf_url=_NOT_EXTRACTED):
+        self.record_id = record_id
+        self.title = title
+        self.authors = authors if authors is not None else []
+        self.abstract = abstract
+        self.publication_date = publication_date
+        self.arxiv_id = arxiv_id
+        self.doi = doi
+        self.citations = citations
+        self.keywords = keywords if keywords is not None else []
+        self._pdf_url = pdf_url
+
+    @property
+    def inspire_url(self) -> str:
+        """记录在 inspirehep.net 上的页面。"""
+        return f"https://inspirehep.net/literature/{self.record_id}"
+
+    @property
+    def pdf_url(self) -> Optional[str]:
+        """PDF 的 URL；没有 PDF 或未提取时为 None。"""
+        return None if self._pdf_url is _NOT_EXTRACTED else self._pdf_url
+
+    @classmethod
+    def from_hit(cls, hit: Dict, record_id: Optional[str] = None, pdf_url: bool = False) -> "MetadataRecord":
+        """
+        从一条原始记录中提取元数据，不发起任何请求。
+
+        Args:
+            hit: get_record 或搜索结果中的单条原始记录
+            record_id: 可选的记录 ID (默认值: 记录中的 id 或 control_number)
+            pdf_url: 是否同时提取 PDF URL (需要 documents 和 arxiv_eprints 字段) (默认值: False)
+
+        Returns:
+            MetadataRecord 实例
+        """
+        metadata = hit.get("metadata", {})
+        if record_id is None:
+            record_id = str(hit.get("id") or metadata.get("control_number", ""))
+        intern = sys.intern
+        return cls(
+            record_id,
+            _first(metadata.get("titles"), "title"),
+            [intern(a.get("full_name", "N/A")) for a in metadata.get("authors", ())],
+            _first(metadata.get("abstracts"), "value"),
+            metadata.get("preprint_date") or _first(metadata.get("publication_info"), "year"),
+            _first(metadata.get("arxiv_eprints"), "value"),
+            _first(metadata.get("dois"), "value"),
+            metadata.get("citation_count", 0),
+            [intern(k.get("value", "")) for k in metadata.get("keywords", ())],
+            _first_pdf_url(metadata) if pdf_url else _NOT_EXTRACTED,
+        )
+
+    def to_dict(self) -> Dict:
+        """
+        转换为与 extract_metadata 相同结构的字典，用于 JSON 序列化。
+
+        Returns:
+            元数据字典
+        """
+        result = {
+            "record_id": self.record_id,
+            "title": self.title,
+            "authors": list(self.authors),
+            "abstract": self.abstract,
+            "publication_date": self.publication_date,
+            "arxiv_id": self.arxiv_id,
+            "doi": self.doi,
+            "citations": self.citations,
+            "keywords": list(self.keywords),
+            "inspire_url": self.inspire_url,
+        }
+        if self._pdf_url is not _NOT_EXTRACTED:
+            result["pdf_url"] = self._pdf_url
+        return result
+
+    def __getitem__(self, key):
+        if key in self.FIELDS or (key == "pdf_url" and self._pdf_url is not _NOT_EXTRACTED):
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __iter__(self):
+        yield from self.FIELDS
+        if self._pdf_url is not _NOT_EXTRACTED:
+            yield "pdf_url"
+
+    def __len__(self):
+        return len(self.FIELDS) + (self._pdf_url is not _NOT_EXTRACTED)
+
+    def __repr__(self):
+        return f"MetadataRecord(record_id={self.record_id!r}, title={self.title!r})"
+
+    def __getstate__(self):
+        # 占位值不能被 pickle 还原为同一个对象，因此单独记录 pdf_url 是否提取过
+        values = tuple(getattr(self, name) for name in self.__slots__[:-1])
+        return values, self._pdf_url is not _NOT_EXTRACTED, self.pdf_url
+
+    def __setstate__(self, state):
+        values, extracted, pdf_url = state
+        for name, value in zip(self.__slots__, values):
+            setattr(self, name, value)
+        self._pdf_url = pdf_url if extracted else _NOT_EXTRACTED
+
+
+def extract_records(hits: Iterable[Dict], pdf_url: bool = False) -> List[MetadataRecord]:
+    """
+    一次遍历把一页原始记录转换为 MetadataRecord 列表。
+
+    返回的记录不引用原始 JSON，调用方丢弃这一页后原始数据即可被回收。
+
+    Args:
+        hits: 原始记录的可迭代对象 (例如搜索结果的 hits.hits)
+        pdf_url: 是否同时提取 PDF URL (默认值: False)
+
+    Returns:
+        MetadataRecord 列表，顺序与输入相同
+    """
+    from_hit = MetadataRecord.from_hit
+    return [from_hit(hit, pdf_url=pdf_url) for hit in hits]
+
+
+def as_dict(metadata) -> Dict:
+    """
+    返回可直接 JSON 序列化的元数据字典。
+
+    Args:
+        metadata: 元数据字典或 MetadataRecord
+
+    Returns:
+        元数据字典
+    """
+    if isinstance(metadata, MetadataRecord):
+        return metadata.to_dict()
+    return metadata
+
+
+def iter_pdf_links(record: Dict) -> Iterator[Tuple[str, str]]:
+    """
+    按优先级产出原始记录中的 PDF 链接，不发起任何请求。
+
+    Args:
+        record: get_record 或搜索结果中的单条原始记录
+
+    Returns:
+        (kind, url) 的迭代器：先是 INSPIRE 上的 PDF 文档 ("document")，然后是 arXiv PDF ("arxiv")
+    """
+    return _pdf_links(record.get("metadata", {}))
+
+
+def extract_pdf_url(record: Dict) -> Optional[str]:
+    """
+    返回原始记录中优先级最高的 PDF URL。
+
+    Args:
+        record: get_record 或搜索结果中的单条原始记录
+
+    Returns:
+        PDF 的 URL (如果可用)，否则为 None
+    """
+    return _first_pdf_url(record.get("metadata", {}))
+
+
+def _first(values, key, default="N/A"):
+    # 取列表第一项的某个键；列表缺失或为空时返回默认值
+    if values:
+        return values[0].get(key, default)
+    return default
+
+
+def _pdf_links(metadata):
+    for doc in metadata.get("documents", ()):
+        if doc.get("key", "").endswith(".pdf") and doc.get("url"):
+            yield "document", doc["url"]
+    arxiv_id = _first(metadata.get("arxiv_eprints"), "value", None)
+    if arxiv_id:
+        yield "arxiv", f"{ARXIV_PDF_URL}/{arxiv_id}.pdf"
+
+
+def _first_pdf_url(metadata):
+    return next((url for _, url in _pdf_links(metadata)), None)
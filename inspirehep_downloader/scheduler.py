@@ -0,0 +1,183 @@
+"""
+带有按主机限速、重试和退避的请求调度器。
+"""
+
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+from .metrics import MetricsCollector, inc
+
+
+# 这些状态码表示暂时性错误，值得重试
+RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
+
+# 连接被重置、超时等网络错误同样值得重试
+RETRY_EXCEPTIONS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+
+
+class TokenBucket:
+    """线程安全的令牌桶限速器。"""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        """
+        初始化令牌桶。
+
+        Args:
+            rate: 每秒补充的令牌数，即持续请求速率
+            burst: 桶的容量，即允许的突发请求数 (默认值: max(1, rate))
+        """
+        self.rate = rate
+        self.capacity = burst if burst is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """阻塞直到获得一个令牌。"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                elif self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                else:
+                    wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """
+        在给定的秒数内暂停发放令牌，例如服务器返回 Retry-After 时。
+
+        Args:
+            seconds: 暂停的秒数
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0
+
+
+class RequestScheduler:
+    """
+    为 HTTP GET 请求提供按主机限速、指数退避重试和 Retry-After 支持。
+
+    同一个调度器可以在多个线程之间共享；同一主机的所有请求共用一个令牌桶。
+    """
+
+    # INSPIRE 的速率限制为每 5 秒 15 个请求
+    DEFAULT_RATES = {"inspirehep.net": 3.0}
+
+    def __init__(self, rates: Optional[Dict[str, float]] = None, default_rate: Optional[float] = None,
+                 max_retries: int = 3, backoff_base: float = 0.5, backoff_max: float = 60.0):
+        """
+        初始化调度器。
+
+        Args:
+            rates: 主机名到每秒请求数的映射 (默认值: DEFAULT_RATES)
+            default_rate: 未在 rates 中列出的主机的每秒请求数，None 表示不限速 (默认值: None)
+            max_retries: 每次调用的默认重试次数 (默认值: 3)
+            backoff_base: 第一次重试的最大退避秒数，之后每次翻倍 (默认值: 0.5)
+            backoff_max: 单次等待的最大秒数；服务器的 Retry-After 超过它时不再重试，直接返回该响应 (默认值: 60)
+        """
+        self.rates = dict(self.DEFAULT_RATES if rates is None else rates)
+        self.default_rate = default_rate
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def get(self, session: requests.Session, url: str, retries: Optional[int] = None,
+            metrics: Optional[MetricsCollector] = None, **kwargs) -> requests.Response:
+        """
+        通过限速器发送 GET 请求，并在暂时性错误时重试。
+
+        Args:
+            session: 用于发送请求的会话
+            url: 请求 URL
+            retries: 本次调用的重试预算 (默认值: max_retries)
+            metrics: 可选的指标收集器，记录限速等待、请求数和重试次数
+            **kwargs: 传递给 session.get 的其他参数
+
+        Returns:
+            最后一次尝试的响应；重试用尽时可能仍是错误响应，由调用方决定如何处理
+
+        Raises:
+            requests.exceptions.RequestException: 如果重试用尽后仍然出现网络错误
+        """
+        if retries is None:
+            retries = self.max_retries
+        bucket = self._bucket(urlparse(url).hostname or "")
+
+        attempt = 0
+        while True:
+            if bucket is not None and metrics is not None:
+                with metrics.time("rate_limit_wait"):
+                    bucket.acquire()
+            elif bucket is not None:
+                bucket.acquire()
+
+            inc(metrics, "requests_total")
+            try:
+                response = session.get(url, **kwargs)
+            except RETRY_EXCEPTIONS:
+                if attempt >= retries:
+                    raise
+                inc(metrics, "retries_total")
+                time.sleep(self._backoff(attempt))
+                attempt += 1
+                continue
+
+            if response.status_code not in RETRY_STATUSES or attempt >= retries:
+                return response
+
+            delay = self._retry_after(response)
+            if delay is not None and delay > self.backoff_max:
+                # 服务器要求的等待过长 (例如一天)：不让工作线程和整个主机的令牌桶停顿那么久
+                return response
+
+            inc(metrics, "retries_total")
+            if delay is not None and bucket is not None:
+                # 服务器要求等待时，让同一主机的所有请求一起等待
+                bucket.pause(delay)
+            response.close()
+            time.sleep(delay if delay is not None else self._backoff(attempt))
+            attempt += 1
+
+    def _bucket(self, host: str) -> Optional[TokenBucket]:
+        with self._lock:
+            if host not in self._buckets:
+                rate = self.rates.get(host, self.default_rate)
+                self._buckets[host] = TokenBucket(rate) if rate else None
+            return self._buckets[host]
+
+    def _backoff(self, attempt: int) -> float:
+        # 带完全抖动的指数退避
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    @staticmethod
+    def _retry_after(response: requests.Response) -> Optional[float]:
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            when = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
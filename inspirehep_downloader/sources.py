@@ -0,0 +1,355 @@
+"""
+从多个来源获取 PDF：按主机的历史延迟和成功率排序，并在首选来源迟迟没有响应时对冲请求。
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import namedtuple
+from typing import Dict, List, Optional
+from urllib.parse import quote, urlsplit
+
+import requests
+
+from .metrics import inc
+from .progress import echo
+from .records import ARXIV_PDF_URL, iter_pdf_links
+
+
+PdfSource = namedtuple("PdfSource", ["url", "kind"])
+PdfSource.__doc__ = """一个 PDF 来源；kind 为 "document"、"arxiv"、"arxiv_mirror"、"url" 或 "open_access"。"""
+
+UNPAYWALL_URL = "https://api.unpaywall.org/v2"
+ARXIV_MIRROR = "https://export.arxiv.org/pdf"
+
+
+def host_of(url: str) -> str:
+    """返回 URL 的主机部分 (小写，包括非默认端口)，作为统计的键。"""
+    return urlsplit(url).netloc.lower()
+
+
+def record_sources(record: Dict, arxiv_mirror: bool = True) -> List[PdfSource]:
+    """
+    从已获取的原始记录中收集所有 PDF 来源，不发起任何请求。
+
+    顺序与 extract_pdf_url 的优先级一致：INSPIRE 上的文档、arXiv (及其镜像)、记录的 urls 中的 PDF 链接。
+
+    Args:
+        record: get_record 或搜索结果中的单条原始记录 (需要 InspireHEPClient.SOURCE_FIELDS 中的字段)
+        arxiv_mirror: 是否把 export.arxiv.org 作为 arXiv 的备用来源 (默认值: True)
+
+    Returns:
+        去重后的来源列表
+    """
+    sources = []
+    for kind, url in iter_pdf_links(record):
+        sources.append(PdfSource(url, kind))
+        if kind == "arxiv" and arxiv_mirror:
+            sources.append(PdfSource(ARXIV_MIRROR + url[len(ARXIV_PDF_URL):], "arxiv_mirror"))
+    for link in record.get("metadata", {}).get("urls", []):
+        url = link.get("value", "")
+        if urlsplit(url).path.lower().endswith(".pdf"):
+            sources.append(PdfSource(url, "url"))
+    return _unique(sources)
+
+
+def open_access_sources(client, doi: str, email: str) -> List[PdfSource]:
+    """
+    通过 Unpaywall 查找 DOI 的开放获取 PDF 副本。
+
+    Args:
+        client: 用于发送请求的 InspireHEPClient (共享连接池和限速，不使用记录缓存)
+        doi: 文章的 DOI
+        email: Unpaywall 要求的联系邮箱
+
+    Returns:
+        来源列表，最佳位置在前；没有开放获取副本时为空
+
+    Raises:
+        requests.exceptions.RequestException: 如果请求失败
+    """
+    data = client.get_external_json(f"{UNPAYWALL_URL}/{quote(doi, safe='/')}", {"email": email})
+    locations = [data.get("best_oa_location")] + list(data.get("oa_locations") or [])
+    return _unique([PdfSource(location["url_for_pdf"], "open_access")
+                    for location in locations if location and location.get("url_for_pdf")])
+
+
+def _unique(sources):
+    seen = set()
+    result = []
+    for source in sources:
+        if source.url not in seen:
+            seen.add(source.url)
+            result.append(source)
+    return result
+
+
+class HostStats:
+    """
+    每个主机的首字节延迟 (指数加权平均) 和成功率。同一个对象可以在多个线程之间共享。
+
+    主机的得分近似于从这个主机拿到 PDF 的预期等待时间：延迟 / 成功率，再加上每次预期的失败按先验延迟计的代价，
+    越低越好。成功率使用拉普拉斯平滑，没有记录的主机取先验延迟和 50% 成功率，因此表现良好的主机排在未知主机之前，
+    屡次失败或很慢的主机排在之后。
+    """
+
+    def __init__(self, alpha: float = 0.3, prior_latency: float = 1.0):
+        """
+        Args:
+            alpha: 延迟平均值中新观测值的权重 (默认值: 0.3)
+            prior_latency: 没有观测值的主机的假定延迟秒数 (默认值: 1.0)
+        """
+        self.alpha = alpha
+        self.prior_latency = prior_latency
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _entry(self, host):
+        entry = self._hosts.get(host)
+        if entry is None:
+            entry = self._hosts[host] = {"latency": None, "successes": 0, "failures": 0}
+        return entry
+
+    def record_latency(self, host: str, seconds: float) -> None:
+        """
+        记录一次从发出请求到收到响应头的时间。
+
+        Args:
+            host: 主机名
+            seconds: 延迟秒数
+        """
+        with self._lock:
+            entry = self._entry(host)
+            previous = entry["latency"]
+            entry["latency"] = seconds if previous is None else previous + self.alpha * (seconds - previous)
+
+    def record_result(self, host: str, ok: bool) -> None:
+        """
+        记录一次下载的结果。
+
+        Args:
+            host: 主机名
+            ok: 是否成功
+        """
+        with self._lock:
+            self._entry(host)["successes" if ok else "failures"] += 1
+
+    def score(self, host: str) -> float:
+        """
+        返回主机的得分，越低越好。
+
+        Args:
+            host: 主机名
+
+        Returns:
+            得分
+        """
+        with self._lock:
+            entry = self._hosts.get(host) or {"latency": None, "successes": 0, "failures": 0}
+            latency = self.prior_latency if entry["latency"] is None else entry["latency"]
+            success_rate = (entry["successes"] + 1) / (entry["successes"] + entry["failures"] + 2)
+        return (latency + (1 - success_rate) * self.prior_latency) / success_rate
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """
+        返回所有主机统计的副本。
+
+        Returns:
+            主机名到 {"latency", "successes", "failures", "score"} 的字典
+        """
+        with self._lock:
+            hosts = {host: dict(entry) for host, entry in self._hosts.items()}
+        for host, entry in hosts.items():
+            entry["score"] = self.score(host)
+        return hosts
+
+
+class _Cancelled(Exception):
+    # 另一个来源已经先开始传输
+    pass
+
+
+class _Attempt:
+    def __init__(self, source):
+        self.source = source
+        self.host = host_of(source.url)
+        self.started = time.perf_counter()
+        self.finished = False
+        self.cancelled = False
+        self.error = None
+
+
+class _Race:
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.winner = None
+
+
+class PdfResolver:
+    """
+    在一条记录的所有 PDF 来源之间选择并对冲下载。
+
+    来源按 HostStats 的得分排序后依次尝试；如果当前来源在 hedge_after 秒内没有返回响应头，
+    就同时向下一个来源发出请求 (最多 max_parallel 个并行)。最先返回成功响应头的来源胜出并写入文件，
+    其他请求在收到响应头时立即关闭，不下载响应体。胜出的来源中途失败时，换用剩余的来源。
+
+    通过 InspireHEPClient(pdf_resolver=...) 接入后，download_pdf、download_record 和批量下载都会使用它；
+    同一个对象可以在多个线程之间共享，主机统计在整个运行期间累积。
+    """
+
+    def __init__(self, hedge_after: float = 2.0, max_parallel: int = 2, stats: Optional[HostStats] = None,
+                 unpaywall_email: Optional[str] = None, arxiv_mirror: bool = True):
+        """
+        Args:
+            hedge_after: 等待响应头多少秒后向下一个来源发出对冲请求 (默认值: 2.0)
+            max_parallel: 同时进行的请求数上限，1 表示不对冲、只按顺序换用来源 (默认值: 2)
+            stats: 共享的主机统计 (默认值: 新建一个 HostStats)
+            unpaywall_email: 提供时，记录自身的来源全部失败或不存在后通过 Unpaywall 查找 DOI 的开放获取副本
+            arxiv_mirror: 是否把 export.arxiv.org 作为 arXiv 的备用来源 (默认值: True)
+
+        Raises:
+            ValueError: 如果 max_parallel 小于 1
+        """
+        if max_parallel < 1:
+            raise ValueError("max_parallel 必须至少为 1")
+        self.hedge_after = hedge_after
+        self.max_parallel = max_parallel
+        self.stats = stats or HostStats(prior_latency=hedge_after / 2)
+        self.unpaywall_email = unpaywall_email
+        self.arxiv_mirror = arxiv_mirror
+
+    def rank(self, sources: List[PdfSource]) -> List[PdfSource]:
+        """
+        按主机得分排序来源；得分相同时保持原来的顺序。
+
+        Args:
+            sources: 来源列表
+
+        Returns:
+            排序后的新列表
+        """
+        return sorted(sources, key=lambda source: self.stats.score(host_of(source.url)))
+
+    def download(self, client, record: Dict, output_path: str) -> PdfSource:
+        """
+        下载记录的 PDF 到 output_path。
+
+        每个来源先写入各自的 "{output_path}.{URL 哈希}.part"，中断后再次调用时可以从同一来源续传；
+        成功后原子地重命名为 output_path。
+
+        Args:
+            client: 用于下载的 InspireHEPClient
+            record: 原始记录 (需要 InspireHEPClient.SOURCE_FIELDS 中的字段)
+            output_path: PDF 应保存的路径
+
+        Returns:
+            实际使用的来源
+
+        Raises:
+            ValueError: 如果记录没有任何 PDF 来源
+            requests.exceptions.RequestException: 如果所有来源都失败 (最后一个错误)
+        """
+        sources = record_sources(record, arxiv_mirror=self.arxiv_mirror)
+        failed = set()
+        last_error = None
+        lookup_done = self.unpaywall_email is None
+        while True:
+            remaining = [source for source in sources if source.url not in failed]
+            if not remaining and not lookup_done:
+                lookup_done = True
+                sources = _unique(sources + self._open_access(client, record))
+                remaining = [source for source in sources if source.url not in failed]
+            if not remaining:
+                if last_error is not None:
+                    raise last_error
+                raise ValueError("没有可用的 PDF 来源")
+
+            winner, attempts = self._race(client, self.rank(remaining), output_path)
+            for attempt in attempts:
+                if attempt.finished and attempt.error is not None and not attempt.cancelled:
+                    failed.add(attempt.source.url)
+                    last_error = attempt.error
+                    inc(client.metrics, "pdf_source_failures_total")
+            if winner is not None and winner.error is None:
+                os.replace(self._temp_path(output_path, winner.source), output_path)
+                # 其他来源中断时留下的部分文件已经没有用处
+                for source in sources:
+                    part_path = self._temp_path(output_path, source) + ".part"
+                    if os.path.exists(part_path):
+                        os.remove(part_path)
+                return winner.source
+
+    def _open_access(self, client, record):
+        sources = []
+        for doi in record.get("metadata", {}).get("dois", []):
+            if doi.get("value"):
+                try:
+                    sources.extend(open_access_sources(client, doi["value"], self.unpaywall_email))
+                except (requests.exceptions.RequestException, ValueError) as e:
+                    echo(client.progress, f"警告: 无法查找 {doi['value']} 的开放获取副本: {e}")
+        return sources
+
+    @staticmethod
+    def _temp_path(output_path, source):
+        return f"{output_path}.{hashlib.sha256(source.url.encode('utf-8')).hexdigest()[:12]}"
+
+    def _race(self, client, sources, output_path):
+        # 返回 (胜出的尝试或 None, 所有已启动的尝试)；胜出的尝试结束 (成功或失败) 后才返回
+        race = _Race()
+        queue = list(sources)
+        attempts = []
+        next_hedge = 0.0
+        with race.cond:
+            while True:
+                if race.winner is not None:
+                    if race.winner.finished:
+                        return race.winner, attempts
+                    race.cond.wait()
+                    continue
+                active = [attempt for attempt in attempts if not attempt.finished]
+                now = time.monotonic()
+                can_start = queue and len(active) < self.max_parallel
+                if can_start and (not active or now >= next_hedge):
+                    if active:
+                        inc(client.metrics, "pdf_hedges_total")
+                    attempts.append(self._start(client, queue.pop(0), output_path, race))
+                    next_hedge = now + self.hedge_after
+                    continue
+                if not active:
+                    return None, attempts
+                race.cond.wait(next_hedge - now if can_start else None)
+
+    def _start(self, client, source, output_path, race):
+        attempt = _Attempt(source)
+
+        def on_response(response):
+            self.stats.record_latency(attempt.host, time.perf_counter() - attempt.started)
+            if "html" in response.headers.get("Content-Type", ""):
+                # 出版商的登录页或验证码页面，不是 PDF
+                raise requests.exceptions.RequestException(f"{source.url} 返回的不是 PDF")
+            with race.cond:
+                if race.winner is None:
+                    race.winner = attempt
+                    race.cond.notify_all()
+                elif race.winner is not attempt:
+                    raise _Cancelled()
+
+        def run():
+            try:
+                client.download_file(source.url, self._temp_path(output_path, source), on_response=on_response)
+            except _Cancelled as e:
+                attempt.cancelled = True
+                attempt.error = e
+            except Exception as e:
+                attempt.error = e
+                self.stats.record_result(attempt.host, False)
+            else:
+                self.stats.record_result(attempt.host, True)
+            with race.cond:
+                attempt.finished = True
+                race.cond.notify_all()
+
+        # 落后的请求在阻塞于连接或等待响应头时无法中断，因此使用守护线程，不等待它们结束
+        threading.Thread(target=run, name=f"pdf-source-{attempt.host}", daemon=True).start()
+        return attempt
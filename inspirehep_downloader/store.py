@@ -0,0 +1,170 @@
+"""
+按内容寻址的 PDF 存储，在不同记录和输出目录之间去重。
+"""
+
+import hashlib
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+
+class BlobStore:
+    """
+    按 SHA-256 寻址的文件存储。
+
+    每个文件在 blobs/ 下只保存一份，并记录来源 URL 到内容哈希的映射；
+    已存储过的 URL 不再访问网络。各记录的输出路径是指向存储的硬链接，
+    跨文件系统时退回到符号链接，再不行则复制。同一个存储对象可以在多个线程之间共享。
+    """
+
+    def __init__(self, root: str):
+        """
+        打开 (或创建) 存储。
+
+        Args:
+            root: 存储的根目录
+        """
+        root = os.path.expanduser(root)
+        self.root = root
+        self.blob_dir = os.path.join(root, "blobs")
+        self.incoming_dir = os.path.join(root, "incoming")
+        os.makedirs(self.blob_dir, exist_ok=True)
+        os.makedirs(self.incoming_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._url_locks = {}
+        self._conn = sqlite3.connect(os.path.join(root, "urls.sqlite"), check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS urls ("
+                " url TEXT PRIMARY KEY,"
+                " sha256 TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " stored_at REAL NOT NULL)"
+            )
+
+    def blob_path(self, digest: str) -> str:
+        """
+        返回内容哈希对应的文件路径。
+
+        Args:
+            digest: 十六进制 SHA-256
+
+        Returns:
+            存储中的文件路径 (不保证存在)
+        """
+        return os.path.join(self.blob_dir, digest[:2], digest)
+
+    def lookup(self, url: str) -> Optional[str]:
+        """
+        查找 URL 是否已存储。
+
+        Args:
+            url: 来源 URL
+
+        Returns:
+            已存储文件的路径，未命中时为 None
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT sha256 FROM urls WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            return None
+        path = self.blob_path(row[0])
+        return path if os.path.exists(path) else None
+
+    def add_file(self, path: str, url: Optional[str] = None) -> str:
+        """
+        把文件移入存储；内容已存在时丢弃这份副本。
+
+        Args:
+            path: 要移入的文件，调用后不再存在
+            url: 可选的来源 URL，记录后可直接命中
+
+        Returns:
+            存储中的文件路径
+        """
+        digest = hashlib.sha256()
+        size = 0
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+                size += len(chunk)
+        digest = digest.hexdigest()
+
+        blob = self.blob_path(digest)
+        os.makedirs(os.path.dirname(blob), exist_ok=True)
+        if os.path.exists(blob):
+            os.remove(path)
+        else:
+            os.replace(path, blob)
+
+        if url is not None:
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO urls (url, sha256, size, stored_at) VALUES (?, ?, ?, ?)",
+                    (url, digest, size, time.time()),
+                )
+        return blob
+
+    def fetch(self, client, url: str) -> str:
+        """
+        返回 URL 对应的存储文件，必要时先下载。
+
+        同一 URL 的并发请求只会下载一次；中断的下载在下次调用时续传。
+
+        Args:
+            client: 用于下载的 InspireHEPClient
+            url: 来源 URL
+
+        Returns:
+            存储中的文件路径
+
+        Raises:
+            requests.exceptions.RequestException: 如果下载失败
+        """
+        with self._lock:
+            url_lock = self._url_locks.setdefault(url, threading.Lock())
+        with url_lock:
+            blob = self.lookup(url)
+            if blob is not None:
+                return blob
+            # 以 URL 的哈希命名临时文件，中断后可以续传
+            incoming = os.path.join(self.incoming_dir, hashlib.sha256(url.encode("utf-8")).hexdigest())
+            client.download_file(url, incoming)
+            return self.add_file(incoming, url)
+
+    def link(self, blob: str, output_path: str) -> None:
+        """
+        在输出路径创建指向存储文件的链接，并原子替换已有文件。
+
+        依次尝试硬链接、符号链接和复制。
+
+        Args:
+            blob: 存储中的文件路径
+            output_path: 目标路径
+        """
+        part_path = output_path + ".part"
+        if os.path.lexists(part_path):
+            os.remove(part_path)
+        try:
+            os.link(blob, part_path)
+        except OSError:
+            try:
+                os.symlink(os.path.abspath(blob), part_path)
+            except OSError:
+                shutil.copyfile(blob, part_path)
+        os.replace(part_path, output_path)
+
+    def close(self) -> None:
+        """关闭数据库连接。"""
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
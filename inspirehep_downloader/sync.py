@@ -0,0 +1,154 @@
+"""
+增量同步：只下载自上次同步以来发生变化的 INSPIRE-HEP 记录。
+"""
+
+import json
+import os
+from datetime import datetime, timezone
+from typing import Dict, Optional
+from .client import InspireHEPClient
+from .bulk import BulkDownloader
+from .index import MetadataIndex
+from .store import BlobStore
+
+
+STATE_FILENAME = ".inspirehep_sync.json"
+
+
+class SyncState:
+    """
+    增量同步的本地状态文件。
+
+    记录查询字符串、上次成功同步的时间，以及每条记录的 updated 时间戳和
+    control_number；下载失败的记录 ID 保存在 pending 中，下次同步时重试。
+    """
+
+    def __init__(self, path: str):
+        """
+        加载状态文件；文件不存在时从空状态开始。
+
+        Args:
+            path: 状态文件路径
+        """
+        self.path = path
+        self.query = None
+        self.last_sync = None
+        self.records = {}
+        self.pending = []
+
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.query = data.get("query")
+            self.last_sync = data.get("last_sync")
+            self.records = data.get("records", {})
+            self.pending = data.get("pending", [])
+
+    def save(self) -> None:
+        """以原子方式写回状态文件。"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        part_path = self.path + ".part"
+        with open(part_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "query": self.query,
+                "last_sync": self.last_sync,
+                "records": self.records,
+                "pending": self.pending,
+            }, f, ensure_ascii=False)
+        os.replace(part_path, self.path)
+
+
+def sync_literature(query: str, output_dir: str = ".", state_path: Optional[str] = None,
+                    download_pdf_flag: bool = True, download_metadata_flag: bool = True,
+                    api_workers: int = 4, pdf_workers: int = 4, format: str = "json", page_size: int = 100,
+                    client: Optional[InspireHEPClient] = None, index: Optional[MetadataIndex] = None,
+                    store: Optional[BlobStore] = None) -> Dict:
+    """
+    同步搜索查询匹配的记录，只下载新增或更新过的记录。
+
+    第一次运行时下载所有匹配的记录；之后只查询自上次同步以来更新过的记录
+    (INSPIRE 的 "du" 条件)，并跳过 updated 时间戳未变的记录。
+
+    Args:
+        query: 搜索查询字符串 (例如, "author:witten")
+        output_dir: 文件应保存的目录 (默认值: 当前目录)
+        state_path: 状态文件路径 (默认值: {output_dir}/.inspirehep_sync.json)
+        download_pdf_flag: 是否下载 PDF (默认值: True)
+        download_metadata_flag: 是否下载元数据 (默认值: True)
+        api_workers: 同时进行的 INSPIRE API 请求数 (默认值: 4)
+        pdf_workers: 同时进行的 PDF 下载数 (默认值: 4)
+        format: 元数据格式，"json" 或 "txt" (默认值: "json")
+        page_size: 每页的搜索结果数 (默认值: 100)
+        client: 可选的共享客户端
+        index: 可选的本地元数据索引
+        store: 可选的内容寻址 PDF 存储
+
+    Returns:
+        包含 "since"、"matched"、"downloaded"、"unchanged" 和 "failed" 键的摘要字典
+
+    Raises:
+        ValueError: 如果状态文件属于另一个查询
+        requests.exceptions.RequestException: 如果搜索请求失败
+    """
+    if state_path is None:
+        state_path = os.path.join(output_dir, STATE_FILENAME)
+    state = SyncState(state_path)
+    if state.query is not None and state.query != query:
+        raise ValueError(f"状态文件 {state_path} 属于另一个查询: {state.query!r}")
+    state.query = query
+
+    # 在搜索之前记录开始时间，以免漏掉同步期间更新的记录
+    started = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    since = state.last_sync
+    search_query = query if since is None else f"({query}) and du >= {since[:10]}"
+
+    summary = {"since": since, "matched": 0, "downloaded": 0, "unchanged": 0, "failed": []}
+    submitted = []
+    completed = False
+
+    try:
+        with BulkDownloader(output_dir, download_pdf_flag, download_metadata_flag, api_workers=api_workers,
+                            pdf_workers=pdf_workers, format=format, client=client, index=index,
+                            store=store) as bulk:
+            seen = set()
+            retry_ids = set(state.pending)
+            for hit in bulk.client.iter_literature(search_query, size=page_size, fields=bulk.client.RECORD_FIELDS):
+                record_id = str(hit.get("id") or hit.get("metadata", {}).get("control_number"))
+                seen.add(record_id)
+                summary["matched"] += 1
+                updated = hit.get("updated")
+                if updated is not None and state.records.get(record_id, {}).get("updated") == updated \
+                        and record_id not in retry_ids:
+                    summary["unchanged"] += 1
+                    continue
+                info = {"updated": updated, "control_number": hit.get("metadata", {}).get("control_number")}
+                submitted.append((record_id, info, bulk.submit(record_id, hit)))
+
+            # 重试上次失败且本次未被查询到的记录
+            for record_id in state.pending:
+                if record_id not in seen:
+                    submitted.append((record_id, state.records.get(record_id, {}), bulk.submit(record_id)))
+        completed = True
+    finally:
+        # 即使搜索中途失败，也保存已完成的记录；只有完整同步后才推进 last_sync
+        pending = [] if completed else list(state.pending)
+        for record_id, info, future in submitted:
+            result = future.result()
+            if result["error"]:
+                if record_id not in pending:
+                    pending.append(record_id)
+                summary["failed"].append(record_id)
+            else:
+                summary["downloaded"] += 1
+                state.records[record_id] = info
+                if record_id in pending:
+                    pending.remove(record_id)
+
+        state.pending = pending
+        if completed:
+            state.last_sync = started
+        state.save()
+
+    return summary
@@ -17,10 +17,16 @@ setup(
         "License :: OSI Approved :: MIT License",
         "Operating System :: OS Independent",
     ],
-    python_requires=">=3.6",
+    python_requires=">=3.7",
     install_requires=[
         "requests>=2.25.0",
     ],
+    extras_require={
+        "async": ["aiohttp>=3.7"],
+        "zstd": ["zstandard>=0.15"],
+        "parquet": ["pyarrow>=1.0"],
+        "fast": ["orjson>=3.0"],
+    },
     entry_points={
         "console_scripts": [
             "inspirehep-download=inspirehep_downloader.cli:main",
@@ -0,0 +1,99 @@
+"""
+测试共用的装置：模拟客户端和本地桩 HTTP 服务器。
+"""
+
+import json
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from unittest.mock import Mock
+from urllib.parse import urlparse, parse_qs
+
+from inspirehep_downloader.client import InspireHEPClient
+from inspirehep_downloader.jsonlib import get_backend
+
+
+def make_mock_client(records):
+    """
+    创建一个从字典返回记录的模拟客户端。
+    
+    进度报告、指标和 PDF 来源解析默认关闭 (None)；需要它们的测试自行设置对应属性。
+    """
+    mock_client = Mock()
+    mock_client.progress = None
+    mock_client.metrics = None
+    mock_client.pdf_resolver = None
+    mock_client.json_backend = get_backend()
+    
+    def get_record(record_id, fields=None):
+        if record_id not in records:
+            raise ValueError(f"记录 {record_id} 不存在")
+        return records[record_id]
+    
+    def get_records(record_ids, chunk_size=50, fields=None):
+        found = {rid: records[rid] for rid in record_ids if rid in records}
+        return found, [rid for rid in record_ids if rid not in records]
+    
+    mock_client.get_record.side_effect = get_record
+    mock_client.get_records.side_effect = get_records
+    mock_client.extract_metadata.side_effect = InspireHEPClient.extract_metadata
+    mock_client.extract_pdf_url.side_effect = InspireHEPClient.extract_pdf_url
+    return mock_client
+
+
+PDF_BODY = b"%PDF-1.4\n" + b"x" * 200000
+
+RECORD = {
+    "id": "12345",
+    "metadata": {
+        "titles": [{"title": "Test Paper"}],
+        "authors": [{"full_name": "John Doe"}],
+        "arxiv_eprints": [{"value": "1234.5678"}],
+        "citation_count": 10
+    }
+}
+
+
+class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class StubInspireHandler(BaseHTTPRequestHandler):
+    """模拟 INSPIRE API 和 PDF 主机的请求处理程序。"""
+    
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        if parsed.path == "/api/literature":
+            query = parse_qs(parsed.query)
+            body = json.dumps({"hits": {"hits": [RECORD], "total": 1}, "query": query}).encode()
+            self._send(200, body, "application/json")
+        elif parsed.path == "/api/literature/12345":
+            self._send(200, json.dumps(RECORD).encode(), "application/json")
+        elif parsed.path == "/files/paper.pdf":
+            self._send(200, PDF_BODY, "application/pdf")
+        elif parsed.path == "/files/slow.pdf":
+            self._send_slowly(PDF_BODY, chunks=8, interval=0.25)
+        else:
+            self._send(404, b"{}", "application/json")
+    
+    def _send(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def _send_slowly(self, body, chunks, interval):
+        # 每个数据块之间暂停 interval 秒，整个响应体的传输时间为 chunks * interval 秒
+        self.send_response(200)
+        self.send_header("Content-Type", "application/pdf")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        size = -(-len(body) // chunks)
+        for start in range(0, len(body), size):
+            self.wfile.write(body[start:start + size])
+            self.wfile.flush()
+            time.sleep(interval)
+    
+    def log_message(self, format, *args):
+        pass
@@ -0,0 +1,127 @@
+"""
+异步客户端针对本地桩 HTTP 服务器的测试。
+"""
+
+import unittest
+import asyncio
+import os
+import tempfile
+import shutil
+import threading
+import time
+
+from inspirehep_downloader.async_client import AsyncInspireHEPClient, aiohttp
+from tests.helpers import ThreadingHTTPServer, StubInspireHandler, PDF_BODY
+
+
+@unittest.skipIf(aiohttp is None, "需要 aiohttp")
+class TestAsyncInspireHEPClient(unittest.TestCase):
+    """AsyncInspireHEPClient 类的测试。"""
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), StubInspireHandler)
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+    
+    def setUp(self):
+        """设置测试装置。"""
+        self.temp_dir = tempfile.mkdtemp()
+    
+    def tearDown(self):
+        """清理测试装置。"""
+        shutil.rmtree(self.temp_dir)
+    
+    def run_with_client(self, func, timeout=5):
+        async def runner():
+            async with AsyncInspireHEPClient(timeout=timeout) as client:
+                client.BASE_URL = f"{self.base_url}/api"
+                return await func(client)
+        return asyncio.run(runner())
+    
+    def test_search_literature(self):
+        """测试文献搜索。"""
+        results = self.run_with_client(lambda c: c.search_literature("author:test", size=1, page=2))
+        
+        self.assertEqual(results["hits"]["total"], 1)
+        self.assertEqual(results["query"]["q"], ["author:test"])
+        self.assertEqual(results["query"]["page"], ["2"])
+    
+    def test_get_metadata_and_pdf_url(self):
+        """测试获取元数据和 PDF URL。"""
+        async def func(client):
+            return await asyncio.gather(client.get_metadata("12345"), client.get_pdf_url("12345"))
+        
+        metadata, pdf_url = self.run_with_client(func)
+        
+        self.assertEqual(metadata["title"], "Test Paper")
+        self.assertEqual(metadata["citations"], 10)
+        self.assertEqual(pdf_url, "https://arxiv.org/pdf/1234.5678.pdf")
+    
+    def test_concurrent_requests_share_session(self):
+        """测试大量并发请求共享一个连接池。"""
+        async def func(client):
+            records = await asyncio.gather(*[client.get_record("12345") for _ in range(50)])
+            return records, client._get_session()
+        
+        records, session = self.run_with_client(func)
+        
+        self.assertEqual(len(records), 50)
+        self.assertTrue(session.closed)
+    
+    def test_get_record_not_found(self):
+        """测试请求不存在的记录时抛出异常。"""
+        with self.assertRaises(aiohttp.ClientResponseError):
+            self.run_with_client(lambda c: c.get_record("99999"))
+    
+    def test_download_file(self):
+        """测试流式下载文件。"""
+        output_path = os.path.join(self.temp_dir, "paper.pdf")
+        
+        self.run_with_client(lambda c: c.download_file(f"{self.base_url}/files/paper.pdf", output_path))
+        
+        with open(output_path, "rb") as f:
+            self.assertEqual(f.read(), PDF_BODY)
+    
+    def test_download_slower_than_timeout(self):
+        """测试超时只限制连接和每次读取，总传输时间超过 timeout 的下载仍然成功。"""
+        output_path = os.path.join(self.temp_dir, "slow.pdf")
+        
+        start = time.monotonic()
+        self.run_with_client(lambda c: c.download_file(f"{self.base_url}/files/slow.pdf", output_path), timeout=1)
+        
+        self.assertGreater(time.monotonic() - start, 1)
+        with open(output_path, "rb") as f:
+            self.assertEqual(f.read(), PDF_BODY)
+
+    
+    def test_failed_download_leaves_no_file(self):
+        """测试下载失败时既不留下最终文件，也不留下临时文件。"""
+        output_path = os.path.join(self.temp_dir, "missing.pdf")
+        
+        with self.assertRaises(aiohttp.ClientResponseError):
+            self.run_with_client(lambda c: c.download_file(f"{self.base_url}/files/missing.pdf", output_path))
+        
+        self.assertEqual(os.listdir(self.temp_dir), [])
+    
+    def test_cancelled_download_leaves_no_file(self):
+        """测试下载中途被取消时最终路径上没有不完整的文件。"""
+        output_path = os.path.join(self.temp_dir, "slow.pdf")
+        
+        async def func(client):
+            await asyncio.wait_for(client.download_file(f"{self.base_url}/files/slow.pdf", output_path), 0.5)
+        
+        with self.assertRaises(asyncio.TimeoutError):
+            self.run_with_client(func)
+        
+        self.assertEqual(os.listdir(self.temp_dir), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+"""
+按作者批量下载的单元测试。
+"""
+
+import unittest
+import json
+import os
+import tempfile
+import shutil
+import threading
+
+from inspirehep_downloader.author import search_and_download_author_papers, resolve_author, is_bai
+from tests.helpers import make_mock_client
+
+
+def make_hit(record_id):
+    """创建一条带有 arXiv 编号的模拟搜索结果。"""
+    return {"id": str(record_id), "metadata": {"titles": [{"title": f"Paper {record_id}"}],
+                                               "arxiv_eprints": [{"value": f"2301.{record_id:05d}"}]}}
+
+
+def make_author(name, bai, recid):
+    """创建一条模拟的作者档案。"""
+    return {"id": str(recid), "metadata": {"name": {"value": name}, "control_number": recid,
+                                           "ids": [{"schema": "INSPIRE BAI", "value": bai}]}}
+
+
+class TestAuthorHarvest(unittest.TestCase):
+    """search_and_download_author_papers 的测试。"""
+
+    def setUp(self):
+        """设置测试装置。"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.client = make_mock_client({})
+        self.hits = [make_hit(i) for i in range(12)]
+        self.client.iter_literature.side_effect = lambda query, **kwargs: iter(self.hits)
+
+    def tearDown(self):
+        """清理测试装置。"""
+        shutil.rmtree(self.temp_dir)
+
+    def test_bai_harvest_writes_author_dir_and_manifest(self):
+        """测试 BAI 无需解析，文件保存在作者子目录中并写入清单。"""
+        summary = search_and_download_author_papers("E.Witten.1", self.temp_dir, client=self.client)
+
+        author_dir = os.path.join(self.temp_dir, "E.Witten.1")
+        self.assertEqual(summary["output_dir"], author_dir)
+        self.assertEqual((summary["matched"], summary["downloaded"], summary["failed"]), (12, 12, []))
+        self.client.search_authors.assert_not_called()
+        self.client.get_record.assert_not_called()
+        self.assertEqual(self.client.iter_literature.call_args[0][0], "a E.Witten.1")
+        self.assertTrue(os.path.exists(os.path.join(author_dir, "3_metadata.json")))
+
+        with open(summary["manifest"], encoding="utf-8") as f:
+            manifest = json.load(f)
+        self.assertEqual(manifest["author"]["bai"], "E.Witten.1")
+        self.assertEqual(manifest["total"], 12)
+        self.assertEqual(manifest["records"][0]["title"], "Paper 0")
+
+    def test_name_resolved_through_author_search(self):
+        """测试姓名通过作者档案搜索解析为 BAI。"""
+        self.client.search_authors.return_value = {"hits": {"total": 2, "hits": [
+            make_author("Witten, Edward", "E.Witten.1", 983328),
+            make_author("Witten, Louis", "L.Witten.1", 1000000),
+        ]}}
+
+        info = resolve_author("Witten", self.client)
+
+        self.assertEqual(info, {"bai": "E.Witten.1", "name": "Witten, Edward", "recid": "983328",
+                                "query": "a E.Witten.1"})
+        self.assertTrue(is_bai("E.Witten.1"))
+        self.assertFalse(is_bai("Witten, Edward"))
+
+    def test_unknown_author(self):
+        """测试找不到作者时抛出 ValueError。"""
+        self.client.search_authors.return_value = {"hits": {"total": 0, "hits": []}}
+
+        with self.assertRaises(ValueError):
+            search_and_download_author_papers("nobody", self.temp_dir, client=self.client)
+
+    def test_skip_existing_and_flat_layout(self):
+        """测试 --flat 布局以及再次运行时跳过已存在的文件。"""
+        search_and_download_author_papers("E.Witten.1", self.temp_dir, per_author_dir=False,
+                                          download_pdf_flag=False, client=self.client)
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir, "0_metadata.json")))
+
+        os.remove(os.path.join(self.temp_dir, "5_metadata.json"))
+        self.client.download_file.reset_mock()
+        summary = search_and_download_author_papers("E.Witten.1", self.temp_dir, per_author_dir=False,
+                                                    download_pdf_flag=False, skip_existing=True,
+                                                    manifest=False, client=self.client)
+
+        self.assertEqual(summary["downloaded"], 12)
+        self.assertIsNone(summary["manifest"])
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir, "5_metadata.json")))
+
+    def test_paging_overlaps_downloads(self):
+        """测试第一页的下载在后续页产出之前就已开始。"""
+        started = threading.Event()
+        self.client.download_file.side_effect = lambda url, path: started.set()
+
+        def iter_literature(query, **kwargs):
+            yield from self.hits[:6]
+            # 如果翻页与下载串行进行，这里会一直等到超时
+            self.overlapped = started.wait(timeout=5)
+            yield from self.hits[6:]
+
+        self.client.iter_literature.side_effect = iter_literature
+
+        summary = search_and_download_author_papers("E.Witten.1", self.temp_dir, client=self.client)
+
+        self.assertTrue(self.overlapped)
+        self.assertEqual(summary["matched"], 12)
+
+
+if __name__ == "__main__":
+    unittest.main()
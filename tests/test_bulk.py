@@ -0,0 +1,197 @@
+"""
+批量并发下载器的单元测试。
+"""
+
+import unittest
+from unittest.mock import Mock, patch
+import io
+import os
+import tempfile
+import shutil
+import threading
+
+from inspirehep_downloader.bulk import BulkDownloader, download_records
+from inspirehep_downloader.cli import read_record_ids
+from tests.helpers import make_mock_client
+
+
+class TestBulkDownloader(unittest.TestCase):
+    """批量下载器的测试。"""
+    
+    def setUp(self):
+        """设置测试装置。"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.records = {
+            str(i): {"id": str(i), "metadata": {"titles": [{"title": f"Paper {i}"}],
+                                                "arxiv_eprints": [{"value": f"2301.{i:05d}"}]}}
+            for i in range(20)
+        }
+    
+    def tearDown(self):
+        """清理测试装置。"""
+        if os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir)
+    
+    def test_download_records(self):
+        """测试并发下载多条记录。"""
+        mock_client = make_mock_client(self.records)
+        
+        results = download_records(list(self.records), output_dir=self.temp_dir, client=mock_client)
+        
+        self.assertEqual(set(results), set(self.records))
+        for record_id, result in results.items():
+            self.assertIsNone(result["error"])
+            self.assertTrue(os.path.exists(result["metadata"]))
+            self.assertTrue(result["pdf"].endswith(f"{record_id}.pdf"))
+        self.assertEqual(mock_client.get_records.call_count, 1)
+        mock_client.get_record.assert_not_called()
+        self.assertEqual(mock_client.download_file.call_count, 20)
+    
+    def test_download_records_batches(self):
+        """测试按批获取记录，缺失的记录退回逐条获取。"""
+        mock_client = make_mock_client(self.records)
+        
+        results = download_records(list(self.records) + ["missing"], output_dir=self.temp_dir,
+                                   download_pdf_flag=False, client=mock_client, batch_size=8)
+        
+        self.assertEqual(mock_client.get_records.call_count, 3)
+        mock_client.get_record.assert_called_once_with("missing", fields=mock_client.RECORD_FIELDS)
+        self.assertIn("missing", results["missing"]["error"])
+        self.assertIsNone(results["19"]["error"])
+    
+    def test_download_records_without_batches(self):
+        """测试 batch_size 为 0 时逐条获取记录。"""
+        mock_client = make_mock_client(self.records)
+        
+        download_records(list(self.records), output_dir=self.temp_dir, client=mock_client, batch_size=0)
+        
+        mock_client.get_records.assert_not_called()
+        self.assertEqual(mock_client.get_record.call_count, 20)
+    
+    def test_download_records_reports_failures(self):
+        """测试每条记录的失败单独报告。"""
+        mock_client = make_mock_client(self.records)
+        
+        results = download_records(["1", "missing"], output_dir=self.temp_dir, client=mock_client)
+        
+        self.assertIsNone(results["1"]["error"])
+        self.assertIn("missing", results["missing"]["error"])
+        self.assertIsNone(results["missing"]["pdf"])
+    
+    def test_download_records_deduplicates_ids(self):
+        """测试重复的 ID 只下载一次。"""
+        mock_client = make_mock_client(self.records)
+        
+        results = download_records(["1", "1", 1], output_dir=self.temp_dir, download_pdf_flag=False,
+                                   client=mock_client, batch_size=0)
+        
+        self.assertEqual(list(results), ["1"])
+        mock_client.get_record.assert_called_once_with("1", fields=mock_client.RECORD_FIELDS)
+    
+    def test_pdf_workers_limit(self):
+        """测试 PDF 下载的并发数不超过上限。"""
+        mock_client = make_mock_client(self.records)
+        lock = threading.Lock()
+        state = {"active": 0, "peak": 0}
+        
+        def download_file(url, output_path):
+            with lock:
+                state["active"] += 1
+                state["peak"] = max(state["peak"], state["active"])
+            threading.Event().wait(0.01)
+            with lock:
+                state["active"] -= 1
+        
+        mock_client.download_file.side_effect = download_file
+        
+        with BulkDownloader(self.temp_dir, download_metadata_flag=False, api_workers=4, pdf_workers=2,
+                            client=mock_client) as bulk:
+            futures = [bulk.submit(record_id) for record_id in self.records]
+        
+        self.assertTrue(all(f.result()["pdf"] for f in futures))
+        self.assertLessEqual(state["peak"], 2)
+    
+    def test_submit_prefetched_record(self):
+        """测试提交已获取的记录时不再请求 API。"""
+        mock_client = make_mock_client(self.records)
+        
+        with BulkDownloader(self.temp_dir, client=mock_client) as bulk:
+            future = bulk.submit("3", self.records["3"])
+        
+        self.assertIsNone(future.result()["error"])
+        mock_client.get_record.assert_not_called()
+    
+    def test_skip_existing(self):
+        """测试文件都已存在的记录不请求 API。"""
+        mock_client = make_mock_client(self.records)
+        for name in ("1.pdf", "1_metadata.json"):
+            with open(os.path.join(self.temp_dir, name), "w") as f:
+                f.write("done")
+        
+        results = download_records(["1", "2"], output_dir=self.temp_dir, client=mock_client, skip_existing=True)
+        
+        self.assertTrue(results["1"]["pdf"].endswith("1.pdf"))
+        mock_client.get_records.assert_called_once_with(["2"], chunk_size=50, fields=mock_client.RECORD_FIELDS)
+    
+    def test_batches_are_fetched_in_parallel(self):
+        """测试各批次在 API 线程池中并行获取，而不是在调用线程中依次获取。"""
+        mock_client = make_mock_client(self.records)
+        barrier = threading.Barrier(2, timeout=5)
+        threads = set()
+        get_records = mock_client.get_records.side_effect
+        
+        def parallel_get_records(record_ids, chunk_size=50, fields=None):
+            threads.add(threading.current_thread())
+            # 两个批次必须同时处于请求中才能通过屏障
+            barrier.wait()
+            return get_records(record_ids, chunk_size, fields)
+        
+        mock_client.get_records.side_effect = parallel_get_records
+        
+        results = download_records(list(self.records), output_dir=self.temp_dir, client=mock_client,
+                                   api_workers=2, batch_size=10)
+        
+        self.assertTrue(all(result["error"] is None for result in results.values()))
+        self.assertEqual(mock_client.get_records.call_count, 2)
+        mock_client.get_record.assert_not_called()
+        self.assertNotIn(threading.current_thread(), threads)
+    
+    def test_unexpected_errors_complete_the_record(self):
+        """测试处理记录时出现意外的异常也会完成 Future，而不是让批量下载挂起。"""
+        mock_client = make_mock_client(self.records)
+        
+        with patch.object(BulkDownloader, "_check_existing", side_effect=OSError("磁盘错误")):
+            results = download_records(["1", "2"], output_dir=self.temp_dir, client=mock_client)
+        
+        self.assertIn("磁盘错误", results["1"]["error"])
+        self.assertIn("磁盘错误", results["2"]["error"])
+        
+        mock_client.progress = Mock()
+        mock_client.progress.record_finished.side_effect = RuntimeError("进度报告失败")
+        with BulkDownloader(self.temp_dir, client=mock_client) as bulk:
+            future = bulk.submit("3")
+        with self.assertRaises(RuntimeError):
+            future.result(timeout=5)
+    
+    def test_metadata_and_pdf_errors_are_both_kept(self):
+        """测试元数据和 PDF 都失败时两个错误都保留在结果中。"""
+        mock_client = make_mock_client(self.records)
+        mock_client.download_file.side_effect = ConnectionError("连接被重置")
+        
+        with patch("inspirehep_downloader.bulk.download_metadata", side_effect=OSError("磁盘已满")):
+            results = download_records(["1"], output_dir=self.temp_dir, client=mock_client)
+        
+        self.assertIn("磁盘已满", results["1"]["error"])
+        self.assertIn("连接被重置", results["1"]["error"])
+        self.assertIsNone(results["1"]["metadata"])
+        self.assertIsNone(results["1"]["pdf"])
+    
+    def test_read_record_ids(self):
+        """测试从文本流中读取记录 ID。"""
+        stream = io.StringIO("123\n\n# 注释\n 456 \n")
+        
+        self.assertEqual(list(read_record_ids(stream)), ["123", "456"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,150 @@
+"""
+API 响应磁盘缓存的单元测试。
+"""
+
+import unittest
+from unittest.mock import Mock, patch
+import json
+import os
+import tempfile
+import shutil
+
+from inspirehep_downloader.cache import RecordCache
+from inspirehep_downloader.client import InspireHEPClient
+
+
+def make_response(status_code, body=None, headers=None):
+    """创建模拟的 HTTP 响应。"""
+    response = Mock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    if body is not None:
+        response.content = json.dumps(body).encode()
+        response.json.return_value = body
+    return response
+
+
+class TestRecordCache(unittest.TestCase):
+    """RecordCache 类的测试。"""
+    
+    def setUp(self):
+        """设置测试装置。"""
+        self.temp_dir = tempfile.mkdtemp()
+    
+    def tearDown(self):
+        """清理测试装置。"""
+        shutil.rmtree(self.temp_dir)
+    
+    def test_set_and_get(self):
+        """测试存储和读取条目。"""
+        cache = RecordCache(self.temp_dir)
+        cache.set("key", b"body", etag='"abc"')
+        
+        entry = cache.get("key")
+        
+        self.assertEqual(entry.body, b"body")
+        self.assertEqual(entry.etag, '"abc"')
+        self.assertTrue(cache.is_fresh(entry))
+        self.assertIsNone(cache.get("missing"))
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir, "cache.sqlite")))
+    
+    def test_persistence(self):
+        """测试条目在重新打开后仍然存在。"""
+        path = os.path.join(self.temp_dir, "cache.db")
+        cache = RecordCache(path)
+        cache.set("key", b"body")
+        cache.close()
+        
+        self.assertEqual(RecordCache(path).get("key").body, b"body")
+    
+    def test_creates_missing_directory(self):
+        """测试不存在的路径被创建为目录，数据库存放在其中。"""
+        path = os.path.join(self.temp_dir, "new", "inspirehep")
+        cache = RecordCache(path)
+        
+        self.assertTrue(os.path.isdir(path))
+        self.assertEqual(cache.path, os.path.join(path, "cache.sqlite"))
+        cache.close()
+    
+    def test_ttl(self):
+        """测试过期的条目不再新鲜。"""
+        cache = RecordCache(self.temp_dir, ttl=0)
+        cache.set("key", b"body")
+        
+        self.assertFalse(cache.is_fresh(cache.get("key")))
+    
+    def test_lru_eviction(self):
+        """测试超出字节预算时淘汰最久未使用的条目。"""
+        cache = RecordCache(self.temp_dir, max_bytes=25)
+        with patch("inspirehep_downloader.cache.time.time", side_effect=[1, 2, 3, 4, 5]):
+            cache.set("a", b"x" * 10)
+            cache.set("b", b"x" * 10)
+            cache.get("a")
+            cache.set("c", b"x" * 10)
+        
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("c"))
+        self.assertLessEqual(cache.total_bytes(), 25)
+    
+    def test_make_key_ignores_param_order(self):
+        """测试缓存键与参数顺序无关。"""
+        self.assertEqual(RecordCache.make_key("u", {"a": 1, "b": 2}), RecordCache.make_key("u", {"b": 2, "a": 1}))
+
+
+class TestCachedClient(unittest.TestCase):
+    """启用缓存的 InspireHEPClient 的测试。"""
+    
+    def setUp(self):
+        """设置测试装置。"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.record = {"id": "12345", "metadata": {"titles": [{"title": "Test Paper"}]}}
+    
+    def tearDown(self):
+        """清理测试装置。"""
+        shutil.rmtree(self.temp_dir)
+    
+    @patch('inspirehep_downloader.client.requests.Session.get')
+    def test_fresh_entry_skips_network(self, mock_get):
+        """测试新鲜的缓存条目不发起请求。"""
+        mock_get.return_value = make_response(200, self.record)
+        client = InspireHEPClient(cache=RecordCache(self.temp_dir))
+        
+        first = client.get_record("12345")
+        second = client.get_record("12345")
+        
+        self.assertEqual(first, second)
+        mock_get.assert_called_once()
+    
+    @patch('inspirehep_downloader.client.requests.Session.get')
+    def test_stale_entry_revalidates(self, mock_get):
+        """测试过期条目使用 ETag 重新验证，304 时复用缓存内容。"""
+        mock_get.side_effect = [
+            make_response(200, self.record, {"ETag": '"v1"', "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"}),
+            make_response(304),
+        ]
+        client = InspireHEPClient(cache=RecordCache(self.temp_dir, ttl=0))
+        
+        client.get_record("12345")
+        record = client.get_record("12345")
+        
+        self.assertEqual(record, self.record)
+        headers = mock_get.call_args.kwargs["headers"]
+        self.assertEqual(headers["If-None-Match"], '"v1"')
+        self.assertEqual(headers["If-Modified-Since"], "Mon, 01 Jan 2024 00:00:00 GMT")
+    
+    @patch('inspirehep_downloader.client.requests.Session.get')
+    def test_search_results_cached_per_query(self, mock_get):
+        """测试搜索结果按查询参数分别缓存。"""
+        mock_get.return_value = make_response(200, {"hits": {"hits": [], "total": 0}})
+        client = InspireHEPClient(cache=RecordCache(self.temp_dir))
+        
+        client.search_literature("author:a")
+        client.search_literature("author:a")
+        client.search_literature("author:b")
+        
+        self.assertEqual(mock_get.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -8,9 +8,35 @@ import json
 import os
 import tempfile
 import shutil
+import threading
+import requests
 
 from inspirehep_downloader.client import InspireHEPClient
 from inspirehep_downloader.downloader import download_pdf, download_metadata, download_record
+from inspirehep_downloader.scheduler import RequestScheduler
+from tests.helpers import make_mock_client, ThreadingHTTPServer, StubInspireHandler, PDF_BODY
+
+
+class TruncatingHandler(StubInspireHandler):
+    """在 /files/truncated.pdf 上声明完整长度但只发送一半内容的处理程序。"""
+    
+    def do_GET(self):
+        if self.path == "/files/truncated.pdf":
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(PDF_BODY)))
+            self.end_headers()
+            self.wfile.write(PDF_BODY[:len(PDF_BODY) // 2])
+            self.close_connection = True
+        else:
+            super().do_GET()
+
+
+def json_response(body):
+    """创建一个返回给定 JSON 内容的模拟响应。"""
+    response = Mock()
+    response.content = json.dumps(body).encode()
+    response.json.return_value = body
+    return response
 
 
 class TestInspireHEPClient(unittest.TestCase):
@@ -34,13 +60,12 @@ class TestInspireHEPClient(unittest.TestCase):
     @patch('inspirehep_downloader.client.requests.Session.get')
     def test_search_literature(self, mock_get):
         """测试文献搜索。"""
-        mock_response = Mock()
-        mock_response.json.return_value = {
+        mock_response = json_response({
             "hits": {
                 "hits": [{"id": "12345", "metadata": {"titles": [{"title": "Test Paper"}]}}],
                 "total": 1
             }
-        }
+        })
         mock_get.return_value = mock_response
         
         results = self.client.search_literature("author:test", size=1)
@@ -48,14 +73,46 @@ class TestInspireHEPClient(unittest.TestCase):
         self.assertIn("hits", results)
         mock_get.assert_called_once()
     
+    def make_pages(self, total, size):
+        """创建模拟的分页搜索响应。"""
+        def search_literature(query, size=size, page=1, fields=None):
+            start = (page - 1) * size
+            ids = range(start, min(start + size, total))
+            return {"hits": {"hits": [{"id": str(i)} for i in ids], "total": total}}
+        return search_literature
+    
+    def test_iter_literature_all_pages(self):
+        """测试遍历所有页面。"""
+        with patch.object(self.client, "search_literature", side_effect=self.make_pages(25, 10)) as mock_search:
+            ids = [hit["id"] for hit in self.client.iter_literature("author:test", size=10)]
+        
+        self.assertEqual(ids, [str(i) for i in range(25)])
+        self.assertEqual([c.kwargs["page"] for c in mock_search.call_args_list], [1, 2, 3])
+    
+    def test_iter_literature_limit_and_resume(self):
+        """测试结果数上限和从指定页恢复。"""
+        with patch.object(self.client, "search_literature", side_effect=self.make_pages(100, 10)) as mock_search:
+            ids = [hit["id"] for hit in self.client.iter_literature("author:test", size=10, limit=15,
+                                                                      start_page=3, prefetch=False)]
+        
+        self.assertEqual(ids, [str(i) for i in range(20, 35)])
+        self.assertEqual(mock_search.call_count, 2)
+    
+    def test_iter_literature_exact_page_boundary(self):
+        """测试总数正好是页大小的倍数时不请求多余的页。"""
+        with patch.object(self.client, "search_literature", side_effect=self.make_pages(20, 10)) as mock_search:
+            ids = list(self.client.iter_literature("author:test", size=10))
+        
+        self.assertEqual(len(ids), 20)
+        self.assertEqual(mock_search.call_count, 2)
+    
     @patch('inspirehep_downloader.client.requests.Session.get')
     def test_get_record(self, mock_get):
         """测试获取特定记录。"""
-        mock_response = Mock()
-        mock_response.json.return_value = {
+        mock_response = json_response({
             "id": "12345",
             "metadata": {"titles": [{"title": "Test Paper"}]}
-        }
+        })
         mock_get.return_value = mock_response
         
         record = self.client.get_record("12345")
@@ -63,17 +120,31 @@ class TestInspireHEPClient(unittest.TestCase):
         self.assertEqual(record["id"], "12345")
         mock_get.assert_called_once()
     
+    def test_get_records(self):
+        """测试通过 OR 查询批量获取记录。"""
+        def search_literature(query, size=10, page=1, fields=None):
+            ids = [term.split(":")[1] for term in query.split(" or ")]
+            return {"hits": {"hits": [{"id": i} for i in ids if i != "3"], "total": len(ids)}}
+        
+        with patch.object(self.client, "search_literature", side_effect=search_literature) as mock_search:
+            records, missing = self.client.get_records(["1", "2", "3", "2", "4"], chunk_size=2)
+        
+        self.assertEqual(sorted(records), ["1", "2", "4"])
+        self.assertEqual(missing, ["3"])
+        self.assertEqual(mock_search.call_count, 2)
+        self.assertEqual(mock_search.call_args_list[0].args[0], "recid:1 or recid:2")
+        self.assertEqual(mock_search.call_args_list[0].kwargs["size"], 2)
+    
     @patch('inspirehep_downloader.client.requests.Session.get')
     def test_get_pdf_url_from_documents(self, mock_get):
         """测试从文档中获取 PDF URL。"""
-        mock_response = Mock()
-        mock_response.json.return_value = {
+        mock_response = json_response({
             "metadata": {
                 "documents": [
                     {"key": "paper.pdf", "url": "https://example.com/paper.pdf"}
                 ]
             }
-        }
+        })
         mock_get.return_value = mock_response
         
         pdf_url = self.client.get_pdf_url("12345")
@@ -83,13 +154,12 @@ class TestInspireHEPClient(unittest.TestCase):
     @patch('inspirehep_downloader.client.requests.Session.get')
     def test_get_pdf_url_from_arxiv(self, mock_get):
         """测试从 arXiv 获取 PDF URL。"""
-        mock_response = Mock()
-        mock_response.json.return_value = {
+        mock_response = json_response({
             "metadata": {
                 "documents": [],
                 "arxiv_eprints": [{"value": "1234.5678"}]
             }
-        }
+        })
         mock_get.return_value = mock_response
         
         pdf_url = self.client.get_pdf_url("12345")
@@ -99,13 +169,12 @@ class TestInspireHEPClient(unittest.TestCase):
     @patch('inspirehep_downloader.client.requests.Session.get')
     def test_get_pdf_url_not_available(self, mock_get):
         """测试在 PDF URL 不可用时获取它。"""
-        mock_response = Mock()
-        mock_response.json.return_value = {
+        mock_response = json_response({
             "metadata": {
                 "documents": [],
                 "arxiv_eprints": []
             }
-        }
+        })
         mock_get.return_value = mock_response
         
         pdf_url = self.client.get_pdf_url("12345")
@@ -115,8 +184,7 @@ class TestInspireHEPClient(unittest.TestCase):
     @patch('inspirehep_downloader.client.requests.Session.get')
     def test_get_metadata(self, mock_get):
         """测试获取格式化的元数据。"""
-        mock_response = Mock()
-        mock_response.json.return_value = {
+        mock_response = json_response({
             "metadata": {
                 "titles": [{"title": "Test Paper"}],
                 "authors": [{"full_name": "John Doe"}],
@@ -127,7 +195,7 @@ class TestInspireHEPClient(unittest.TestCase):
                 "citation_count": 10,
                 "keywords": [{"value": "test"}]
             }
-        }
+        })
         mock_get.return_value = mock_response
         
         metadata = self.client.get_metadata("12345")
@@ -135,6 +203,161 @@ class TestInspireHEPClient(unittest.TestCase):
         self.assertEqual(metadata["title"], "Test Paper")
         self.assertEqual(metadata["authors"], ["John Doe"])
         self.assertEqual(metadata["citations"], 10)
+        self.assertEqual(mock_get.call_args.kwargs["params"]["fields"], ",".join(InspireHEPClient.METADATA_FIELDS))
+    
+    @patch('inspirehep_downloader.client.requests.Session.get')
+    def test_field_projection(self, mock_get):
+        """测试只请求所需的字段。"""
+        mock_get.return_value = json_response({"hits": {"hits": [], "total": 0}})
+        
+        self.client.search_literature("author:test", fields=["titles.title", "control_number"])
+        self.assertEqual(mock_get.call_args.kwargs["params"]["fields"], "titles.title,control_number")
+        
+        self.client.get_record("12345")
+        self.assertIsNone(mock_get.call_args.kwargs["params"])
+        
+        self.client.get_pdf_url("12345")
+        self.assertEqual(mock_get.call_args.kwargs["params"]["fields"], "documents.key,documents.url,arxiv_eprints.value")
+    
+    def test_extract_metadata_from_record(self):
+        """测试从已获取的记录中提取元数据和 PDF URL。"""
+        record = {
+            "id": "12345",
+            "metadata": {
+                "titles": [{"title": "Test Paper"}],
+                "documents": [{"key": "paper.pdf", "url": "https://example.com/paper.pdf"}]
+            }
+        }
+        
+        metadata = InspireHEPClient.extract_metadata(record)
+        
+        self.assertEqual(metadata["record_id"], "12345")
+        self.assertEqual(metadata["title"], "Test Paper")
+        self.assertEqual(InspireHEPClient.extract_pdf_url(record), "https://example.com/paper.pdf")
+
+
+class TestDownloadFile(unittest.TestCase):
+    """InspireHEPClient.download_file 的可恢复下载测试。"""
+    
+    def setUp(self):
+        """设置测试装置。"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.output_path = os.path.join(self.temp_dir, "paper.pdf")
+        self.client = InspireHEPClient()
+    
+    def tearDown(self):
+        """清理测试装置。"""
+        shutil.rmtree(self.temp_dir)
+    
+    def make_response(self, status_code, chunks, headers):
+        response = Mock()
+        response.status_code = status_code
+        response.headers = headers
+        response.iter_content.return_value = chunks
+        return response
+    
+    @patch('inspirehep_downloader.client.requests.Session.get')
+    def test_download_is_atomic(self, mock_get):
+        """测试下载完成后才出现最终文件。"""
+        mock_get.return_value = self.make_response(200, [b"hello", b"world"], {"Content-Length": "10"})
+        
+        written = self.client.download_file("https://example.com/paper.pdf", self.output_path)
+        
+        self.assertEqual(written, 10)
+        with open(self.output_path, "rb") as f:
+            self.assertEqual(f.read(), b"helloworld")
+        self.assertFalse(os.path.exists(self.output_path + ".part"))
+    
+    @patch('inspirehep_downloader.client.requests.Session.get')
+    def test_resume_from_part_file(self, mock_get):
+        """测试使用 Range 请求从 .part 文件继续下载。"""
+        with open(self.output_path + ".part", "wb") as f:
+            f.write(b"hello")
+        mock_get.return_value = self.make_response(206, [b"world"], {"Content-Range": "bytes 5-9/10"})
+        
+        written = self.client.download_file("https://example.com/paper.pdf", self.output_path)
+        
+        self.assertEqual(written, 5)
+        self.assertEqual(mock_get.call_args.kwargs["headers"], {"Range": "bytes=5-"})
+        with open(self.output_path, "rb") as f:
+            self.assertEqual(f.read(), b"helloworld")
+    
+    @patch('inspirehep_downloader.client.requests.Session.get')
+    def test_server_ignores_range(self, mock_get):
+        """测试服务器忽略 Range 时从头重新写入。"""
+        with open(self.output_path + ".part", "wb") as f:
+            f.write(b"stale")
+        mock_get.return_value = self.make_response(200, [b"helloworld"], {"Content-Length": "10"})
+        
+        self.client.download_file("https://example.com/paper.pdf", self.output_path)
+        
+        with open(self.output_path, "rb") as f:
+            self.assertEqual(f.read(), b"helloworld")
+    
+    @patch('inspirehep_downloader.client.requests.Session.get')
+    def test_truncated_download_keeps_part_file(self, mock_get):
+        """测试长度不一致时报错并保留 .part 文件以便继续。"""
+        mock_get.return_value = self.make_response(200, [b"hell"], {"Content-Length": "10"})
+        
+        with self.assertRaises(requests.exceptions.RequestException):
+            self.client.download_file("https://example.com/paper.pdf", self.output_path)
+        
+        self.assertFalse(os.path.exists(self.output_path))
+        self.assertEqual(os.path.getsize(self.output_path + ".part"), 4)
+    
+    @patch('inspirehep_downloader.client.requests.Session.get')
+    def test_skip_existing(self, mock_get):
+        """测试最终文件已存在时不进行网络请求。"""
+        with open(self.output_path, "wb") as f:
+            f.write(b"done")
+        
+        written = self.client.download_file("https://example.com/paper.pdf", self.output_path, skip_existing=True)
+        
+        self.assertEqual(written, 0)
+        mock_get.assert_not_called()
+
+
+class TestDownloadFileStreaming(unittest.TestCase):
+    """download_file 针对本地 HTTP 服务器的 readinto 写入路径测试。"""
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), TruncatingHandler)
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+    
+    def setUp(self):
+        """设置测试装置。"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.output_path = os.path.join(self.temp_dir, "paper.pdf")
+        self.client = InspireHEPClient(scheduler=RequestScheduler(rates={}, max_retries=0))
+    
+    def tearDown(self):
+        """清理测试装置。"""
+        shutil.rmtree(self.temp_dir)
+    
+    def test_small_buffer_with_preallocation(self):
+        """测试缓冲区小于文件且预分配空间时内容完整。"""
+        written = self.client.download_file(f"{self.base_url}/files/paper.pdf", self.output_path,
+                                            chunk_size=4096, preallocate=True)
+        
+        self.assertEqual(written, len(PDF_BODY))
+        with open(self.output_path, "rb") as f:
+            self.assertEqual(f.read(), PDF_BODY)
+    
+    def test_truncated_download_trims_preallocation(self):
+        """测试连接中断时截掉预分配的空间，使 .part 文件可以续传。"""
+        with self.assertRaises(requests.exceptions.RequestException):
+            self.client.download_file(f"{self.base_url}/files/truncated.pdf", self.output_path, preallocate=True)
+        
+        self.assertFalse(os.path.exists(self.output_path))
+        self.assertEqual(os.path.getsize(self.output_path + ".part"), len(PDF_BODY) // 2)
 
 
 class TestDownloaderFunctions(unittest.TestCase):
@@ -152,7 +375,7 @@ class TestDownloaderFunctions(unittest.TestCase):
     @patch('inspirehep_downloader.downloader.InspireHEPClient')
     def test_download_pdf(self, mock_client_class):
         """测试下载 PDF。"""
-        mock_client = Mock()
+        mock_client = make_mock_client({})
         mock_client.get_pdf_url.return_value = "https://example.com/paper.pdf"
         mock_client.download_file = Mock()
         mock_client_class.return_value = mock_client
@@ -166,17 +389,33 @@ class TestDownloaderFunctions(unittest.TestCase):
     @patch('inspirehep_downloader.downloader.InspireHEPClient')
     def test_download_pdf_not_available(self, mock_client_class):
         """测试在 PDF 不可用时下载它。"""
-        mock_client = Mock()
+        mock_client = make_mock_client({})
         mock_client.get_pdf_url.return_value = None
         mock_client_class.return_value = mock_client
         
         with self.assertRaises(ValueError):
             download_pdf("12345", output_dir=self.temp_dir)
     
+    @patch('inspirehep_downloader.downloader.InspireHEPClient')
+    def test_download_skip_existing(self, mock_client_class):
+        """测试跳过已存在的文件时不创建客户端也不请求 API。"""
+        for name in ("12345.pdf", "12345_metadata.json"):
+            with open(os.path.join(self.temp_dir, name), "w") as f:
+                f.write("done")
+        
+        results = download_record("12345", output_dir=self.temp_dir, skip_existing=True)
+        
+        self.assertTrue(results["pdf"].endswith("12345.pdf"))
+        self.assertTrue(results["metadata"].endswith("12345_metadata.json"))
+        mock_client_class.return_value.get_record.assert_not_called()
+        self.assertEqual(download_pdf("12345", output_dir=self.temp_dir, skip_existing=True),
+                         os.path.join(self.temp_dir, "12345.pdf"))
+        mock_client_class.return_value.get_pdf_url.assert_not_called()
+    
     @patch('inspirehep_downloader.downloader.InspireHEPClient')
     def test_download_metadata_json(self, mock_client_class):
         """测试下载 JSON 格式的元数据。"""
-        mock_client = Mock()
+        mock_client = make_mock_client({})
         mock_client.get_metadata.return_value = {
             "record_id": "12345",
             "title": "Test Paper",
@@ -196,7 +435,7 @@ class TestDownloaderFunctions(unittest.TestCase):
     @patch('inspirehep_downloader.downloader.InspireHEPClient')
     def test_download_metadata_txt(self, mock_client_class):
         """测试下载文本格式的元数据。"""
-        mock_client = Mock()
+        mock_client = make_mock_client({})
         mock_client.get_metadata.return_value = {
             "record_id": "12345",
             "title": "Test Paper",
@@ -227,9 +466,10 @@ class TestDownloaderFunctions(unittest.TestCase):
         with self.assertRaises(ValueError):
             download_metadata("12345", output_dir=self.temp_dir, format="xml")
     
+    @patch('inspirehep_downloader.downloader.InspireHEPClient')
     @patch('inspirehep_downloader.downloader.download_pdf')
     @patch('inspirehep_downloader.downloader.download_metadata')
-    def test_download_record(self, mock_download_metadata, mock_download_pdf):
+    def test_download_record(self, mock_download_metadata, mock_download_pdf, mock_client_class):
         """测试下载 PDF 和元数据。"""
         mock_download_pdf.return_value = os.path.join(self.temp_dir, "12345.pdf")
         mock_download_metadata.return_value = os.path.join(self.temp_dir, "12345_metadata.json")
@@ -240,6 +480,50 @@ class TestDownloaderFunctions(unittest.TestCase):
         self.assertIn("metadata", results)
         mock_download_pdf.assert_called_once()
         mock_download_metadata.assert_called_once()
+    
+    def test_download_record_fetches_record_once(self):
+        """测试 download_record 只请求一次 API 并复用记录。"""
+        mock_client = make_mock_client({"12345": {
+            "id": "12345",
+            "metadata": {
+                "titles": [{"title": "Test Paper"}],
+                "arxiv_eprints": [{"value": "1234.5678"}]
+            }
+        }})
+        
+        results = download_record("12345", output_dir=self.temp_dir, client=mock_client)
+        
+        mock_client.get_record.assert_called_once_with("12345", fields=mock_client.RECORD_FIELDS)
+        mock_client.get_metadata.assert_not_called()
+        mock_client.get_pdf_url.assert_not_called()
+        mock_client.download_file.assert_called_once_with(
+            "https://arxiv.org/pdf/1234.5678.pdf", os.path.join(self.temp_dir, "12345.pdf")
+        )
+        with open(results["metadata"], "r") as f:
+            self.assertEqual(json.load(f)["title"], "Test Paper")
+    
+    def test_download_metadata_uses_client_json_backend(self):
+        """测试元数据文件用客户端自己的 JSON 后端编码，而不是全局默认后端。"""
+        client = InspireHEPClient(json_backend="json")
+        record = {"id": "12345", "metadata": {"titles": [{"title": "Test Paper"}]}}
+        
+        with patch.object(client.json_backend, "dumpb", wraps=client.json_backend.dumpb) as mock_dumpb:
+            path = download_metadata("12345", self.temp_dir, client=client, record=record)
+        
+        mock_dumpb.assert_called_once()
+        with open(path, "r", encoding="utf-8") as f:
+            self.assertEqual(f.read(), json.dumps(client.extract_metadata(record), indent=2, ensure_ascii=False))
+    
+    def test_download_record_with_prefetched_record(self):
+        """测试提供已获取的记录时不再请求 API。"""
+        mock_client = make_mock_client({})
+        record = {"id": "12345", "metadata": {"titles": [{"title": "Test Paper"}]}}
+        
+        results = download_record("12345", output_dir=self.temp_dir, download_pdf_flag=False,
+                                  client=mock_client, record=record)
+        
+        mock_client.get_record.assert_not_called()
+        self.assertTrue(os.path.exists(results["metadata"]))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,131 @@
+"""
+批量导出文件离线导入的单元测试。
+"""
+
+import unittest
+from unittest.mock import patch
+import gzip
+import io
+import json
+import os
+import tempfile
+import shutil
+
+from inspirehep_downloader.dump import iter_json_values, iter_dump_records, iter_dump_metadata, ingest_dump
+from inspirehep_downloader.export import JSONLinesWriter
+from inspirehep_downloader.index import MetadataIndex
+from inspirehep_downloader.cli import main
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+def make_dump_record(record_id, bare=False):
+    """创建导出文件中的一条记录；bare 为 True 时只有元数据本身。"""
+    metadata = {
+        "control_number": record_id,
+        "titles": [{"title": f"Black holes {record_id}"}],
+        "authors": [{"full_name": "Witten, Edward"}],
+        "arxiv_eprints": [{"value": f"2301.{record_id:05d}"}],
+        "citation_count": record_id * 10,
+    }
+    return metadata if bare else {"id": str(record_id), "created": "2023-01-01", "metadata": metadata}
+
+
+class TestDumpIngestion(unittest.TestCase):
+    """导出文件流式解析和导入的测试。"""
+
+    def setUp(self):
+        """设置测试装置。"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.records = [make_dump_record(i, bare=i % 2 == 0) for i in range(1, 8)]
+        self.records.append({"control_number": 99, "deleted": True})
+
+    def tearDown(self):
+        """清理测试装置。"""
+        shutil.rmtree(self.temp_dir)
+
+    def write_jsonl(self, name, opener=open):
+        path = os.path.join(self.temp_dir, name)
+        with opener(path, "wt", encoding="utf-8") as f:
+            for record in self.records:
+                f.write(json.dumps(record) + "\n")
+        return path
+
+    def test_values_across_chunk_boundaries(self):
+        """测试 JSON 数组和相接的值在很小的读块下也能正确解析。"""
+        text = json.dumps(self.records, indent=2)
+        self.assertEqual(list(iter_json_values(io.StringIO(text), read_size=7)), self.records)
+        self.assertEqual(list(iter_json_values(io.StringIO('{"a": 1} 123 [4, 5]\n"x"'), read_size=2)),
+                         [{"a": 1}, 123, [4, 5], "x"])
+        self.assertEqual(list(iter_json_values(io.StringIO("  [ ]  "))), [])
+
+    def test_invalid_json(self):
+        """测试截断的文件报错。"""
+        with self.assertRaises(ValueError):
+            list(iter_json_values(io.StringIO('[{"a": 1}, {"b": '), read_size=4))
+
+    def test_gzip_jsonl_records(self):
+        """测试 gzip 压缩的 JSON Lines；只有元数据的条目被包装，已删除的记录被跳过。"""
+        path = self.write_jsonl("dump.jsonl.gz", gzip.open)
+
+        records = list(iter_dump_records(path))
+
+        self.assertEqual([r["id"] for r in records], [str(i) for i in range(1, 8)])
+        self.assertEqual(records[1]["metadata"]["control_number"], 2)
+        self.assertEqual(len(list(iter_dump_records(path, limit=3))), 3)
+
+    def test_metadata_matches_api_extraction(self):
+        """测试提取结果与 get_metadata 相同，并附带 PDF URL。"""
+        path = self.write_jsonl("dump.json")
+
+        metadata = list(iter_dump_metadata(path))[2]
+
+        self.assertEqual(metadata["record_id"], "3")
+        self.assertEqual(metadata["title"], "Black holes 3")
+        self.assertEqual(metadata["authors"], ["Witten, Edward"])
+        self.assertEqual(metadata["pdf_url"], "https://arxiv.org/pdf/2301.00003.pdf")
+
+    @unittest.skipIf(zstandard is None, "需要 zstandard")
+    def test_zstd_dump(self):
+        """测试根据文件头识别 zstd 压缩，与扩展名无关。"""
+        path = os.path.join(self.temp_dir, "dump.bin")
+        data = "\n".join(json.dumps(record) for record in self.records).encode("utf-8")
+        with open(path, "wb") as f:
+            f.write(zstandard.ZstdCompressor().compress(data))
+
+        self.assertEqual(len(list(iter_dump_records(path))), 7)
+
+    def test_ingest_to_writer_and_index(self):
+        """测试导入到 JSON Lines 写入器和本地索引。"""
+        path = self.write_jsonl("dump.jsonl.gz", gzip.open)
+        output = os.path.join(self.temp_dir, "out.jsonl")
+
+        with JSONLinesWriter(output) as writer, MetadataIndex(os.path.join(self.temp_dir, "index.sqlite")) as index:
+            count = ingest_dump(path, [writer], index=index, index_batch_size=3)
+            self.assertEqual(index.count(), 7)
+            self.assertEqual(index.search("hole", order="citations", limit=1)[0]["record_id"], "7")
+
+        self.assertEqual(count, 7)
+        with open(output, encoding="utf-8") as f:
+            self.assertEqual(len(f.readlines()), 7)
+
+    def test_cli_dump_does_not_create_client(self):
+        """测试命令行 --dump 不创建网络客户端。"""
+        path = self.write_jsonl("dump.jsonl")
+        output = os.path.join(self.temp_dir, "out.csv")
+
+        with patch("inspirehep_downloader.client.InspireHEPClient") as mock_client_class, \
+                patch("sys.stderr", io.StringIO()):
+            code = main(["--dump", path, "--table", output, "--limit", "5"])
+
+        self.assertEqual(code, 0)
+        mock_client_class.assert_not_called()
+        with open(output, encoding="utf-8") as f:
+            self.assertEqual(len(f.readlines()), 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,201 @@
+"""
+元数据流式导出的单元测试。
+"""
+
+import unittest
+from unittest.mock import patch
+import gzip
+import json
+import os
+import tempfile
+import shutil
+
+import csv
+
+from inspirehep_downloader.export import (
+    JSONLinesWriter, export_jsonl, iter_search_metadata, iter_records_metadata, detect_compression,
+    export_table, open_table_writer, ParquetTableWriter
+)
+from inspirehep_downloader.cli import main
+from tests.helpers import make_mock_client
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+def make_hit(record_id):
+    """创建一条模拟的搜索结果。"""
+    return {"id": str(record_id), "metadata": {"titles": [{"title": f"Paper {record_id}"}], "citation_count": record_id}}
+
+
+class TestJSONLinesExport(unittest.TestCase):
+    """JSON Lines 导出的测试。"""
+    
+    def setUp(self):
+        """设置测试装置。"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.items = [{"record_id": str(i), "title": f"标题 {i}"} for i in range(5)]
+    
+    def tearDown(self):
+        """清理测试装置。"""
+        shutil.rmtree(self.temp_dir)
+    
+    def read_lines(self, path, opener=open):
+        with opener(path, "rt", encoding="utf-8") as f:
+            return [json.loads(line) for line in f]
+    
+    def test_plain(self):
+        """测试写入未压缩的 JSON Lines 文件。"""
+        path = os.path.join(self.temp_dir, "out.jsonl")
+        
+        count = export_jsonl(iter(self.items), path)
+        
+        self.assertEqual(count, 5)
+        self.assertEqual(self.read_lines(path), self.items)
+    
+    def test_gzip(self):
+        """测试根据扩展名使用 gzip 压缩。"""
+        path = os.path.join(self.temp_dir, "out.jsonl.gz")
+        
+        export_jsonl(self.items, path)
+        
+        self.assertEqual(self.read_lines(path, gzip.open), self.items)
+    
+    @unittest.skipIf(zstandard is None, "需要 zstandard")
+    def test_zstd(self):
+        """测试 zstd 压缩。"""
+        path = os.path.join(self.temp_dir, "out.jsonl.zst")
+        
+        export_jsonl(self.items, path)
+        
+        with open(path, "rb") as f:
+            data = zstandard.ZstdDecompressor().stream_reader(f).read()
+        self.assertEqual([json.loads(line) for line in data.decode().splitlines()], self.items)
+    
+    def test_incremental_flush(self):
+        """测试每写入 flush_every 条记录后数据即可见。"""
+        path = os.path.join(self.temp_dir, "out.jsonl")
+        
+        with JSONLinesWriter(path, flush_every=2) as writer:
+            writer.write(self.items[0])
+            writer.write(self.items[1])
+            self.assertEqual(len(self.read_lines(path)), 2)
+    
+    def test_detect_compression(self):
+        """测试根据扩展名推断压缩格式。"""
+        self.assertEqual(detect_compression("a.jsonl.gz"), "gzip")
+        self.assertEqual(detect_compression("a.jsonl.zst"), "zstd")
+        self.assertEqual(detect_compression("a.jsonl"), "none")
+        with self.assertRaises(ValueError):
+            JSONLinesWriter(os.path.join(self.temp_dir, "x"), compression="bz2")
+    
+    def test_iter_search_metadata(self):
+        """测试从搜索结果产出元数据，只请求元数据字段。"""
+        client = make_mock_client({})
+        client.iter_literature.return_value = iter([make_hit(1), make_hit(2)])
+        
+        items = list(iter_search_metadata(client, "author:test", limit=2))
+        
+        self.assertEqual([m["title"] for m in items], ["Paper 1", "Paper 2"])
+        self.assertEqual(client.iter_literature.call_args.kwargs["fields"], client.METADATA_FIELDS)
+    
+    def test_iter_records_metadata(self):
+        """测试按批获取记录的元数据并报告缺失的 ID。"""
+        client = make_mock_client({str(i): make_hit(i) for i in range(5)})
+        missing = []
+        
+        items = list(iter_records_metadata(client, ["0", "9", "3", "4"], batch_size=3, missing=missing))
+        
+        self.assertEqual([m["record_id"] for m in items], ["0", "3", "4"])
+        self.assertEqual(missing, ["9"])
+        self.assertEqual(client.get_records.call_count, 2)
+    
+    @patch('inspirehep_downloader.client.InspireHEPClient')
+    def test_cli_search_to_jsonl(self, mock_client_class):
+        """测试命令行将搜索结果导出到 JSON Lines 文件。"""
+        client = make_mock_client({})
+        client.iter_literature.return_value = iter([make_hit(1), make_hit(2), make_hit(3)])
+        mock_client_class.return_value = client
+        path = os.path.join(self.temp_dir, "out.jsonl.gz")
+        
+        self.assertEqual(main(["--search", "author:test", "--jsonl", path]), 0)
+        
+        self.assertEqual([m["record_id"] for m in self.read_lines(path, gzip.open)], ["1", "2", "3"])
+
+
+
+class TestTableExport(unittest.TestCase):
+    """表格导出的测试。"""
+    
+    def setUp(self):
+        """设置测试装置。"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.items = [
+            {"record_id": str(i), "title": f"Paper {i}", "authors": ["A", "B"], "citations": i,
+             "publication_date": 2020, "keywords": ["k"], "abstract": "x", "arxiv_id": "N/A", "doi": "N/A",
+             "inspire_url": f"https://inspirehep.net/literature/{i}"}
+            for i in range(25)
+        ]
+    
+    def tearDown(self):
+        """清理测试装置。"""
+        shutil.rmtree(self.temp_dir)
+    
+    def test_csv(self):
+        """测试写入 gzip 压缩的 CSV 表格。"""
+        path = os.path.join(self.temp_dir, "out.csv.gz")
+        
+        self.assertEqual(export_table(self.items, path), 25)
+        
+        with gzip.open(path, "rt", encoding="utf-8", newline="") as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(len(rows), 25)
+        self.assertEqual(rows[3]["authors"], "A; B")
+        self.assertEqual(rows[3]["author_count"], "2")
+        self.assertEqual(rows[3]["citations"], "3")
+    
+    @unittest.skipIf(pyarrow is None, "需要 pyarrow")
+    def test_parquet_row_groups(self):
+        """测试按行组写入 Parquet 文件。"""
+        path = os.path.join(self.temp_dir, "out.parquet")
+        
+        export_table(self.items, path, batch_size=10)
+        
+        parquet_file = pyarrow.parquet.ParquetFile(path)
+        self.assertEqual(parquet_file.metadata.num_row_groups, 3)
+        table = parquet_file.read()
+        self.assertEqual(table.num_rows, 25)
+        self.assertEqual(table.column("citations").to_pylist()[:3], [0, 1, 2])
+        self.assertEqual(table.column("authors").to_pylist()[0], ["A", "B"])
+        self.assertEqual(table.column("publication_date").to_pylist()[0], "2020")
+    
+    @unittest.skipIf(pyarrow is None, "需要 pyarrow")
+    def test_parquet_compression(self):
+        """测试 Parquet 使用指定的列压缩编码，不支持的压缩格式被拒绝。"""
+        path = os.path.join(self.temp_dir, "out.parquet")
+        
+        export_table(self.items, path, compression="zstd")
+        
+        column = pyarrow.parquet.ParquetFile(path).metadata.row_group(0).column(0)
+        self.assertEqual(column.compression, "ZSTD")
+        with self.assertRaises(ValueError):
+            open_table_writer(os.path.join(self.temp_dir, "b.parquet"), compression="bz2")
+    
+    def test_format_detection(self):
+        """测试根据扩展名选择表格格式。"""
+        with open_table_writer(os.path.join(self.temp_dir, "a.csv")) as writer:
+            self.assertNotIsInstance(writer, ParquetTableWriter)
+        with self.assertRaises(ValueError):
+            open_table_writer(os.path.join(self.temp_dir, "a.xlsx"), format="xlsx")
+
+
+if __name__ == "__main__":
+    unittest.main()
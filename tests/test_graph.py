@@ -0,0 +1,189 @@
+"""
+引用关系图爬取器的单元测试。
+"""
+
+import unittest
+from unittest.mock import patch
+import io
+import os
+import re
+import tempfile
+import shutil
+
+from inspirehep_downloader.graph import GraphCrawler, crawl_graph, reference_ids
+from inspirehep_downloader.cli import main
+from tests.helpers import make_mock_client
+
+
+# 1 引用 2 和 3，2 和 3 引用 4，3 还引用 5，5 引用 1
+REFERENCES = {"1": ["2", "3"], "2": ["4"], "3": ["4", "5"], "4": [], "5": ["1"]}
+
+
+def make_record(record_id):
+    """创建一条带有参考文献链接的模拟记录。"""
+    references = [{"record": {"$ref": f"https://inspirehep.net/api/literature/{ref}"}}
+                  for ref in REFERENCES[record_id]]
+    return {"id": record_id, "metadata": {"control_number": int(record_id), "references": references,
+                                          "titles": [{"title": f"Paper {record_id}"}],
+                                          "arxiv_eprints": [{"value": f"2301.{int(record_id):05d}"}]}}
+
+
+def make_graph_client(references=REFERENCES, records=None):
+    """
+    创建一个模拟客户端，refersto 搜索根据 references 返回引用记录。
+
+    支持 "refersto:recid:N and (recid:a or ...)" 形式的过滤；client.pages 记录每个产出的页面
+    (查询, 字段, 命中数)。
+    """
+    if records is None:
+        records = {record_id: make_record(record_id) for record_id in references}
+    client = make_mock_client(records)
+    client.RECORD_FIELDS = ["control_number"]
+    client.pages = []
+
+    def iter_literature_pages(query, size=100, fields=None, **kwargs):
+        cited = re.match(r"refersto:recid:(\d+)", query).group(1)
+        allowed = set(re.findall(r"\brecid:(\d+)", query.split(" and ", 1)[1])) if " and " in query else None
+        hits = [records[r] for r, refs in references.items()
+                if cited in refs and (allowed is None or r in allowed)]
+        for start in range(0, len(hits), size):
+            client.pages.append((query, fields, len(hits[start:start + size])))
+            yield hits[start:start + size]
+
+    def iter_literature(query, size=100, fields=None, **kwargs):
+        for hits in iter_literature_pages(query, size, fields):
+            yield from hits
+
+    client.iter_literature_pages.side_effect = iter_literature_pages
+    client.iter_literature.side_effect = iter_literature
+    return client
+
+
+class TestGraphCrawler(unittest.TestCase):
+    """GraphCrawler 和 crawl_graph 的测试。"""
+
+    def setUp(self):
+        """设置测试装置。"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.client = make_graph_client()
+
+    def tearDown(self):
+        """清理测试装置。"""
+        shutil.rmtree(self.temp_dir)
+
+    def read_edges(self, path):
+        with open(path, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        self.assertEqual(lines[0], "citing,cited")
+        return {tuple(line.split(",")) for line in lines[1:]}
+
+    def test_reference_ids(self):
+        """测试从 $ref 中提取记录 ID。"""
+        record = make_record("3")
+        record["metadata"]["references"].append({"reference": {"title": "未链接的参考文献"}})
+
+        self.assertEqual(reference_ids(record), ["4", "5"])
+
+    def test_references_breadth_first(self):
+        """测试按层扩展参考文献，边逐条写入文件，最后一层不请求 API。"""
+        edges_path = os.path.join(self.temp_dir, "edges.csv")
+        crawler = GraphCrawler(self.client, max_depth=2, directions=["references"], edges_path=edges_path)
+
+        summary = crawler.crawl(["1"])
+
+        self.assertEqual(summary["nodes"], {"1": 0, "2": 1, "3": 1, "4": 2, "5": 2})
+        self.assertEqual(self.read_edges(edges_path), {("1", "2"), ("1", "3"), ("2", "4"), ("3", "4"), ("3", "5")})
+        self.assertEqual(self.client.get_records.call_count, 2)
+        self.client.iter_literature.assert_not_called()
+
+    def test_citations_reuse_search_hits(self):
+        """测试引用搜索的结果直接作为下一层的记录，不再重复获取。"""
+        crawler = GraphCrawler(self.client, max_depth=2, directions=["citations"])
+
+        summary = crawler.crawl(["4"])
+
+        self.assertEqual(summary["nodes"], {"4": 0, "2": 1, "3": 1, "1": 2})
+        self.assertEqual(summary["edges"], 4)
+        self.assertEqual(self.client.get_records.call_count, 1)
+
+    def test_max_nodes_budget(self):
+        """测试达到 max_nodes 后停止加入新记录。"""
+        summary = GraphCrawler(self.client, max_depth=5, max_nodes=3).crawl(["1"])
+
+        self.assertEqual(len(summary["nodes"]), 3)
+        self.assertTrue(summary["truncated"])
+
+    def test_budget_keeps_edges_between_visited_nodes(self):
+        """测试达到 max_nodes 后继续翻页，引用记录中已访问的节点之间的边不会丢失。"""
+        crawler = GraphCrawler(self.client, max_depth=1, max_nodes=2, directions=["citations"])
+
+        # 4 的引用依次为 2 (超出预算) 和 3 (已访问的种子)
+        summary = crawler.crawl(["4", "3"])
+
+        self.assertEqual(summary["nodes"], {"4": 0, "3": 0})
+        self.assertTrue(summary["truncated"])
+        self.assertEqual(crawler.edges, {("3", "4")})
+
+    def test_budget_stops_paging_citations(self):
+        """测试达到 max_nodes 后不再翻页下载引用记录，只用一次过滤查询补全已访问节点之间的边。"""
+        # 100 被 1000..1049 引用；1049 同时是种子，排在引用结果的最后一页
+        references = {str(i): ["100"] for i in range(1000, 1050)}
+        references["100"] = []
+        records = {r: {"id": r, "metadata": {"control_number": int(r)}} for r in references}
+        client = make_graph_client(references, records)
+        crawler = GraphCrawler(client, max_depth=2, max_nodes=4, directions=["citations"], page_size=5)
+
+        summary = crawler.crawl(["100", "1049"])
+
+        self.assertTrue(summary["truncated"])
+        self.assertEqual(set(summary["nodes"]), {"100", "1049", "1000", "1001"})
+        self.assertEqual(crawler.edges, {("1000", "100"), ("1001", "100"), ("1049", "100")})
+        full_pages = [page for page in client.pages
+                      if page[0] == "refersto:recid:100" and page[1] == GraphCrawler.NODE_FIELDS]
+        self.assertEqual(len(full_pages), 1)
+        closing = [page for page in client.pages if " and " in page[0]]
+        self.assertTrue(all(fields == ["control_number"] for _, fields, _ in closing))
+        # 第一页的 5 条加上过滤查询返回的 3 个已访问节点，而不是全部 50 条引用
+        self.assertEqual(sum(count for _, _, count in client.pages), 5 + 3)
+
+    def test_cycle_visited_once(self):
+        """测试环中的记录只访问一次。"""
+        summary = GraphCrawler(self.client, max_depth=10).crawl(["1"])
+
+        self.assertEqual(set(summary["nodes"]), set(REFERENCES))
+        self.assertFalse(summary["truncated"])
+        self.assertEqual(summary["edges"], 6)
+
+    def test_download_discovered_records(self):
+        """测试下载所有访问到的记录，不逐条请求 API。"""
+        summary = crawl_graph(["1"], max_depth=1, directions=["references"], download=True,
+                              output_dir=self.temp_dir, client=self.client)
+
+        self.assertEqual(set(summary["downloads"]), {"1", "2", "3"})
+        for record_id in ("1", "2", "3"):
+            self.assertIsNone(summary["downloads"][record_id]["error"])
+            self.assertTrue(os.path.exists(os.path.join(self.temp_dir, f"{record_id}_metadata.json")))
+        self.client.get_record.assert_not_called()
+        self.assertEqual(self.client.download_file.call_count, 3)
+
+    def test_missing_seed(self):
+        """测试不存在的记录被记录为错误。"""
+        summary = GraphCrawler(self.client).crawl(["999"])
+
+        self.assertIn("999", summary["errors"])
+
+    @patch("inspirehep_downloader.client.InspireHEPClient")
+    def test_cli_graph(self, mock_client_class):
+        """测试命令行 --graph 写入默认的边文件。"""
+        mock_client_class.return_value = self.client
+
+        with patch("sys.stdout", io.StringIO()) as stdout:
+            code = main(["1", "--graph", "--direction", "references", "-o", self.temp_dir, "--progress", "none"])
+
+        self.assertEqual(code, 0)
+        self.assertEqual(self.read_edges(os.path.join(self.temp_dir, "graph_edges.csv")), {("1", "2"), ("1", "3")})
+        self.assertIn("访问 3 条记录", stdout.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
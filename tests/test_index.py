@@ -0,0 +1,167 @@
+"""
+本地元数据索引的单元测试。
+"""
+
+import unittest
+from unittest.mock import patch
+import io
+import json
+import os
+import tempfile
+import shutil
+from contextlib import redirect_stdout
+
+from inspirehep_downloader.index import MetadataIndex, DEFAULT_INDEX_FILENAME
+from inspirehep_downloader.downloader import download_metadata, download_record
+from inspirehep_downloader.cli import main
+from tests.helpers import make_mock_client
+
+
+def make_metadata(record_id, title, abstract="", authors=None, citations=0, date="2020-01-01", keywords=None):
+    """创建一条 extract_metadata 格式的元数据。"""
+    return {
+        "record_id": str(record_id),
+        "title": title,
+        "authors": authors or [],
+        "abstract": abstract,
+        "publication_date": date,
+        "arxiv_id": None,
+        "doi": None,
+        "citations": citations,
+        "keywords": keywords or [],
+        "inspire_url": f"https://inspirehep.net/literature/{record_id}",
+    }
+
+
+class TestMetadataIndex(unittest.TestCase):
+    """MetadataIndex 类的测试。"""
+
+    def setUp(self):
+        """设置测试装置。"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.index = MetadataIndex(self.temp_dir)
+        self.index.add(make_metadata(1, "Black hole entropy", "Counting microstates.", ["Strominger, A.", "Vafa, C."],
+                                     citations=3000, date="1996-01-09", keywords=["black hole"]))
+        self.index.add(make_metadata(2, "String theory dynamics", "Dualities and black holes in various dimensions.",
+                                     ["Witten, E."], citations=4000, date="1995-03-20"))
+        self.index.add(make_metadata(3, "Anti de Sitter space and holography", "Holographic correspondence.",
+                                     ["Witten, E."], citations=9000, date="1998-02-19"))
+
+    def tearDown(self):
+        """清理测试装置。"""
+        self.index.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_directory_path_uses_default_filename(self):
+        """测试传入目录时在其中创建索引文件。"""
+        self.assertEqual(self.index.path, os.path.join(self.temp_dir, DEFAULT_INDEX_FILENAME))
+        self.assertEqual(self.index.count(), 3)
+
+    def test_full_text_search(self):
+        """测试全文检索匹配标题、摘要和关键字。"""
+        ids = {row["record_id"] for row in self.index.search("black")}
+        self.assertEqual(ids, {"1", "2"})
+        self.assertEqual([row["record_id"] for row in self.index.search("holography")], ["3"])
+
+    def test_author_filter_and_citation_order(self):
+        """测试按作者过滤并按引用数排序。"""
+        rows = self.index.search(author="witten", order="citations")
+        self.assertEqual([row["record_id"] for row in rows], ["3", "2"])
+        self.assertEqual(rows[0]["authors"], ["Witten, E."])
+
+    def test_date_order_and_limit(self):
+        """测试按日期排序和结果数限制。"""
+        rows = self.index.search(order="date", limit=2)
+        self.assertEqual([row["record_id"] for row in rows], ["3", "1"])
+
+    def test_invalid_query_syntax_is_quoted(self):
+        """测试不合法的 FTS 语法退回到普通短语匹配。"""
+        rows = self.index.search('black "hole')
+        self.assertEqual({row["record_id"] for row in rows}, {"1", "2"})
+
+    def test_update_replaces_entry(self):
+        """测试重复添加同一记录时就地更新，而不是产生重复结果。"""
+        self.index.add(make_metadata(1, "Microscopic origin of entropy", authors=["Vafa, C."], citations=3100))
+
+        self.assertEqual(self.index.count(), 3)
+        self.assertEqual(self.index.search("microstates"), [])
+        self.assertEqual(self.index.search("microscopic")[0]["citations"], 3100)
+        self.assertEqual(self.index.search(author="strominger"), [])
+
+    def test_pdf_path_is_preserved(self):
+        """测试更新元数据时保留已记录的 PDF 路径。"""
+        self.index.set_pdf_path("2", "/tmp/2.pdf")
+        self.index.add(make_metadata(2, "String theory dynamics", citations=4001), metadata_path="/tmp/2.json")
+
+        row = next(r for r in self.index.search(order="citations") if r["record_id"] == "2")
+        self.assertEqual(row["pdf_path"], "/tmp/2.pdf")
+        self.assertEqual(row["metadata_path"], "/tmp/2.json")
+
+    def test_invalid_order(self):
+        """测试不支持的排序方式会引发 ValueError。"""
+        with self.assertRaises(ValueError):
+            self.index.search("black", order="random")
+
+    def test_add_many(self):
+        """测试在一个事务中批量写入，重复的记录就地更新。"""
+        count = self.index.add_many(make_metadata(i, f"Black brane {i}", citations=i) for i in range(3, 10))
+
+        self.assertEqual(count, 7)
+        self.assertEqual(self.index.count(), 9)
+        self.assertEqual(self.index.search("holography"), [])
+        self.assertEqual(len(self.index.search("brane")), 7)
+
+
+class TestIndexIntegration(unittest.TestCase):
+    """下载器和 CLI 与索引集成的测试。"""
+
+    def setUp(self):
+        """设置测试装置。"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.index_path = os.path.join(self.temp_dir, "index.sqlite")
+
+    def tearDown(self):
+        """清理测试装置。"""
+        shutil.rmtree(self.temp_dir)
+
+    def test_downloads_update_index(self):
+        """测试下载元数据和 PDF 时逐条更新索引。"""
+        record = {"metadata": {"control_number": 7, "titles": [{"title": "Gauge theory"}],
+                               "arxiv_eprints": [{"value": "2301.00007"}]}}
+        client = make_mock_client({"7": record})
+
+        with MetadataIndex(self.index_path) as index:
+            download_metadata("7", self.temp_dir, client=client, record=record, index=index)
+            download_record("7", self.temp_dir, client=client, record=record, index=index)
+            rows = index.search("gauge")
+
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["metadata_path"], os.path.join(self.temp_dir, "7_metadata.json"))
+        self.assertEqual(rows[0]["pdf_path"], os.path.join(self.temp_dir, "7.pdf"))
+
+    def test_query_subcommand(self):
+        """测试 query 子命令离线检索并输出 JSON Lines。"""
+        with MetadataIndex(self.index_path) as index:
+            index.add(make_metadata(1, "Black hole entropy", authors=["Strominger, A."]))
+            index.add(make_metadata(2, "Conformal field theory"))
+
+        out = io.StringIO()
+        with redirect_stdout(out):
+            code = main(["query", "black", "--index", self.index_path, "--json"])
+
+        self.assertEqual(code, 0)
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual([row["record_id"] for row in rows], ["1"])
+        self.assertEqual(rows[0]["authors"], ["Strominger, A."])
+
+    def test_query_missing_index(self):
+        """测试索引不存在时 query 子命令返回错误码且不创建文件。"""
+        with redirect_stdout(io.StringIO()), patch("sys.stderr", io.StringIO()):
+            code = main(["query", "black", "--index", self.index_path])
+
+        self.assertEqual(code, 1)
+        self.assertFalse(os.path.exists(self.index_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+"""
+JSON 后端和延迟解码的单元测试。
+"""
+
+import unittest
+from unittest.mock import Mock, patch
+import io
+import json
+
+from inspirehep_downloader import jsonlib
+from inspirehep_downloader.jsonlib import get_backend, set_default_backend
+from inspirehep_downloader.client import InspireHEPClient
+from inspirehep_downloader.dump import iter_json_values
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+DOCUMENT = {"id": "1", "metadata": {"titles": [{"title": "Étude des trous noirs"}], "citation_count": 3,
+                                    "authors": [], "keywords": [{"value": "黑洞"}], "ratio": 0.5, "deleted": False}}
+
+
+class TestJSONBackend(unittest.TestCase):
+    """get_backend 和各个后端的测试。"""
+
+    def test_stdlib_backend(self):
+        """测试标准库后端的缩进输出与 json.dumps 相同，并保留非 ASCII 字符。"""
+        backend = get_backend("json")
+
+        self.assertEqual(backend.dumpb(DOCUMENT, indent=True).decode("utf-8"),
+                         json.dumps(DOCUMENT, indent=2, ensure_ascii=False))
+        self.assertIn("黑洞", backend.dumps(DOCUMENT))
+        self.assertEqual(backend.loads(backend.dumpb(DOCUMENT)), DOCUMENT)
+        self.assertIs(get_backend("json"), backend)
+
+    @unittest.skipIf(orjson is None, "需要 orjson")
+    def test_orjson_backend_matches_stdlib(self):
+        """测试 orjson 后端解码和编码的结果与标准库相同。"""
+        backend = get_backend("orjson")
+        body = json.dumps(DOCUMENT).encode("utf-8")
+
+        self.assertEqual(backend.loads(body), DOCUMENT)
+        self.assertEqual(json.loads(backend.dumps(DOCUMENT)), DOCUMENT)
+        self.assertEqual(json.loads(backend.dumpb(DOCUMENT, indent=True)), DOCUMENT)
+        self.assertIs(get_backend("auto"), backend)
+
+        response = Mock(content=body)
+        self.assertEqual(backend.decode_response(response), DOCUMENT)
+        response.json.assert_not_called()
+
+    def test_auto_falls_back_to_stdlib(self):
+        """测试未安装 orjson 时 auto 使用标准库，明确要求 orjson 时报错。"""
+        with patch.dict(jsonlib._backends, clear=True), \
+                patch.object(jsonlib, "_import_orjson", side_effect=ImportError("需要 orjson")):
+            self.assertEqual(get_backend("auto").name, "json")
+            with self.assertRaises(ImportError):
+                get_backend("orjson")
+
+    def test_invalid_backend(self):
+        """测试不支持的后端名称引发 ValueError，且不改变默认后端。"""
+        default = get_backend()
+        with self.assertRaises(ValueError):
+            set_default_backend("simdjson")
+        self.assertIs(get_backend(), default)
+
+    def test_default_backend(self):
+        """测试 set_default_backend 改变 get_backend() 和新客户端使用的后端。"""
+        try:
+            set_default_backend("json")
+            self.assertEqual(get_backend().name, "json")
+            self.assertEqual(InspireHEPClient().json_backend.name, "json")
+        finally:
+            set_default_backend("auto")
+
+    def test_dump_parsing_is_backend_independent(self):
+        """测试两种后端流式解析导出文件的结果相同，包括多行和同一行上的多个值。"""
+        text = '{"a": 1}\n{\n  "b": [1,\n 2]\n}\n{"c": 3} {"d": 4}\n12\n"x"\n'
+        expected = [{"a": 1}, {"b": [1, 2]}, {"c": 3}, {"d": 4}, 12, "x"]
+
+        for backend in {get_backend("json"), get_backend()}:
+            self.assertEqual(list(iter_json_values(io.StringIO(text), read_size=5, backend=backend)), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
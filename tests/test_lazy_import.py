@@ -0,0 +1,76 @@
+"""
+包和命令行延迟导入的单元测试。
+"""
+
+import unittest
+import os
+import subprocess
+import sys
+
+import inspirehep_downloader
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_python(code, *args):
+    """在新的解释器中运行代码，返回 (退出码, 标准输出)。"""
+    completed = subprocess.run([sys.executable, "-c", code, *args], cwd=ROOT, capture_output=True, text=True)
+    return completed.returncode, completed.stdout
+
+
+class TestLazyImport(unittest.TestCase):
+    """包入口延迟加载的测试。"""
+
+    def test_import_does_not_load_heavy_dependencies(self):
+        """测试导入包和命令行模块不会加载 requests、aiohttp 或 pyarrow。"""
+        code, out = run_python(
+            "import sys, inspirehep_downloader, inspirehep_downloader.cli\n"
+            "print(sorted(m for m in ('requests', 'aiohttp', 'pyarrow', 'zstandard') if m in sys.modules))"
+        )
+
+        self.assertEqual(code, 0)
+        self.assertEqual(out.strip(), "[]")
+
+    def test_help_does_not_load_requests(self):
+        """测试 --help 不加载网络栈。"""
+        code, out = run_python(
+            "import sys\n"
+            "from inspirehep_downloader.cli import main\n"
+            "try:\n"
+            "    main(['--help'])\n"
+            "except SystemExit:\n"
+            "    pass\n"
+            "print('requests' in sys.modules)"
+        )
+
+        self.assertEqual(code, 0)
+        self.assertIn("--chunk-size-kb", out)
+        self.assertTrue(out.strip().endswith("False"))
+
+    def test_async_client_does_not_load_requests(self):
+        """测试异步客户端模块不依赖同步客户端的 requests。"""
+        code, out = run_python(
+            "import sys\n"
+            "from inspirehep_downloader.async_client import AsyncInspireHEPClient\n"
+            "print('requests' in sys.modules)"
+        )
+
+        self.assertEqual(code, 0)
+        self.assertEqual(out.strip(), "False")
+
+    def test_exports_resolve_on_access(self):
+        """测试 __all__ 中的每个名称都可以访问，并缓存到模块中。"""
+        for name in inspirehep_downloader.__all__:
+            self.assertIsNotNone(getattr(inspirehep_downloader, name))
+        self.assertIn("InspireHEPClient", vars(inspirehep_downloader))
+        self.assertIn("BulkDownloader", dir(inspirehep_downloader))
+
+    def test_unknown_attribute(self):
+        """测试访问不存在的名称时抛出 AttributeError。"""
+        with self.assertRaises(AttributeError):
+            inspirehep_downloader.no_such_name
+
+
+if __name__ == "__main__":
+    unittest.main()
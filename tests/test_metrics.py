@@ -0,0 +1,152 @@
+"""
+指标收集的单元测试。
+"""
+
+import unittest
+from unittest.mock import Mock, patch
+import io
+import os
+import tempfile
+import shutil
+import threading
+
+from inspirehep_downloader.metrics import MetricsCollector, Histogram
+from inspirehep_downloader.client import InspireHEPClient
+from inspirehep_downloader.cache import RecordCache
+from inspirehep_downloader.scheduler import RequestScheduler
+from inspirehep_downloader.cli import main
+from tests.helpers import ThreadingHTTPServer, StubInspireHandler, PDF_BODY
+
+
+class TestMetricsCollector(unittest.TestCase):
+    """MetricsCollector 和 Histogram 的测试。"""
+
+    def test_histogram_quantiles(self):
+        """测试用桶上界估计分位数。"""
+        histogram = Histogram(buckets=(0.01, 0.1, 1.0))
+        for value in [0.005] * 90 + [0.5] * 10:
+            histogram.observe(value)
+
+        self.assertEqual(histogram.quantile(0.5), 0.01)
+        self.assertEqual(histogram.quantile(0.95), 0.5)
+        self.assertEqual(histogram.count, 100)
+
+    def test_prometheus_format(self):
+        """测试 Prometheus 文本格式的直方图是累积的，计数器带有类型说明。"""
+        metrics = MetricsCollector(buckets=(0.1, 1.0))
+        metrics.observe("request", 0.05)
+        metrics.observe("request", 0.5)
+        metrics.observe("request", 5.0)
+        metrics.inc("retries_total", 2)
+
+        text = metrics.to_prometheus()
+
+        self.assertIn('inspirehep_stage_seconds_bucket{stage="request",le="0.1"} 1', text)
+        self.assertIn('inspirehep_stage_seconds_bucket{stage="request",le="1"} 2', text)
+        self.assertIn('inspirehep_stage_seconds_bucket{stage="request",le="+Inf"} 3', text)
+        self.assertIn('inspirehep_stage_seconds_count{stage="request"} 3', text)
+        self.assertIn("# TYPE inspirehep_retries_total counter\ninspirehep_retries_total 2", text)
+
+    def test_summary_lists_stages_and_nonzero_counters(self):
+        """测试摘要包含各阶段和非零计数器。"""
+        metrics = MetricsCollector()
+        with metrics.time("json_parse"):
+            pass
+        metrics.inc("cache_hits_total")
+
+        summary = metrics.summary()
+
+        self.assertIn("json_parse", summary)
+        self.assertIn("cache_hits_total", summary)
+        self.assertNotIn("retries_total", summary)
+
+    def test_scheduler_counts_retries(self):
+        """测试调度器记录请求数和重试次数。"""
+        metrics = MetricsCollector()
+        session = Mock()
+        failure, success = Mock(status_code=503, headers={}), Mock(status_code=200, headers={})
+        session.get.side_effect = [failure, success]
+        scheduler = RequestScheduler(rates={}, backoff_base=0)
+
+        scheduler.get(session, "https://example.com/", metrics=metrics)
+
+        self.assertEqual(metrics.counters["requests_total"], 2)
+        self.assertEqual(metrics.counters["retries_total"], 1)
+
+
+class TestClientMetrics(unittest.TestCase):
+    """客户端和 CLI 针对本地 HTTP 服务器记录指标的测试。"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), StubInspireHandler)
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        """设置测试装置。"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.metrics = MetricsCollector()
+
+    def tearDown(self):
+        """清理测试装置。"""
+        shutil.rmtree(self.temp_dir)
+
+    def make_client(self, **kwargs):
+        client = InspireHEPClient(scheduler=RequestScheduler(rates={}), metrics=self.metrics, **kwargs)
+        client.BASE_URL = f"{self.base_url}/api"
+        return client
+
+    def test_api_and_download_stages(self):
+        """测试 API 请求和文件下载记录各阶段耗时与字节数。"""
+        client = self.make_client()
+
+        client.get_record("12345")
+        client.download_file(f"{self.base_url}/files/paper.pdf", os.path.join(self.temp_dir, "paper.pdf"))
+
+        stages = self.metrics.histograms
+        for stage in ("request", "ttfb", "json_parse", "body_transfer", "disk_write"):
+            self.assertIn(stage, stages)
+        self.assertEqual(stages["ttfb"].count, 2)
+        self.assertEqual(self.metrics.counters["requests_total"], 2)
+        self.assertEqual(self.metrics.counters["bytes_written_total"], len(PDF_BODY))
+        self.assertGreater(self.metrics.counters["bytes_downloaded_total"], len(PDF_BODY))
+
+    def test_cache_hits_and_misses(self):
+        """测试缓存命中和未命中计数。"""
+        cache = RecordCache(self.temp_dir)
+        client = self.make_client(cache=cache)
+
+        client.get_record("12345")
+        client.get_record("12345")
+        cache.close()
+
+        self.assertEqual(self.metrics.counters["cache_misses_total"], 1)
+        self.assertEqual(self.metrics.counters["cache_hits_total"], 1)
+        self.assertEqual(self.metrics.counters["requests_total"], 1)
+
+    def test_cli_writes_prometheus_file(self):
+        """测试 --metrics 在运行结束时写入 Prometheus 文本文件并打印摘要。"""
+        path = os.path.join(self.temp_dir, "metrics", "inspirehep.prom")
+        stderr = io.StringIO()
+
+        with patch.object(InspireHEPClient, "BASE_URL", f"{self.base_url}/api"), \
+                patch("sys.stdout", io.StringIO()), patch("sys.stderr", stderr):
+            code = main(["12345", "--metadata-only", "-o", self.temp_dir, "--metrics", path])
+
+        self.assertEqual(code, 0)
+        with open(path, encoding="utf-8") as f:
+            text = f.read()
+        self.assertIn('inspirehep_stage_seconds_count{stage="request"} 1', text)
+        self.assertIn('inspirehep_stage_seconds_count{stage="disk_write"} 1', text)
+        self.assertIn("阶段耗时", stderr.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
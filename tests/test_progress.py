@@ -0,0 +1,167 @@
+"""
+进度报告的单元测试。
+"""
+
+import unittest
+import io
+import json
+import os
+import tempfile
+import shutil
+import threading
+from contextlib import redirect_stdout
+
+from inspirehep_downloader.progress import make_progress, echo, JSONProgress, TTYProgress, NullProgress, _AggregateProgress
+from inspirehep_downloader.client import InspireHEPClient
+from inspirehep_downloader.scheduler import RequestScheduler
+from inspirehep_downloader.bulk import download_records
+from tests.helpers import make_mock_client
+from tests.helpers import ThreadingHTTPServer, StubInspireHandler, PDF_BODY
+
+
+def read_events(stream):
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+class TestProgressReporters(unittest.TestCase):
+    """进度报告器的测试。"""
+
+    def test_auto_is_quiet_without_tty(self):
+        """测试 auto 模式在非 TTY 输出上不报告进度。"""
+        self.assertIsInstance(make_progress("auto", io.StringIO()), NullProgress)
+        with self.assertRaises(ValueError):
+            make_progress("verbose")
+
+    def test_json_events(self):
+        """测试 JSON 报告器输出记录事件和带计数的最终事件。"""
+        stream = io.StringIO()
+        progress = JSONProgress(stream, interval=3600)
+        progress.add_total(3)
+        for record_id in ("1", "2", "3"):
+            progress.record_started(record_id)
+        progress.record_finished("1", True)
+        progress.record_finished("2", False)
+        progress.file_started("a.pdf", 100)
+        progress.file_progress("a.pdf", 100)
+        progress.close()
+
+        events = read_events(stream)
+        self.assertEqual([e["event"] for e in events], ["record", "record", "done"])
+        self.assertEqual(events[1], dict(events[1], record_id="2", ok=False))
+        done = events[-1]
+        self.assertEqual((done["completed"], done["failed"], done["in_flight"], done["total"]), (1, 1, 1, 3))
+        self.assertEqual(done["bytes"], 100)
+
+    def test_updates_are_throttled(self):
+        """测试汇总状态按间隔输出，而不是每个数据块都输出。"""
+        stream = io.StringIO()
+        progress = JSONProgress(stream, interval=3600)
+        for _ in range(1000):
+            progress.file_progress("a.pdf", 1024)
+
+        self.assertEqual(stream.getvalue(), "")
+
+    def test_tty_line(self):
+        """测试 TTY 报告器用 \\r 刷新同一行并在结束时换行。"""
+        stream = io.StringIO()
+        progress = TTYProgress(stream, interval=0)
+        progress.add_total(2)
+        progress.record_started("1")
+        progress.record_finished("1", True)
+        progress.close()
+
+        output = stream.getvalue()
+        self.assertTrue(output.startswith("\r"))
+        self.assertIn("完成 1/2", output)
+        self.assertTrue(output.endswith("\n"))
+
+    def test_tty_messages_do_not_garble_line(self):
+        """测试状态消息打印前清除进度行、打印后重绘，结束后不再重绘。"""
+        stream = io.StringIO()
+        stdout = io.StringIO()
+        progress = TTYProgress(stream, interval=0)
+        progress.add_total(2)
+        progress.record_started("1")
+        line = stream.getvalue()
+
+        with redirect_stdout(stdout):
+            echo(progress, "PDF 已保存到 1.pdf")
+            self.assertEqual(stream.getvalue(), line + "\r\x1b[K" + line)
+            progress.record_finished("1", True)
+            progress.close()
+            after_close = stream.getvalue()
+            echo(progress, "完成")
+
+        self.assertEqual(stdout.getvalue(), "PDF 已保存到 1.pdf\n完成\n")
+        self.assertEqual(stream.getvalue(), after_close)
+
+    def test_aggregate_progress_is_abstract(self):
+        """测试没有实现 _emit 的汇总报告器不能实例化。"""
+        with self.assertRaises(TypeError):
+            _AggregateProgress(io.StringIO())
+
+    def test_tty_silent_when_nothing_happened(self):
+        """测试没有任何下载时 TTY 报告器不输出空行。"""
+        stream = io.StringIO()
+        TTYProgress(stream).close()
+        self.assertEqual(stream.getvalue(), "")
+
+
+class TestProgressIntegration(unittest.TestCase):
+    """客户端和批量下载器报告进度的测试。"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), StubInspireHandler)
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        """设置测试装置。"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.stream = io.StringIO()
+        self.progress = JSONProgress(self.stream, interval=0)
+
+    def tearDown(self):
+        """清理测试装置。"""
+        shutil.rmtree(self.temp_dir)
+
+    def test_download_file_reports_bytes(self):
+        """测试 download_file 在数据块循环中报告字节数。"""
+        client = InspireHEPClient(scheduler=RequestScheduler(rates={}), chunk_size=16 * 1024,
+                                  progress=self.progress)
+        output_path = os.path.join(self.temp_dir, "paper.pdf")
+
+        client.download_file(f"{self.base_url}/files/paper.pdf", output_path)
+        self.progress.close()
+
+        events = read_events(self.stream)
+        self.assertIn({"event": "file", "path": output_path, "ok": True},
+                      [{k: v for k, v in e.items() if k != "time"} for e in events])
+        self.assertGreater(len([e for e in events if e["event"] == "progress"]), 1)
+        self.assertEqual(events[-1]["bytes"], len(PDF_BODY))
+        self.assertEqual(events[-1]["bytes_total"], len(PDF_BODY))
+
+    def test_bulk_reports_records(self):
+        """测试批量下载报告每条记录的完成情况。"""
+        records = {str(i): {"id": str(i), "metadata": {"titles": [{"title": f"Paper {i}"}]}} for i in range(5)}
+        client = make_mock_client(records)
+        client.progress = self.progress
+
+        download_records(list(records) + ["missing"], self.temp_dir, download_pdf_flag=False, client=client)
+        self.progress.close()
+
+        events = read_events(self.stream)
+        self.assertEqual(len([e for e in events if e["event"] == "record"]), 6)
+        done = events[-1]
+        self.assertEqual((done["completed"], done["failed"], done["in_flight"], done["total"]), (5, 1, 0, 6))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,151 @@
+"""
+紧凑元数据记录类型的单元测试。
+"""
+
+import unittest
+from unittest.mock import patch
+import json
+import os
+import pickle
+import sys
+import tempfile
+import shutil
+
+from inspirehep_downloader.client import InspireHEPClient
+from inspirehep_downloader.records import MetadataRecord, extract_records
+from inspirehep_downloader.downloader import download_metadata
+from inspirehep_downloader.export import JSONLinesWriter, CSVTableWriter
+from inspirehep_downloader.sources import record_sources
+
+
+def make_hit(record_id):
+    """创建一条包含全部元数据字段的原始搜索结果。"""
+    return {"id": str(record_id), "metadata": {
+        "control_number": record_id,
+        "titles": [{"title": f"Paper {record_id}"}],
+        "authors": [{"full_name": "Witten, Edward"}, {"full_name": "Maldacena, Juan"}],
+        "abstracts": [{"value": "An abstract."}],
+        "preprint_date": "2020-01-01",
+        "arxiv_eprints": [{"value": f"2001.{record_id:05d}"}],
+        "dois": [{"value": f"10.1000/{record_id}"}],
+        "citation_count": record_id,
+        "keywords": [{"value": "holography"}],
+    }}
+
+
+class TestMetadataRecord(unittest.TestCase):
+    """MetadataRecord 和 extract_records 的测试。"""
+
+    def setUp(self):
+        """设置测试装置。"""
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """清理测试装置。"""
+        shutil.rmtree(self.temp_dir)
+
+    def test_matches_extract_metadata(self):
+        """测试提取结果与 extract_metadata 相同，并可像字典一样访问。"""
+        hit = make_hit(7)
+        expected = InspireHEPClient.extract_metadata(hit)
+
+        record = MetadataRecord.from_hit(hit)
+
+        self.assertEqual(record, expected)
+        self.assertEqual(record.to_dict(), expected)
+        self.assertEqual(list(record), list(expected))
+        self.assertEqual(record["inspire_url"], "https://inspirehep.net/literature/7")
+        self.assertIsNone(record.get("pdf_url"))
+        with self.assertRaises(KeyError):
+            record["references"]
+
+    def test_missing_and_empty_fields(self):
+        """测试缺失或为空列表的字段取默认值。"""
+        hit = {"metadata": {"control_number": 3, "titles": [], "dois": []}}
+
+        record = MetadataRecord.from_hit(hit)
+
+        self.assertEqual(record["record_id"], "3")
+        self.assertEqual(record["title"], "N/A")
+        self.assertEqual(record["doi"], "N/A")
+        self.assertEqual(record["publication_date"], "N/A")
+        self.assertEqual(record["authors"], [])
+
+    def test_client_helpers_share_extraction(self):
+        """测试客户端的提取函数和来源收集与 MetadataRecord 使用同一实现，空列表不会引发异常。"""
+        hit = {"id": "4", "metadata": {"titles": [], "abstracts": [], "publication_info": [],
+                                       "documents": [{"key": "a.pdf"}, {"key": "b.pdf", "url": "https://x.org/b.pdf"}],
+                                       "arxiv_eprints": [{"value": "hep-th/9711200"}]}}
+
+        metadata = InspireHEPClient.extract_metadata(hit)
+
+        self.assertEqual(metadata, MetadataRecord.from_hit(hit))
+        self.assertEqual((metadata["title"], metadata["abstract"]), ("N/A", "N/A"))
+        self.assertEqual(InspireHEPClient.extract_pdf_url(hit), "https://x.org/b.pdf")
+        self.assertEqual([s.url for s in record_sources(hit)], [
+            "https://x.org/b.pdf",
+            "https://arxiv.org/pdf/hep-th/9711200.pdf",
+            "https://export.arxiv.org/pdf/hep-th/9711200.pdf",
+        ])
+
+    def test_pdf_url(self):
+        """测试提取 PDF URL 时 pdf_url 键出现，即使没有 PDF。"""
+        with_pdf = MetadataRecord.from_hit(make_hit(1), pdf_url=True)
+        without_pdf = MetadataRecord.from_hit({"id": "2", "metadata": {}}, pdf_url=True)
+
+        self.assertEqual(with_pdf["pdf_url"], "https://arxiv.org/pdf/2001.00001.pdf")
+        self.assertIn("pdf_url", without_pdf)
+        self.assertIsNone(without_pdf["pdf_url"])
+        self.assertEqual(len(without_pdf), len(MetadataRecord.FIELDS) + 1)
+        self.assertEqual(pickle.loads(pickle.dumps(without_pdf)).to_dict(), without_pdf.to_dict())
+
+    def test_compact_storage(self):
+        """测试记录没有实例字典，占用小于等价的字典，且作者字符串被驻留。"""
+        records = extract_records([make_hit(1), make_hit(2)])
+        metadata = InspireHEPClient.extract_metadata(make_hit(1))
+
+        self.assertEqual([r.record_id for r in records], ["1", "2"])
+        self.assertFalse(hasattr(records[0], "__dict__"))
+        self.assertLess(sys.getsizeof(records[0]), sys.getsizeof(metadata))
+        self.assertIs(records[0].authors[0], records[1].authors[0])
+
+    def test_download_metadata_and_writers_accept_record(self):
+        """测试 download_metadata 和导出写入器接受 MetadataRecord，不请求 API。"""
+        record = MetadataRecord.from_hit(make_hit(5))
+
+        with patch.object(InspireHEPClient, "get_record") as mock_get_record:
+            path = download_metadata("5", self.temp_dir, record=record)
+            mock_get_record.assert_not_called()
+        with open(path, encoding="utf-8") as f:
+            self.assertEqual(json.load(f), record.to_dict())
+
+        jsonl_path = os.path.join(self.temp_dir, "out.jsonl")
+        csv_path = os.path.join(self.temp_dir, "out.csv")
+        with JSONLinesWriter(jsonl_path) as writer:
+            writer.write(record)
+        with CSVTableWriter(csv_path) as writer:
+            writer.write(record)
+        with open(jsonl_path, encoding="utf-8") as f:
+            self.assertEqual(json.loads(f.read()), record.to_dict())
+        with open(csv_path, encoding="utf-8") as f:
+            self.assertIn("Witten, Edward; Maldacena, Juan", f.read())
+
+    def test_iter_literature_records(self):
+        """测试按页遍历搜索结果并逐条产出 MetadataRecord。"""
+        client = InspireHEPClient()
+
+        def search_literature(query, size=10, page=1, fields=None):
+            ids = range((page - 1) * size + 1, min(page * size, 25) + 1)
+            return {"hits": {"hits": [make_hit(i) for i in ids], "total": 25}}
+
+        with patch.object(client, "search_literature", side_effect=search_literature) as mock_search:
+            records = list(client.iter_literature_records("a witten", size=10, limit=15, pdf_url=True))
+
+        self.assertEqual([r.record_id for r in records], [str(i) for i in range(1, 16)])
+        self.assertTrue(all(isinstance(r, MetadataRecord) for r in records))
+        self.assertEqual(records[0]["pdf_url"], "https://arxiv.org/pdf/2001.00001.pdf")
+        self.assertEqual(mock_search.call_args.kwargs["fields"], client.RECORD_FIELDS)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,151 @@
+"""
+请求调度器的单元测试。
+"""
+
+import unittest
+from unittest.mock import Mock, patch
+import requests
+
+from inspirehep_downloader.client import InspireHEPClient
+from inspirehep_downloader.scheduler import RequestScheduler, TokenBucket
+
+
+class FakeClock:
+    """替代 time.monotonic 和 time.sleep 的假时钟。"""
+    
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+    
+    def monotonic(self):
+        return self.now
+    
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def make_response(status_code, headers=None):
+    """创建模拟的 HTTP 响应。"""
+    response = Mock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    return response
+
+
+class TestRequestScheduler(unittest.TestCase):
+    """RequestScheduler 类的测试。"""
+    
+    def setUp(self):
+        """设置测试装置。"""
+        self.clock = FakeClock()
+        patcher = patch.multiple("inspirehep_downloader.scheduler.time",
+                                 monotonic=self.clock.monotonic, sleep=self.clock.sleep)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.session = Mock()
+    
+    def test_retries_transient_status(self):
+        """测试遇到 5xx 时重试直到成功。"""
+        self.session.get.side_effect = [make_response(502), make_response(503), make_response(200)]
+        scheduler = RequestScheduler(rates={})
+        
+        response = scheduler.get(self.session, "https://example.com/x", timeout=5)
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.session.get.call_count, 3)
+        self.assertEqual(len(self.clock.sleeps), 2)
+        self.session.get.assert_called_with("https://example.com/x", timeout=5)
+    
+    def test_honours_retry_after(self):
+        """测试 429 时遵守 Retry-After 头。"""
+        self.session.get.side_effect = [make_response(429, {"Retry-After": "7"}), make_response(200)]
+        scheduler = RequestScheduler(rates={})
+        
+        scheduler.get(self.session, "https://example.com/x")
+        
+        self.assertEqual(self.clock.sleeps, [7.0])
+    
+    def test_long_retry_after_not_honoured(self):
+        """测试 Retry-After 超过 backoff_max 时不等待也不暂停主机，直接返回该响应。"""
+        self.session.get.side_effect = [make_response(429, {"Retry-After": "86400"}), make_response(200)]
+        scheduler = RequestScheduler(rates={"example.com": 100.0}, backoff_max=60)
+        
+        response = scheduler.get(self.session, "https://example.com/x")
+        
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(self.session.get.call_count, 1)
+        self.assertEqual(self.clock.sleeps, [])
+        self.assertEqual(scheduler._bucket("example.com")._paused_until, 0)
+        
+        self.session.get.side_effect = [make_response(503, {"Retry-After": "Fri, 31 Dec 2999 23:59:59 GMT"})]
+        self.assertEqual(scheduler.get(self.session, "https://example.com/x").status_code, 503)
+        self.assertEqual(self.clock.sleeps, [])
+    
+    def test_retry_budget_exhausted(self):
+        """测试重试用尽后返回最后一次的错误响应。"""
+        self.session.get.return_value = make_response(503)
+        scheduler = RequestScheduler(rates={}, max_retries=2)
+        
+        response = scheduler.get(self.session, "https://example.com/x")
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(self.session.get.call_count, 3)
+        
+        scheduler.get(self.session, "https://example.com/x", retries=0)
+        self.assertEqual(self.session.get.call_count, 4)
+    
+    def test_connection_errors(self):
+        """测试连接错误会重试，用尽后抛出。"""
+        self.session.get.side_effect = requests.exceptions.ConnectionError("reset")
+        scheduler = RequestScheduler(rates={}, max_retries=1)
+        
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            scheduler.get(self.session, "https://example.com/x")
+        self.assertEqual(self.session.get.call_count, 2)
+    
+    def test_client_errors_not_retried(self):
+        """测试 404 之类的错误不重试。"""
+        self.session.get.return_value = make_response(404)
+        scheduler = RequestScheduler(rates={})
+        
+        scheduler.get(self.session, "https://example.com/x")
+        
+        self.session.get.assert_called_once()
+    
+    def test_rate_limit_per_host(self):
+        """测试同一主机的请求按令牌桶限速，其他主机不受影响。"""
+        self.session.get.return_value = make_response(200)
+        scheduler = RequestScheduler(rates={"inspirehep.net": 2.0})
+        
+        for _ in range(6):
+            scheduler.get(self.session, "https://inspirehep.net/api/literature/1")
+        for _ in range(6):
+            scheduler.get(self.session, "https://arxiv.org/pdf/1.pdf")
+        
+        # 2 个突发令牌之后，每个请求等待 0.5 秒
+        self.assertAlmostEqual(self.clock.now, 2.0)
+    
+    def test_token_bucket_pause(self):
+        """测试暂停令牌桶。"""
+        bucket = TokenBucket(rate=10)
+        bucket.pause(3)
+        
+        bucket.acquire()
+        
+        self.assertGreaterEqual(self.clock.now, 3)
+    
+    @patch('inspirehep_downloader.client.requests.Session.get')
+    def test_client_uses_scheduler(self, mock_get):
+        """测试客户端通过调度器重试 API 请求。"""
+        ok = make_response(200)
+        ok.content = b'{"id": "12345"}'
+        ok.json.return_value = {"id": "12345"}
+        mock_get.side_effect = [make_response(502), ok]
+        client = InspireHEPClient(scheduler=RequestScheduler(rates={}))
+        
+        self.assertEqual(client.get_record("12345"), {"id": "12345"})
+        self.assertEqual(mock_get.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,228 @@
+"""
+多来源 PDF 解析和对冲下载的测试。
+"""
+
+import unittest
+from unittest.mock import Mock, patch
+import os
+import tempfile
+import shutil
+import threading
+import time
+import requests
+
+from inspirehep_downloader.client import InspireHEPClient
+from inspirehep_downloader.scheduler import RequestScheduler
+from inspirehep_downloader.metrics import MetricsCollector
+from inspirehep_downloader.store import BlobStore
+from inspirehep_downloader.cache import RecordCache
+from inspirehep_downloader.downloader import download_pdf
+from inspirehep_downloader.sources import HostStats, PdfResolver, PdfSource, host_of, open_access_sources, record_sources
+from tests.helpers import ThreadingHTTPServer, StubInspireHandler, PDF_BODY
+
+
+class PdfHostHandler(StubInspireHandler):
+    """PDF 主机：/slow.pdf 延迟响应，/page.pdf 返回 HTML 页面，其他路径与 StubInspireHandler 相同。"""
+
+    delay = 1.5
+
+    def do_GET(self):
+        if self.path == "/slow.pdf":
+            time.sleep(self.delay)
+            self._send(200, PDF_BODY, "application/pdf")
+        elif self.path == "/page.pdf":
+            self._send(200, b"<html>login</html>", "text/html; charset=utf-8")
+        else:
+            super().do_GET()
+
+
+def make_record(urls):
+    """创建一条以 documents 列出给定 PDF URL 的记录。"""
+    return {"id": "1", "metadata": {"documents": [{"key": f"{i}.pdf", "url": url} for i, url in enumerate(urls)]}}
+
+
+class TestSourceCollection(unittest.TestCase):
+    """record_sources、open_access_sources 和 HostStats 的测试。"""
+
+    def test_record_sources(self):
+        """测试按优先级收集文档、arXiv、镜像和 urls 中的 PDF 链接，并去重。"""
+        record = {"metadata": {
+            "documents": [{"key": "a.pdf", "url": "https://inspirehep.net/files/a.pdf"},
+                          {"key": "a.tex", "url": "https://inspirehep.net/files/a.tex"}],
+            "arxiv_eprints": [{"value": "2301.00001"}],
+            "urls": [{"value": "https://example.org/paper.PDF"}, {"value": "https://example.org/landing"},
+                     {"value": "https://inspirehep.net/files/a.pdf"}],
+        }}
+
+        self.assertEqual([(s.kind, s.url) for s in record_sources(record)], [
+            ("document", "https://inspirehep.net/files/a.pdf"),
+            ("arxiv", "https://arxiv.org/pdf/2301.00001.pdf"),
+            ("arxiv_mirror", "https://export.arxiv.org/pdf/2301.00001.pdf"),
+            ("url", "https://example.org/paper.PDF"),
+        ])
+        self.assertEqual(len(record_sources(record, arxiv_mirror=False)), 3)
+
+    def test_open_access_sources(self):
+        """测试从 Unpaywall 响应中提取开放获取的 PDF 链接。"""
+        client = InspireHEPClient()
+        data = {"best_oa_location": {"url_for_pdf": "https://repo.example.org/1.pdf"},
+                "oa_locations": [{"url_for_pdf": "https://repo.example.org/1.pdf"}, {"url_for_pdf": None},
+                                 {"url_for_pdf": "https://mirror.example.org/1.pdf"}]}
+
+        with patch.object(client, "get_external_json", return_value=data) as mock_get_json:
+            sources = open_access_sources(client, "10.1000/a b", "me@example.org")
+
+        self.assertEqual([s.url for s in sources], ["https://repo.example.org/1.pdf", "https://mirror.example.org/1.pdf"])
+        self.assertEqual(mock_get_json.call_args.args, ("https://api.unpaywall.org/v2/10.1000/a%20b",
+                                                        {"email": "me@example.org"}))
+
+    def test_open_access_bypasses_record_cache_and_metrics(self):
+        """测试 Unpaywall 响应不写入记录缓存，也不计入 INSPIRE API 的指标。"""
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        metrics = MetricsCollector()
+        client = InspireHEPClient(cache=RecordCache(temp_dir), metrics=metrics)
+        response = Mock(status_code=200, content=b'{"best_oa_location": {"url_for_pdf": "https://r.org/1.pdf"}}')
+        response.json.return_value = {"best_oa_location": {"url_for_pdf": "https://r.org/1.pdf"}}
+
+        with patch.object(client.scheduler, "get", return_value=response) as mock_get:
+            sources = open_access_sources(client, "10.1000/1", "me@example.org")
+
+        self.assertEqual([s.url for s in sources], ["https://r.org/1.pdf"])
+        self.assertIsNone(mock_get.call_args.kwargs.get("metrics"))
+        self.assertIsNone(client.cache.get(client.cache.make_key("https://api.unpaywall.org/v2/10.1000/1",
+                                                                 {"email": "me@example.org"})))
+        self.assertFalse(any(metrics.counters.values()))
+        self.assertFalse(metrics.histograms)
+
+    def test_host_ranking(self):
+        """测试快速可靠的主机排在未知主机之前，失败的主机排在最后。"""
+        stats = HostStats(prior_latency=1.0)
+        stats.record_latency("fast.example.org", 0.1)
+        stats.record_result("fast.example.org", True)
+        stats.record_latency("flaky.example.org", 0.1)
+        for _ in range(5):
+            stats.record_result("flaky.example.org", False)
+        resolver = PdfResolver(stats=stats)
+        sources = [PdfSource(f"https://{host}/x.pdf", "document")
+                   for host in ("flaky.example.org", "new.example.org", "fast.example.org")]
+
+        ranked = [host_of(s.url) for s in resolver.rank(sources)]
+
+        self.assertEqual(ranked, ["fast.example.org", "new.example.org", "flaky.example.org"])
+        self.assertEqual(stats.snapshot()["flaky.example.org"]["failures"], 5)
+
+
+class TestPdfResolver(unittest.TestCase):
+    """PdfResolver 针对本地 PDF 主机的测试。"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.servers = []
+        cls.base_urls = []
+        for _ in range(2):
+            server = ThreadingHTTPServer(("127.0.0.1", 0), PdfHostHandler)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            cls.servers.append(server)
+            cls.base_urls.append(f"http://127.0.0.1:{server.server_address[1]}")
+
+    @classmethod
+    def tearDownClass(cls):
+        for server in cls.servers:
+            server.shutdown()
+            server.server_close()
+
+    def setUp(self):
+        """设置测试装置。"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.output_path = os.path.join(self.temp_dir, "1.pdf")
+        self.metrics = MetricsCollector()
+        self.client = InspireHEPClient(scheduler=RequestScheduler(rates={}, max_retries=0), metrics=self.metrics)
+
+    def tearDown(self):
+        """清理测试装置。"""
+        self.client.session.close()
+        shutil.rmtree(self.temp_dir)
+
+    def assert_only_output(self):
+        self.assertEqual(os.listdir(self.temp_dir), ["1.pdf"])
+        with open(self.output_path, "rb") as f:
+            self.assertEqual(f.read(), PDF_BODY)
+
+    def test_hedges_slow_source(self):
+        """测试首选来源超过期限未响应时向第二个来源对冲，且落后的请求不写入任何文件。"""
+        slow, fast = f"{self.base_urls[0]}/slow.pdf", f"{self.base_urls[1]}/files/paper.pdf"
+        resolver = PdfResolver(hedge_after=0.1)
+
+        start = time.monotonic()
+        source = resolver.download(self.client, make_record([slow, fast]), self.output_path)
+
+        self.assertEqual(source.url, fast)
+        self.assertLess(time.monotonic() - start, PdfHostHandler.delay)
+        self.assert_only_output()
+        self.assertEqual(self.metrics.counters["pdf_hedges_total"], 1)
+        self.assertEqual(resolver.stats.snapshot()[host_of(fast)]["successes"], 1)
+
+    def test_failed_source_falls_through_without_waiting(self):
+        """测试来源失败或返回 HTML 时立即换用下一个来源，并记录失败。"""
+        missing = f"{self.base_urls[0]}/missing.pdf"
+        page = f"{self.base_urls[0]}/page.pdf"
+        good = f"{self.base_urls[1]}/files/paper.pdf"
+        resolver = PdfResolver(hedge_after=30, max_parallel=1)
+
+        start = time.monotonic()
+        source = resolver.download(self.client, make_record([missing, page, good]), self.output_path)
+
+        self.assertEqual(source.url, good)
+        self.assertLess(time.monotonic() - start, 5)
+        self.assert_only_output()
+        self.assertEqual(resolver.stats.snapshot()[host_of(missing)]["failures"], 2)
+        self.assertEqual(self.metrics.counters["pdf_source_failures_total"], 2)
+        self.assertEqual(self.metrics.counters["pdf_hedges_total"], 0)
+
+    def test_all_sources_fail(self):
+        """测试所有来源都失败时抛出最后的错误，没有来源时引发 ValueError。"""
+        resolver = PdfResolver(hedge_after=0.1)
+
+        with self.assertRaises(requests.exceptions.RequestException):
+            resolver.download(self.client, make_record([f"{self.base_urls[0]}/missing.pdf"]), self.output_path)
+        with self.assertRaises(ValueError):
+            resolver.download(self.client, make_record([]), self.output_path)
+        self.assertFalse(os.path.exists(self.output_path))
+
+    def test_open_access_fallback(self):
+        """测试记录自身的来源全部失败后才通过 Unpaywall 查找开放获取副本。"""
+        record = make_record([f"{self.base_urls[0]}/missing.pdf"])
+        record["metadata"]["dois"] = [{"value": "10.1000/1"}]
+        oa = PdfSource(f"{self.base_urls[1]}/files/paper.pdf", "open_access")
+        resolver = PdfResolver(hedge_after=0.1, unpaywall_email="me@example.org")
+
+        with patch("inspirehep_downloader.sources.open_access_sources", return_value=[oa]) as mock_lookup:
+            source = resolver.download(self.client, record, self.output_path)
+
+        self.assertEqual(source, oa)
+        mock_lookup.assert_called_once_with(self.client, "10.1000/1", "me@example.org")
+        self.assert_only_output()
+
+    def test_download_pdf_uses_client_resolver_and_store(self):
+        """测试 download_pdf 通过客户端的 pdf_resolver 下载，并把结果按胜出的来源存入存储。"""
+        self.client.pdf_resolver = PdfResolver(hedge_after=0.1)
+        good = f"{self.base_urls[1]}/files/paper.pdf"
+        record = make_record([f"{self.base_urls[0]}/missing.pdf", good])
+        output_dir = os.path.join(self.temp_dir, "out")
+
+        with BlobStore(os.path.join(self.temp_dir, "store")) as store:
+            path = download_pdf("1", output_dir, client=self.client, record=record, store=store)
+            self.assertIsNotNone(store.lookup(good))
+            with patch.object(self.client, "download_file") as mock_download:
+                download_pdf("1", os.path.join(self.temp_dir, "again"), client=self.client, record=record,
+                             store=store)
+                mock_download.assert_not_called()
+
+        with open(path, "rb") as f:
+            self.assertEqual(f.read(), PDF_BODY)
+        self.assertEqual(os.listdir(output_dir), ["1.pdf"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+"""
+内容寻址 PDF 存储的单元测试。
+"""
+
+import unittest
+import os
+import tempfile
+import shutil
+import threading
+from unittest.mock import patch
+
+from inspirehep_downloader.store import BlobStore
+from inspirehep_downloader.downloader import download_pdf
+from tests.helpers import make_mock_client
+
+
+def make_record(arxiv_id):
+    """创建一条带有 arXiv 编号的模拟记录。"""
+    return {"metadata": {"arxiv_eprints": [{"value": arxiv_id}]}}
+
+
+class TestBlobStore(unittest.TestCase):
+    """BlobStore 类的测试。"""
+
+    def setUp(self):
+        """设置测试装置。"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.store = BlobStore(os.path.join(self.temp_dir, "store"))
+        self.client = make_mock_client({})
+        self.downloads = []
+
+        def download_file(url, output_path):
+            self.downloads.append(url)
+            with open(output_path, "wb") as f:
+                f.write(b"%PDF " + url.split("/")[-1].encode())
+            return 0
+
+        self.client.download_file.side_effect = download_file
+
+    def tearDown(self):
+        """清理测试装置。"""
+        self.store.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_same_url_downloaded_once_across_output_dirs(self):
+        """测试同一 PDF 在不同记录和输出目录之间只下载一次。"""
+        first = download_pdf("1", os.path.join(self.temp_dir, "a"), client=self.client,
+                             record=make_record("2301.00001"), store=self.store)
+        second = download_pdf("2", os.path.join(self.temp_dir, "b"), client=self.client,
+                              record=make_record("2301.00001"), store=self.store)
+
+        self.assertEqual(self.downloads, ["https://arxiv.org/pdf/2301.00001.pdf"])
+        with open(first, "rb") as f1, open(second, "rb") as f2:
+            self.assertEqual(f1.read(), f2.read())
+        self.assertTrue(os.path.samefile(first, second))
+        self.assertFalse(os.path.exists(second + ".part"))
+
+    def test_identical_content_from_different_urls_is_deduplicated(self):
+        """测试不同 URL 返回相同内容时只保存一份。"""
+        for url in ("https://a.example/x.pdf", "https://b.example/x.pdf"):
+            path = os.path.join(self.temp_dir, "incoming.pdf")
+            with open(path, "wb") as f:
+                f.write(b"same bytes")
+            self.store.add_file(path, url)
+
+        self.assertEqual(self.store.lookup("https://a.example/x.pdf"), self.store.lookup("https://b.example/x.pdf"))
+        blobs = [name for _, _, names in os.walk(self.store.blob_dir) for name in names]
+        self.assertEqual(len(blobs), 1)
+
+    def test_missing_blob_is_refetched(self):
+        """测试存储中的文件被删除后会重新下载。"""
+        blob = self.store.fetch(self.client, "https://example.org/a.pdf")
+        os.remove(blob)
+
+        self.assertIsNone(self.store.lookup("https://example.org/a.pdf"))
+        self.assertEqual(self.store.fetch(self.client, "https://example.org/a.pdf"), blob)
+        self.assertEqual(len(self.downloads), 2)
+
+    def test_concurrent_fetches_download_once(self):
+        """测试同一 URL 的并发请求只下载一次。"""
+        threads = [threading.Thread(target=self.store.fetch, args=(self.client, "https://example.org/a.pdf"))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.downloads, ["https://example.org/a.pdf"])
+
+    def test_link_falls_back_to_copy(self):
+        """测试无法创建链接时退回到复制。"""
+        blob = self.store.fetch(self.client, "https://example.org/a.pdf")
+        output_path = os.path.join(self.temp_dir, "out.pdf")
+
+        with patch("os.link", side_effect=OSError), \
+                patch("os.symlink", side_effect=OSError):
+            self.store.link(blob, output_path)
+
+        self.assertFalse(os.path.samefile(blob, output_path))
+        with open(output_path, "rb") as f:
+            self.assertEqual(f.read(), b"%PDF a.pdf")
+
+
+if __name__ == "__main__":
+    unittest.main()
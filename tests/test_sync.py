@@ -0,0 +1,99 @@
+"""
+增量同步的单元测试。
+"""
+
+import unittest
+import json
+import os
+import tempfile
+import shutil
+
+from inspirehep_downloader.sync import sync_literature, STATE_FILENAME
+from tests.helpers import make_mock_client
+
+
+def make_hit(record_id, updated):
+    """创建一条模拟的搜索结果。"""
+    return {
+        "id": str(record_id),
+        "updated": updated,
+        "metadata": {"control_number": record_id, "titles": [{"title": f"Paper {record_id}"}],
+                     "arxiv_eprints": [{"value": f"2301.{record_id:05d}"}]}
+    }
+
+
+class TestSyncLiterature(unittest.TestCase):
+    """sync_literature 函数的测试。"""
+    
+    def setUp(self):
+        """设置测试装置。"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.client = make_mock_client({})
+        self.hits = []
+        self.client.iter_literature.side_effect = lambda query, size, fields: iter(self.hits)
+    
+    def tearDown(self):
+        """清理测试装置。"""
+        shutil.rmtree(self.temp_dir)
+    
+    def read_state(self):
+        with open(os.path.join(self.temp_dir, STATE_FILENAME)) as f:
+            return json.load(f)
+    
+    def test_first_sync_downloads_everything(self):
+        """测试首次同步下载所有匹配的记录并写入状态文件。"""
+        self.hits = [make_hit(1, "2024-01-01T00:00:00"), make_hit(2, "2024-01-02T00:00:00")]
+        
+        summary = sync_literature("author:test", self.temp_dir, client=self.client)
+        
+        self.assertEqual(summary["downloaded"], 2)
+        self.assertEqual(self.client.iter_literature.call_args.args[0], "author:test")
+        self.client.get_record.assert_not_called()
+        state = self.read_state()
+        self.assertEqual(state["records"]["1"], {"updated": "2024-01-01T00:00:00", "control_number": 1})
+        self.assertIsNotNone(state["last_sync"])
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir, "2_metadata.json")))
+    
+    def test_second_sync_only_fetches_changes(self):
+        """测试再次同步只查询并下载更新过的记录。"""
+        self.hits = [make_hit(1, "2024-01-01T00:00:00"), make_hit(2, "2024-01-02T00:00:00")]
+        sync_literature("author:test", self.temp_dir, client=self.client)
+        last_sync = self.read_state()["last_sync"]
+        self.client.download_file.reset_mock()
+        
+        self.hits = [make_hit(1, "2024-01-01T00:00:00"), make_hit(2, "2024-03-01T00:00:00")]
+        summary = sync_literature("author:test", self.temp_dir, client=self.client)
+        
+        self.assertEqual(self.client.iter_literature.call_args.args[0],
+                         f"(author:test) and du >= {last_sync[:10]}")
+        self.assertEqual(summary["unchanged"], 1)
+        self.assertEqual(summary["downloaded"], 1)
+        self.client.download_file.assert_called_once()
+        self.assertEqual(self.read_state()["records"]["2"]["updated"], "2024-03-01T00:00:00")
+    
+    def test_failed_records_retried(self):
+        """测试失败的记录保存在 pending 中并在下次同步时重试。"""
+        self.hits = [make_hit(1, "2024-01-01T00:00:00")]
+        self.client.download_file.side_effect = IOError("boom")
+        
+        summary = sync_literature("author:test", self.temp_dir, client=self.client)
+        
+        self.assertEqual(summary["failed"], ["1"])
+        self.assertEqual(self.read_state()["pending"], ["1"])
+        
+        self.client.download_file.side_effect = None
+        summary = sync_literature("author:test", self.temp_dir, client=self.client)
+        
+        self.assertEqual(summary["downloaded"], 1)
+        self.assertEqual(self.read_state()["pending"], [])
+    
+    def test_state_belongs_to_other_query(self):
+        """测试状态文件属于其他查询时报错。"""
+        sync_literature("author:test", self.temp_dir, client=self.client)
+        
+        with self.assertRaises(ValueError):
+            sync_literature("author:other", self.temp_dir, client=self.client)
+
+
+if __name__ == "__main__":
+    unittest.main()